@@ -0,0 +1,71 @@
+### Benchmark: modello completo vs modello con richieste aggregate per path (aggregate_requests)
+### Richieste, dimensioni, tempi e obiettivo (la soluzione aggregata è riportata sulle richieste originali)
+### L'aggregazione è una restrizione euristica: gap = (obj aggregato - obj completo) / obj completo ≥ 0
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_aggregation
+
+import contextlib
+import io
+import time
+from gurobipy import GurobiError
+from utils.f_for_data import aggregate_requests, disaggregate_solution
+from models.pipeline_mba import MODELS, CASCADE
+from benchmarks.synthetic_instance import make_synthetic_instance
+
+
+
+def run_variant(data, variant, time_limit, threads):
+    t0 = time.perf_counter()
+    mba = MODELS[variant](data)
+    mba.build()
+    mba.model.update()
+    out = {"vars": mba.model.NumVars, "rows": mba.model.NumConstrs}
+    mba.model.Params.OutputFlag = 0
+    mba.model.Params.TimeLimit = time_limit
+    mba.model.Params.Threads = threads
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            mba.solve()
+        out["obj"] = mba.model.ObjVal if mba.model.SolCount > 0 else None
+    except GurobiError as e:          # es. licenza limitata
+        out.update({"obj": None, "error": e.errno})
+    out["solution"] = mba.get_solution() if out["obj"] is not None else None
+    out["total_s"] = time.perf_counter() - t0
+    mba.model.dispose()
+    return out
+
+
+
+def compare_aggregation(instances, variants=CASCADE, time_limit=600, threads=1):
+    """instances: {nome: data}; gap dell'aggregato rispetto al modello completo (restrizione: ≥ 0)"""
+    rows = []
+    for name, data in instances.items():
+        agg = aggregate_requests(data, verbose=False)
+        for variant in variants:
+            full = run_variant(data, variant, time_limit, threads)
+            aggr = run_variant(agg, variant, time_limit, threads)
+            if aggr["solution"] is not None:
+                aggr["solution"] = disaggregate_solution(aggr["solution"], agg["groups"])
+            rows.append({"instance": name, "variant": variant, "K": len(data["K"]), "K_agg": len(agg["K"]),
+                         "full": full, "aggregated": aggr})
+
+    fmt = lambda v, spec: format(v, spec) if v is not None else format("-", spec.split(".")[0])
+    gap = lambda f, a: (a - f) / max(abs(f), 1e-9) if f is not None and a is not None else None
+    print(f"\n{'instance':<10}{'variant':>8}{'K':>6}{'vars':>8}{'rows':>8}{'obj':>13}{'[s]':>8}"
+          f"{'| K':>6}{'vars':>8}{'rows':>8}{'obj':>13}{'[s]':>8}{'gap':>9}")
+    for r in rows:
+        f, a = r["full"], r["aggregated"]
+        print(f"{r['instance']:<10}{r['variant']:>8}{r['K']:>6}{f['vars']:>8}{f['rows']:>8}"
+              f"{fmt(f['obj'], '>13.2f')}{f['total_s']:>8.3f}{r['K_agg']:>6}{a['vars']:>8}{a['rows']:>8}"
+              f"{fmt(a['obj'], '>13.2f')}{a['total_s']:>8.3f}{fmt(gap(f['obj'], a['obj']), '>9.2%')}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    # griglia piccola e linee corte: molte richieste ripetono lo stesso path
+    instances = {}
+    for n_requests in (60, 200, 800):
+        instances[f"synth{n_requests}"] = make_synthetic_instance(n_lines=4, n_stops=8, grid_size=6,
+                                                                  n_requests=n_requests, seed=0)
+    compare_aggregation(instances)
@@ -0,0 +1,61 @@
+### Benchmark: linee per arco tramite scansione di A vs indice L_ij di load_sets
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_arc_index
+
+import time
+from benchmarks.synthetic_instance import make_synthetic_instance
+from models.models_mba import MBA_ILP_FLEX
+
+
+
+def lines_by_scan(data):
+    """Vecchio vincolo (1): per ogni arco di ogni path si scorre tutto A -> O(|K|·|P|·|A|)"""
+    A, out = data["A"], {}
+    for k in data["K"]:
+        path = data["Pk"][k]
+        for (i, j) in zip(path[:-1], path[1:]):
+            out[k, i, j] = [l for (ii, jj, l) in A if (ii, jj) == (i, j)]
+    return out
+
+
+def lines_by_index(data):
+    """Nuovo vincolo (1): lookup nell'indice L_ij -> O(|K|·|P|)"""
+    L_ij, out = data["L_ij"], {}
+    for k in data["K"]:
+        path = data["Pk"][k]
+        for (i, j) in zip(path[:-1], path[1:]):
+            out[k, i, j] = L_ij.get((i, j), [])
+    return out
+
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - t0, out
+
+
+
+def scaling(n_lines_list=(5, 10, 20, 40, 80), n_requests=200, seed=0):
+    """Tempi della famiglia (1) e di build() al crescere di |A|"""
+    rows = []
+    for n_lines in n_lines_list:
+        data = make_synthetic_instance(n_lines=n_lines, n_requests=n_requests,
+                                       grid_size=max(10, 2 * n_lines), seed=seed)
+        t_scan, by_scan = _timed(lines_by_scan, data)
+        t_index, by_index = _timed(lines_by_index, data)
+        assert by_scan == by_index
+        mba = MBA_ILP_FLEX(data)
+        t_build, _ = _timed(mba.build)
+        rows.append({"lines": n_lines, "A": len(data["A"]), "scan_s": t_scan,
+                     "index_s": t_index, "build_s": t_build})
+
+    print(f"\n{'lines':>6}{'|A|':>8}{'scan A [s]':>12}{'L_ij [s]':>12}{'build() [s]':>13}")
+    for r in rows:
+        print(f"{r['lines']:>6}{r['A']:>8}{r['scan_s']:>12.4f}{r['index_s']:>12.5f}{r['build_s']:>13.4f}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    scaling()
@@ -0,0 +1,61 @@
+### Benchmark: stessi modelli MBA (forma matriciale) risolti con backend diversi
+### Ogni (istanza, variante, backend) gira in un processo separato: highspy e ortools
+### non possono essere caricati nello stesso processo.
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_backends
+
+import multiprocessing as mp
+from utils.f_for_data import load_instance
+from models.pipeline_mba import CASCADE
+
+
+BACKEND_NAMES = ("gurobi", "highs", "scipy", "cbc", "cpsat")
+
+
+
+def _child_solve(data, variant, backend, options, queue):
+    try:
+        from models.backends_mba import solve_variant
+        queue.put(solve_variant(data, variant, backend, **options).stats)
+    except Exception as e:           # es. pacchetto mancante o licenza Gurobi limitata
+        queue.put({"status": f"ERROR: {type(e).__name__}", "obj": None, "build_s": None, "runtime_s": None})
+
+
+def _run_child(*args):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child_solve, args=(*args, queue))
+    proc.start()
+    out = queue.get()
+    proc.join()
+    return out
+
+
+
+def compare_backends(instances, backends=BACKEND_NAMES, variants=CASCADE, time_limit=600, threads=1):
+    """instances: {nome: data}. Tempo di caricamento nel solver, tempo di risoluzione e obiettivo"""
+    options = {"time_limit": time_limit, "threads": threads}
+    rows = []
+    for name, data in instances.items():
+        for variant in variants:
+            for backend in backends:
+                st = _run_child(data, variant, backend, options)
+                rows.append({"instance": name, "variant": variant, "backend": backend, **st})
+
+    fmt = lambda v, spec: format(v, spec) if v is not None else "-"
+    print(f"\n{'instance':<10}{'variant':>8}{'backend':>9}{'status':>24}{'build [s]':>11}{'solve [s]':>11}{'obj':>16}")
+    for r in rows:
+        print(f"{r['instance']:<10}{r['variant']:>8}{r['backend']:>9}{r['status']:>24}"
+              f"{fmt(r['build_s'], '>11.4f')}{fmt(r['runtime_s'], '>11.4f')}{fmt(r['obj'], '>16.4f')}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {}
+    for name in ["cross", "grid", "city"]:
+        try:
+            instances[name], _ = load_instance(name)
+        except Exception as e:
+            print(f"⚠️ Istanza {name} non caricata: {e}")
+    compare_backends(instances)
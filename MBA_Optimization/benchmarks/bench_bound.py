@@ -0,0 +1,98 @@
+### Benchmark: lower bound del rilassamento continuo (bound(), con e senza tagli) vs ottimo intero,
+### e sweep con / senza prune sul bound LP
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_bound
+
+import contextlib
+import io
+import time
+from gurobipy import GurobiError
+from utils.f_for_data import load_instance
+from models.pipeline_mba import MODELS, CASCADE
+from models.sweep_mba import parameter_sweep
+from benchmarks.synthetic_instance import make_synthetic_instance
+
+
+
+def run_variant(data, variant, time_limit):
+    mba = MODELS[variant](data)
+    mba.build()
+    out = {}
+    for name, cuts in (("lp", False), ("cuts", True)):
+        try:
+            out[name] = mba.bound(cuts)
+        except GurobiError as e:      # es. licenza limitata
+            out[name] = {"bound": None, "cuts": 0, "relax_s": 0.0, "lp_s": 0.0, "error": e.errno}
+    mba.model.Params.OutputFlag = 0
+    mba.model.Params.TimeLimit = time_limit
+    t0 = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            mba.solve()
+        out["obj"] = mba.model.ObjVal if mba.model.SolCount > 0 else None
+    except GurobiError as e:          # es. licenza limitata
+        out.update({"obj": None, "error": e.errno})
+    out["mip_s"] = time.perf_counter() - t0
+    if mba.relaxed is not None:
+        mba.relaxed.dispose()
+    mba.model.dispose()
+    return out
+
+
+
+def compare_bounds(instances, variants=CASCADE, time_limit=600):
+    """instances: {nome: data}. gap = (obj - bound) / obj"""
+    rows = [{"instance": name, "variant": variant, **run_variant(data, variant, time_limit)}
+            for name, data in instances.items() for variant in variants]
+
+    fmt = lambda v, spec: format(v, spec) if v is not None else format("-", spec.split(".")[0])
+    gap = lambda r, b: (r["obj"] - b) / r["obj"] if r["obj"] and b is not None else None
+    print(f"\n{'instance':<10}{'variant':>8}{'LP':>13}{'gap':>8}{'[s]':>8}{'LP+cuts':>13}{'gap':>8}{'cuts':>8}"
+          f"{'[s]':>8}{'obj':>13}{'MIP [s]':>9}")
+    for r in rows:
+        lp, cu = r["lp"], r["cuts"]
+        print(f"{r['instance']:<10}{r['variant']:>8}{fmt(lp['bound'], '>13.2f')}{fmt(gap(r, lp['bound']), '>8.2%')}"
+              f"{lp['relax_s'] + lp['lp_s']:>8.3f}{fmt(cu['bound'], '>13.2f')}{fmt(gap(r, cu['bound']), '>8.2%')}"
+              f"{cu['cuts']:>8}{cu['relax_s'] + cu['lp_s']:>8.3f}{fmt(r['obj'], '>13.2f')}{r['mip_s']:>9.3f}")
+    return rows
+
+
+
+def compare_pruning(instances, grids, tol=1e-6):
+    """
+    Stessa griglia con e senza prune: miglior obiettivo per variante, punti scartati, tempo totale.
+    Verifica che nessun punto scartato abbia un ottimo (sweep completo) sotto il migliore trovato con prune.
+    """
+    print(f"\n{'instance':<10}{'grid':>12}{'points':>8}{'pruned':>8}{'full [s]':>10}{'prune [s]':>11}{'same best':>11}")
+    for name, data in instances.items():
+        for label, grid in grids.items():
+            t0 = time.perf_counter()
+            full = parameter_sweep(data, grid)
+            t1 = time.perf_counter()
+            pruned = parameter_sweep(data, grid, prune=True)
+            t2 = time.perf_counter()
+            best = pruned.groupby("variant")["obj"].min()
+            for r, f in zip(pruned.itertuples(), full.itertuples()):      # stesso ordine di (punto, variante)
+                assert not (r.pruned and f.obj < best[r.variant] - tol * max(1.0, abs(best[r.variant]))), \
+                    f"{name} {label}: punto scartato {r.Index} ({r.variant}) con obj {f.obj} < {best[r.variant]}"
+            same = (full.groupby("variant")["obj"].min() - best).abs().max() < tol
+            print(f"{name:<10}{label:>12}{len(full):>8}{int(pruned['pruned'].sum()):>8}{t1 - t0:>10.3f}"
+                  f"{t2 - t1:>11.3f}{str(same):>11}")
+
+
+
+if __name__ == "__main__":
+    instances = {}
+    for name in ["cross", "grid", "city"]:
+        try:
+            instances[name], _ = load_instance(name)
+        except Exception as e:
+            print(f"⚠️ Istanza {name} non caricata: {e}")
+    for n_requests in (50, 200):
+        instances[f"synth{n_requests}"] = make_synthetic_instance(n_lines=10, n_requests=n_requests, seed=0)
+    compare_bounds(instances)
+
+    synth = {f"synth{n}": make_synthetic_instance(n_lines=5, n_requests=n, seed=1) for n in (40, 80)}
+    compare_pruning(synth, {"Q up": {"Q": [6, 8, 10, 12], "alpha": [0.5, 1, 2]},
+                            "Q down": {"Q": [12, 10, 8, 6], "alpha": [0.5, 1, 2]},
+                            "Q > data": {"Q": [12, 16, 20], "alpha": [0.05, 0.2]}})    # data["Q"] = 8
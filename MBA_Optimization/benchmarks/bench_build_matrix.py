@@ -0,0 +1,63 @@
+### Benchmark: build() (loop, un addVar/addConstr alla volta) vs build_matrix() (addMVar + addMConstr)
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_build_matrix
+
+import time
+from utils.f_for_data import load_instance
+from models.models_mba import MBA_ILP_RIGID, MBA_ILP_SEMI, MBA_ILP_FLEX
+
+
+MODELS = {"RIGID": MBA_ILP_RIGID, "SEMI": MBA_ILP_SEMI, "FLEX": MBA_ILP_FLEX}
+
+
+
+def time_build(model_cls, data, method="build", repeats=3):
+    """
+    Tempo (sec, migliore su `repeats`) per costruire il modello con il metodo indicato,
+    incluso model.update(). Ritorna (tempo, n. variabili, n. vincoli).
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        mba = model_cls(data)
+        t0 = time.perf_counter()
+        getattr(mba, method)()
+        mba.model.update()
+        best = min(best, time.perf_counter() - t0)
+        n_vars, n_constrs = mba.model.NumVars, mba.model.NumConstrs
+        mba.model.dispose()
+    return best, n_vars, n_constrs
+
+
+
+def compare_build(instances, repeats=3):
+    """
+    instances: {nome: data}. Stampa e ritorna la tabella dei tempi di costruzione.
+    """
+    rows = []
+    for name, data in instances.items():
+        for variant, model_cls in MODELS.items():
+            t_loop, n_vars, n_constrs = time_build(model_cls, data, "build", repeats)
+            t_mat, _, _ = time_build(model_cls, data, "build_matrix", repeats)
+            rows.append({
+                "instance": name, "model": variant,
+                "vars": n_vars, "constrs": n_constrs,
+                "build_s": t_loop, "build_matrix_s": t_mat,
+                "speedup": t_loop / t_mat if t_mat > 0 else float("nan"),
+            })
+
+    print(f"\n{'instance':<10}{'model':<7}{'vars':>9}{'constrs':>9}{'build [s]':>12}{'matrix [s]':>12}{'speedup':>9}")
+    for r in rows:
+        print(f"{r['instance']:<10}{r['model']:<7}{r['vars']:>9}{r['constrs']:>9}"
+              f"{r['build_s']:>12.4f}{r['build_matrix_s']:>12.4f}{r['speedup']:>8.1f}x")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {}
+    for name in ["cross", "grid", "city"]:
+        try:
+            instances[name], _ = load_instance(name)
+        except Exception as e:
+            print(f"⚠️ Istanza {name} non caricata: {e}")
+    compare_build(instances)
@@ -0,0 +1,63 @@
+### Benchmark: termini delle righe di capacità scorrendo K vs indice CSR arco -> richieste (arc_req)
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_cap_index
+
+import time
+from benchmarks.synthetic_instance import make_synthetic_instance
+from utils.f_for_data import path_x_keys, arc_requests
+from models.models_mba import MBA_ILP_RIGID, MBA_ILP_FLEX
+
+
+
+def cap_terms_by_scan(data, x):
+    """Vecchie righe di capacità: per ogni arco di linea si prova ogni richiesta -> O(|K|·|arcs|)"""
+    out = {}
+    for l, segs in data["Nl"].items():
+        for seg in segs:
+            for (i, j) in zip(seg[:-1], seg[1:]):
+                out[l, i, j] = [k for k in data["K"] if (k, i, j, l) in x]
+    return out
+
+
+def cap_terms_by_index(data, x):
+    """Nuove righe di capacità: solo le richieste dell'arco (indice CSR) -> O(|x|)"""
+    out = {}
+    for l, segs in data["Nl"].items():
+        for seg in segs:
+            for (i, j) in zip(seg[:-1], seg[1:]):
+                out[l, i, j] = [k for k in arc_requests(data, l, i, j) if (k, i, j, l) in x]
+    return out
+
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - t0, out
+
+
+
+def scaling(n_requests_list=(100, 400, 1600, 6400), n_lines=20, seed=0):
+    """Tempi dei termini di capacità e di build() RIGID / FLEX al crescere di |K|"""
+    rows = []
+    for n_requests in n_requests_list:
+        data = make_synthetic_instance(n_lines=n_lines, n_requests=n_requests, seed=seed)
+        x = dict.fromkeys(path_x_keys(data["K"], data["Pk"], data["L_ij"]))
+        t_scan, by_scan = _timed(cap_terms_by_scan, data, x)
+        t_index, by_index = _timed(cap_terms_by_index, data, x)
+        assert by_scan == by_index
+        t_rigid, _ = _timed(MBA_ILP_RIGID(data).build)
+        t_flex, _ = _timed(MBA_ILP_FLEX(data).build)
+        rows.append({"K": n_requests, "arcs": sum(len(seg) - 1 for segs in data["Nl"].values() for seg in segs),
+                     "x": len(x), "scan_s": t_scan, "index_s": t_index, "rigid_s": t_rigid, "flex_s": t_flex})
+
+    print(f"\n{'|K|':>6}{'arcs':>7}{'|x|':>9}{'scan K [s]':>12}{'arc_req [s]':>13}{'RIGID build [s]':>17}{'FLEX build [s]':>16}")
+    for r in rows:
+        print(f"{r['K']:>6}{r['arcs']:>7}{r['x']:>9}{r['scan_s']:>12.4f}{r['index_s']:>13.4f}"
+              f"{r['rigid_s']:>17.4f}{r['flex_s']:>16.4f}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    scaling()
@@ -0,0 +1,90 @@
+### Benchmark: formulazione compatta (x arco per arco) vs generazione di colonne a pattern
+### Dimensioni (variabili / righe), bound LP, soluzione intera e tempi
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_colgen
+
+import contextlib
+import io
+import time
+from gurobipy import GurobiError
+from utils.f_for_data import load_instance
+from models.pipeline_mba import MODELS, CASCADE
+from models.colgen_mba import MBA_ColGen
+from benchmarks.synthetic_instance import make_synthetic_instance
+
+
+
+def run_compact(data, variant, time_limit, threads):
+    t0 = time.perf_counter()
+    mba = MODELS[variant](data)
+    mba.build()
+    mba.model.update()
+    out = {"vars": mba.model.NumVars, "rows": mba.model.NumConstrs}
+    try:
+        relax = mba.model.relax()
+        relax.Params.OutputFlag = 0
+        relax.optimize()
+        out["lp"] = relax.ObjVal if relax.SolCount > 0 else None
+        relax.dispose()
+        mba.model.Params.OutputFlag = 0
+        mba.model.Params.TimeLimit = time_limit
+        mba.model.Params.Threads = threads
+        with contextlib.redirect_stdout(io.StringIO()):
+            mba.solve()
+        out["obj"] = mba.model.ObjVal if mba.model.SolCount > 0 else None
+    except GurobiError as e:          # es. licenza limitata
+        out.update({"lp": None, "obj": None, "error": e.errno})
+    out["total_s"] = time.perf_counter() - t0
+    mba.model.dispose()
+    return out
+
+
+def run_colgen(data, variant, time_limit, threads):
+    t0 = time.perf_counter()
+    cg = MBA_ColGen(data, variant)
+    cg.build()
+    cg.model.Params.OutputFlag = 0
+    cg.model.Params.Threads = threads
+    st = cg.solve(time_limit=time_limit)
+    st["total_s"] = time.perf_counter() - t0
+    cg.model.dispose()
+    return st
+
+
+
+def compare_colgen(instances, variants=CASCADE, time_limit=600, threads=1):
+    """
+    instances: {nome: data}
+    LP compatto e LP della generazione di colonne affiancati: ΔLP = LP colgen - LP compatto (atteso 0).
+    """
+    rows = []
+    for name, data in instances.items():
+        for variant in variants:
+            rows.append({"instance": name, "variant": variant,
+                         "compact": run_compact(data, variant, time_limit, threads),
+                         "colgen": run_colgen(data, variant, time_limit, threads)})
+
+    fmt = lambda v, spec: format(v, spec) if v is not None else format("-", spec.split(".")[0])
+    delta = lambda a, b: b - a if a is not None and b is not None else None
+    print(f"\n{'instance':<10}{'variant':>8}{'vars':>8}{'rows':>8}{'LP':>13}{'obj':>13}{'[s]':>8}"
+          f"{'| cols':>8}{'rows':>8}{'LP':>13}{'ΔLP':>9}{'UB':>13}{'it':>5}{'[s]':>8}")
+    for r in rows:
+        c, g = r["compact"], r["colgen"]
+        print(f"{r['instance']:<10}{r['variant']:>8}{c['vars']:>8}{c['rows']:>8}{fmt(c['lp'], '>13.2f')}"
+              f"{fmt(c['obj'], '>13.2f')}{c['total_s']:>8.3f}{g['columns']:>8}{g['rows']:>8}"
+              f"{fmt(g['lp_bound'], '>13.2f')}{fmt(delta(c['lp'], g['lp_bound']), '>9.2f')}"
+              f"{fmt(g['upper_bound'], '>13.2f')}{g['iterations']:>5}{g['total_s']:>8.3f}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {}
+    for name in ["cross", "grid", "city"]:
+        try:
+            instances[name], _ = load_instance(name)
+        except Exception as e:
+            print(f"⚠️ Istanza {name} non caricata: {e}")
+    for n_requests in (50, 200, 800):
+        instances[f"synth{n_requests}"] = make_synthetic_instance(n_lines=10, n_requests=n_requests, seed=0)
+    compare_colgen(instances)
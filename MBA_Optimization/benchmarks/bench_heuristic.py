@@ -0,0 +1,79 @@
+### Benchmark: euristica costruttiva vs MIP, e MIP con l'euristica come MIP start
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_heuristic
+
+import contextlib
+import io
+import time
+from gurobipy import GurobiError
+from utils.f_for_data import load_instance
+from models.pipeline_mba import MODELS, CASCADE, first_incumbent_callback
+from models.heuristic_mba import MBA_Heuristic
+from benchmarks.synthetic_instance import make_synthetic_instance
+
+
+
+def run_mip(data, variant, start, time_limit, threads):
+    """MIP a freddo (start=None) o con MIP start; tempo / valore del primo incumbent e ottimo"""
+    mba = MODELS[variant](data)
+    mba.build()
+    mba.model.Params.OutputFlag = 0
+    mba.model.Params.TimeLimit = time_limit
+    mba.model.Params.Threads = threads
+    if start is not None:
+        mba.set_start(start)
+    stats = {}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            mba.solve(first_incumbent_callback(stats))
+        stats.update({"obj": mba.model.ObjVal if mba.model.SolCount > 0 else None, "runtime_s": mba.model.Runtime})
+    except GurobiError as e:          # es. licenza limitata
+        stats.update({"obj": None, "runtime_s": None, "error": e.errno})
+    mba.model.dispose()
+    return stats
+
+
+
+def compare_heuristic(instances, variants=CASCADE, time_limit=600, threads=1):
+    """instances: {nome: data}; heur = ordine greedy (usato come MIP start), regret = ordine a rimpianto"""
+    rows = []
+    for name, data in instances.items():
+        for variant in variants:
+            t0 = time.perf_counter()
+            heur = MBA_Heuristic(data, variant)
+            heur.build()
+            st = heur.solve()
+            st["total_s"] = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            regret = MBA_Heuristic(data, variant)
+            regret.build()
+            st_regret = regret.solve(order="regret")
+            st_regret["total_s"] = time.perf_counter() - t0
+            cold = run_mip(data, variant, None, time_limit, threads)
+            warm = run_mip(data, variant, heur.get_solution(), time_limit, threads)
+            rows.append({"instance": name, "variant": variant, "heur": st, "regret": st_regret,
+                         "cold": cold, "warm": warm})
+
+    fmt = lambda v, spec: format(v, spec) if v is not None else format("-", spec.split(".")[0])
+    print(f"\n{'instance':<10}{'variant':>8}{'heur obj':>13}{'heur [s]':>10}{'regret obj':>13}{'regret [s]':>12}{'MIP obj':>13}"
+          f"{'1st inc cold':>14}{'1st inc warm':>14}{'MIP cold [s]':>14}{'MIP warm [s]':>14}")
+    for r in rows:
+        h, g, c, w = r["heur"], r["regret"], r["cold"], r["warm"]
+        print(f"{r['instance']:<10}{r['variant']:>8}{h['obj']:>13.2f}{h['total_s']:>10.4f}"
+              f"{g['obj']:>13.2f}{g['total_s']:>12.4f}{fmt(c['obj'], '>13.2f')}"
+              f"{fmt(c.get('first_incumbent_s'), '>14.4f')}{fmt(w.get('first_incumbent_s'), '>14.4f')}"
+              f"{fmt(c['runtime_s'], '>14.4f')}{fmt(w['runtime_s'], '>14.4f')}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {}
+    for name in ["cross", "grid", "city"]:
+        try:
+            instances[name], _ = load_instance(name)
+        except Exception as e:
+            print(f"⚠️ Istanza {name} non caricata: {e}")
+    for n_requests in (50, 800):
+        instances[f"synth{n_requests}"] = make_synthetic_instance(n_lines=10, n_requests=n_requests, seed=0)
+    compare_heuristic(instances)
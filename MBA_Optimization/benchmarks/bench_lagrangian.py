@@ -0,0 +1,77 @@
+### Benchmark: lower bound lagrangiano (bundle / subgradiente) vs rilassamento LP vs ottimo intero (SEMI / FLEX)
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_lagrangian
+
+import contextlib
+import io
+import time
+from utils.f_for_data import load_instance
+from models.pipeline_mba import MODELS
+from models.lagrangian_mba import MBA_Lagrangian
+
+
+
+def run_reference(data, variant, time_limit, threads):
+    """Bound del rilassamento LP e ottimo del MIP (con i rispettivi tempi, build incluso)"""
+    t0 = time.perf_counter()
+    mba = MODELS[variant](data)
+    mba.build()
+    mba.model.update()
+    relax = mba.model.relax()
+    relax.Params.OutputFlag = 0
+    relax.optimize()
+    out = {"lp": relax.ObjVal if relax.SolCount > 0 else None, "lp_s": time.perf_counter() - t0}
+    relax.dispose()
+
+    mba.model.Params.OutputFlag = 0
+    mba.model.Params.TimeLimit = time_limit
+    mba.model.Params.Threads = threads
+    with contextlib.redirect_stdout(io.StringIO()):
+        mba.solve()
+    out["mip"] = mba.model.ObjVal if mba.model.SolCount > 0 else None
+    out["mip_s"] = time.perf_counter() - t0
+    mba.model.dispose()
+    return out
+
+
+
+def compare_lagrangian(instances, variants=("SEMI", "FLEX"), methods=("bundle", "subgradient"), max_iter=500,
+                       time_limit=600, threads=1, trace_every=50):
+    """instances: {nome: data}. Bound e tempi per metodo; con trace_every stampa bound / tempo per iterazione"""
+    rows = []
+    for name, data in instances.items():
+        for variant in variants:
+            row = {"instance": name, "variant": variant, **run_reference(data, variant, time_limit, threads)}
+            for method in methods:
+                t0 = time.perf_counter()
+                lag = MBA_Lagrangian(data, variant)
+                st = lag.solve(max_iter=max_iter, method=method)
+                st["total_s"] = time.perf_counter() - t0
+                if trace_every:
+                    print(f"\n--- {name} {variant} {method}: iterazioni ---")
+                    for h in lag.history[::trace_every]:
+                        print(f"iter {h['iter']:>5}  bound {h['bound']:>14.2f}  best {h['best_bound']:>14.2f}"
+                              f"  step {h['step']:>10.4g}  {h['time_s']:>8.4f}s")
+                row[method] = st
+            rows.append(row)
+
+    fmt = lambda v, spec: format(v, spec) if v is not None else "-"
+    header = "".join(f"{m[:8] + ' LB':>14}{'[s]':>9}{'iter':>6}" for m in methods)
+    print(f"\n{'instance':<10}{'variant':>8}{header}{'LP':>14}{'LP [s]':>9}{'MIP':>14}{'MIP [s]':>9}")
+    for r in rows:
+        cells = "".join(f"{fmt(r[m]['lower_bound'], '>14.2f')}{r[m]['total_s']:>9.4f}{r[m]['iterations']:>6}"
+                        for m in methods)
+        print(f"{r['instance']:<10}{r['variant']:>8}{cells}{fmt(r['lp'], '>14.2f')}{r['lp_s']:>9.4f}"
+              f"{fmt(r['mip'], '>14.2f')}{r['mip_s']:>9.4f}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {}
+    for name in ["cross", "grid", "city"]:
+        try:
+            instances[name], _ = load_instance(name)
+        except Exception as e:
+            print(f"⚠️ Istanza {name} non caricata: {e}")
+    compare_lagrangian(instances)
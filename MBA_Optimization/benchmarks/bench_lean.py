@@ -0,0 +1,61 @@
+### Benchmark: build() / build_matrix() con nomi vs build_lean() (senza nomi, id interi)
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_lean
+
+import multiprocessing as mp
+import resource
+import time
+from benchmarks.synthetic_instance import make_synthetic_instance
+from models.models_mba import MBA_ILP_RIGID, MBA_ILP_SEMI, MBA_ILP_FLEX
+
+
+MODELS = {"RIGID": MBA_ILP_RIGID, "SEMI": MBA_ILP_SEMI, "FLEX": MBA_ILP_FLEX}
+MODES = ("build", "build_matrix", "build_lean")
+
+
+
+def _rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # Linux: KB -> MB
+
+
+def _child_build(variant, mode, data, queue):
+    """Costruisce il modello in un processo separato: tempo e picco di RSS"""
+    rss0 = _rss_mb()
+    t0 = time.perf_counter()
+    mba = MODELS[variant](data)
+    getattr(mba, mode)()
+    mba.model.update()
+    queue.put((mba.model.NumVars, mba.model.NumConstrs, time.perf_counter() - t0, _rss_mb() - rss0))
+
+
+def _run_child(target, *args):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=target, args=(*args, queue))
+    proc.start()
+    out = queue.get()
+    proc.join()
+    return out
+
+
+
+def compare_lean(n_requests_list=(500, 2000, 8000), variant="FLEX", n_lines=30, seed=0):
+    """Per ogni dimensione confronta tempo di costruzione e picco di RSS delle tre modalità"""
+    rows = []
+    for n_requests in n_requests_list:
+        data = make_synthetic_instance(n_lines=n_lines, n_requests=n_requests, grid_size=40, seed=seed)
+        for mode in MODES:
+            n_vars, n_constrs, t_build, rss = _run_child(_child_build, variant, mode, data)
+            rows.append({"requests": n_requests, "mode": mode, "vars": n_vars, "constrs": n_constrs,
+                         "build_s": t_build, "rss_MB": rss})
+
+    print(f"\n{'requests':>9}{'mode':>14}{'vars':>10}{'constrs':>10}{'build [s]':>11}{'RSS [MB]':>10}")
+    for r in rows:
+        print(f"{r['requests']:>9}{r['mode']:>14}{r['vars']:>10}{r['constrs']:>10}"
+              f"{r['build_s']:>11.3f}{r['rss_MB']:>10.1f}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    compare_lean()
@@ -0,0 +1,58 @@
+### Benchmark: arrotondamento del rilassamento continuo (MBA_LPRounding) vs euristica costruttiva vs MIP
+### gap: (obj - bound LP) / obj, dimostrato senza conoscere l'ottimo
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_lp_rounding
+
+import time
+from gurobipy import GurobiError
+from utils.f_for_data import load_instance
+from models.pipeline_mba import CASCADE
+from models.heuristic_mba import MBA_Heuristic, MBA_LPRounding
+from benchmarks.bench_heuristic import run_mip
+from benchmarks.synthetic_instance import make_synthetic_instance
+
+
+
+def compare_lp_rounding(instances, variants=CASCADE, time_limit=600, threads=1):
+    """instances: {nome: data}"""
+    rows = []
+    for name, data in instances.items():
+        for variant in variants:
+            t0 = time.perf_counter()
+            rounding = MBA_LPRounding(data, variant)
+            try:
+                rounding.build()
+                lp = rounding.solve()
+            except GurobiError as e:      # es. licenza limitata
+                lp = {"obj": None, "gap": None, "error": e.errno}
+            lp["total_s"] = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            heur = MBA_Heuristic(data, variant)
+            heur.build()
+            greedy = heur.solve()
+            greedy["total_s"] = time.perf_counter() - t0
+            mip = run_mip(data, variant, None, time_limit, threads)
+            rows.append({"instance": name, "variant": variant, "lp": lp, "greedy": greedy, "mip": mip})
+
+    fmt = lambda v, spec: format(v, spec) if v is not None else format("-", spec.split(".")[0])
+    print(f"\n{'instance':<10}{'variant':>8}{'LP-round obj':>14}{'gap':>8}{'[s]':>9}{'greedy obj':>13}{'[s]':>9}"
+          f"{'MIP obj':>13}{'MIP [s]':>10}")
+    for r in rows:
+        lp, g, m = r["lp"], r["greedy"], r["mip"]
+        print(f"{r['instance']:<10}{r['variant']:>8}{fmt(lp['obj'], '>14.2f')}{fmt(lp['gap'], '>8.2%')}"
+              f"{lp['total_s']:>9.4f}{g['obj']:>13.2f}{g['total_s']:>9.4f}{fmt(m['obj'], '>13.2f')}"
+              f"{fmt(m['runtime_s'], '>10.4f')}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {}
+    for name in ["cross", "grid", "city"]:
+        try:
+            instances[name], _ = load_instance(name)
+        except Exception as e:
+            print(f"⚠️ Istanza {name} non caricata: {e}")
+    for n_requests in (50, 800):
+        instances[f"synth{n_requests}"] = make_synthetic_instance(n_lines=10, n_requests=n_requests, seed=0)
+    compare_lp_rounding(instances)
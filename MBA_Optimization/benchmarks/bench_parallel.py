@@ -0,0 +1,64 @@
+### Benchmark: RIGID / SEMI / FLEX in sequenza vs in processi paralleli con budget di Threads
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_parallel
+
+import contextlib
+import io
+import os
+import time
+from utils.f_for_data import load_instance
+from models.pipeline_mba import CASCADE, MODELS, solve_parallel
+
+
+
+def time_sequential(data, cores):
+    """Varianti risolte una dopo l'altra, ognuna con tutti i core"""
+    t0 = time.perf_counter()
+    objs = {}
+    for variant in CASCADE:
+        mba = MODELS[variant](data)
+        mba.build()
+        mba.model.Params.OutputFlag = 0
+        mba.model.Params.Threads = cores
+        with contextlib.redirect_stdout(io.StringIO()):
+            mba.solve()
+        objs[variant] = mba.model.ObjVal if mba.model.SolCount > 0 else None
+        mba.model.dispose()
+    return time.perf_counter() - t0, objs
+
+
+def time_parallel(data, cores):
+    """Varianti in processi separati, Threads divisi con split_threads"""
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = solve_parallel(data, cores=cores, params={"OutputFlag": 0})
+    return time.perf_counter() - t0, {v: r.stats["obj"] for v, r in results.items()}
+
+
+
+def compare_parallel(instances, cores=None):
+    cores = cores or os.cpu_count() or 1
+    rows = []
+    for name, data in instances.items():
+        t_seq, obj_seq = time_sequential(data, cores)
+        t_par, obj_par = time_parallel(data, cores)
+        same = all(obj_seq[v] is None or abs(obj_seq[v] - obj_par[v]) <= 1e-6 * max(1.0, abs(obj_seq[v]))
+                   for v in CASCADE)
+        rows.append({"instance": name, "sequential_s": t_seq, "parallel_s": t_par, "same_obj": same})
+
+    print(f"\ncores = {cores}")
+    print(f"{'instance':<10}{'sequential [s]':>16}{'parallel [s]':>14}{'same obj':>10}")
+    for r in rows:
+        print(f"{r['instance']:<10}{r['sequential_s']:>16.3f}{r['parallel_s']:>14.3f}{str(r['same_obj']):>10}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {}
+    for name in ["cross", "grid", "city"]:
+        try:
+            instances[name], _ = load_instance(name)
+        except Exception as e:
+            print(f"⚠️ Istanza {name} non caricata: {e}")
+    compare_parallel(instances)
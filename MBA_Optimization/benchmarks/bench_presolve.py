@@ -0,0 +1,74 @@
+### Benchmark: modello con e senza presolve delle assegnazioni (presolve_assignments)
+### Dimensioni (variabili / righe), tempi di costruzione e risoluzione, obiettivo
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_presolve
+
+import contextlib
+import io
+import time
+from gurobipy import GurobiError
+from utils.f_for_data import load_instance, presolve_assignments
+from models.pipeline_mba import MODELS, CASCADE
+from benchmarks.synthetic_instance import make_synthetic_instance
+
+
+
+def run_variant(data, variant, time_limit, threads):
+    t0 = time.perf_counter()
+    mba = MODELS[variant](data)
+    mba.build()
+    mba.model.update()
+    out = {"vars": mba.model.NumVars, "rows": mba.model.NumConstrs, "build_s": time.perf_counter() - t0}
+    mba.model.Params.OutputFlag = 0
+    mba.model.Params.TimeLimit = time_limit
+    mba.model.Params.Threads = threads
+    t1 = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            mba.solve()
+        out["obj"] = mba.model.ObjVal if mba.model.SolCount > 0 else None
+    except GurobiError as e:          # es. licenza limitata
+        out.update({"obj": None, "error": e.errno})
+    out["solve_s"] = time.perf_counter() - t1
+    mba.model.dispose()
+    return out
+
+
+
+def compare_presolve(instances, variants=CASCADE, time_limit=600, threads=1):
+    """instances: {nome: data}. data non viene modificato (presolve su una copia)."""
+    rows = []
+    for name, data in instances.items():
+        reduced = dict(data)
+        t0 = time.perf_counter()
+        ps = presolve_assignments(reduced, verbose=False)
+        presolve_s = time.perf_counter() - t0
+        print(f"{name}: x {ps['stats']['x_before']} -> {ps['stats']['x_after']}, "
+              f"z {ps['stats']['z_before']} -> {ps['stats']['z_after']}, presolve {presolve_s:.3f}s")
+        for variant in variants:
+            rows.append({"instance": name, "variant": variant,
+                         "full": run_variant(data, variant, time_limit, threads),
+                         "presolved": run_variant(reduced, variant, time_limit, threads)})
+
+    fmt = lambda v, spec: format(v, spec) if v is not None else format("-", spec.split(".")[0])
+    print(f"\n{'instance':<10}{'variant':>8}{'vars':>8}{'rows':>8}{'build':>8}{'solve':>8}{'obj':>13}"
+          f"{'| vars':>8}{'rows':>8}{'build':>8}{'solve':>8}{'obj':>13}")
+    for r in rows:
+        f, p = r["full"], r["presolved"]
+        print(f"{r['instance']:<10}{r['variant']:>8}{f['vars']:>8}{f['rows']:>8}{f['build_s']:>8.3f}"
+              f"{f['solve_s']:>8.3f}{fmt(f['obj'], '>13.2f')}{p['vars']:>8}{p['rows']:>8}"
+              f"{p['build_s']:>8.3f}{p['solve_s']:>8.3f}{fmt(p['obj'], '>13.2f')}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {}
+    for name in ["cross", "grid", "city"]:
+        try:
+            instances[name], _ = load_instance(name)
+        except Exception as e:
+            print(f"⚠️ Istanza {name} non caricata: {e}")
+    for n_requests in (50, 200, 800):
+        instances[f"synth{n_requests}"] = make_synthetic_instance(n_lines=10, n_requests=n_requests, seed=0)
+    compare_presolve(instances)
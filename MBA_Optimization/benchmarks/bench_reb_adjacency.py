@@ -0,0 +1,63 @@
+### Benchmark: v_in / v_out del vincolo (5) FLEX tramite scansione di v vs adiacenze R_in / R_out
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_reb_adjacency
+
+import time
+from benchmarks.synthetic_instance import make_synthetic_instance
+from models.models_mba import MBA_ILP_FLEX
+
+
+
+def flow_terms_by_scan(data):
+    """Vecchio vincolo (5): per ogni nodo di T∪J si scorrono tutte le chiavi di v -> O(|T∪J|³)"""
+    v = dict.fromkeys(data["R"])
+    out = {}
+    for j in (set(data["J"]) | set(data["T"])):
+        v_in  = [(i, j) for (i, j2) in v if j2 == j]
+        v_out = [(j, h) for (j2, h) in v if j2 == j]
+        out[j] = (v_in, v_out)
+    return out
+
+
+def flow_terms_by_adjacency(data):
+    """Nuovo vincolo (5): liste di adiacenza di R -> O(|R|)"""
+    R_in, R_out = data["R_in"], data["R_out"]
+    out = {}
+    for j in (set(data["J"]) | set(data["T"])):
+        v_in  = [(i, j) for i in R_in.get(j, [])]
+        v_out = [(j, m) for m in R_out.get(j, [])]
+        out[j] = (v_in, v_out)
+    return out
+
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - t0, out
+
+
+
+def scaling(n_lines_list=(5, 10, 20, 40, 80), n_requests=50, seed=0):
+    """Tempi del vincolo (5) e di build() FLEX al crescere di |T∪J|"""
+    rows = []
+    for n_lines in n_lines_list:
+        data = make_synthetic_instance(n_lines=n_lines, n_requests=n_requests,
+                                       grid_size=max(10, 2 * n_lines), seed=seed)
+        t_scan, by_scan = _timed(flow_terms_by_scan, data)
+        t_adj, by_adj = _timed(flow_terms_by_adjacency, data)
+        assert by_scan == by_adj
+        mba = MBA_ILP_FLEX(data)
+        t_build, _ = _timed(mba.build)
+        rows.append({"lines": n_lines, "TJ": len(set(data["J"]) | set(data["T"])), "R": len(data["R"]),
+                     "scan_s": t_scan, "adj_s": t_adj, "build_s": t_build})
+
+    print(f"\n{'lines':>6}{'|T∪J|':>8}{'|R|':>9}{'scan v [s]':>12}{'R_in/out [s]':>14}{'build() [s]':>13}")
+    for r in rows:
+        print(f"{r['lines']:>6}{r['TJ']:>8}{r['R']:>9}{r['scan_s']:>12.4f}{r['adj_s']:>14.4f}{r['build_s']:>13.4f}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    scaling()
@@ -0,0 +1,67 @@
+### Benchmark: RIGID con w per segmento + righe constW vs RIGID con una w per linea (MBA_ILP_RIGID_LINE)
+### Variabili intere, righe, tempi di build / solve e obiettivo
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_rigid_line
+
+import contextlib
+import io
+import time
+from gurobipy import GurobiError
+from utils.f_for_data import load_instance
+from models.models_mba import MBA_ILP_RIGID, MBA_ILP_RIGID_LINE
+from benchmarks.synthetic_instance import make_synthetic_instance
+
+
+
+def run_rigid(cls, data, time_limit, threads):
+    t0 = time.perf_counter()
+    mba = cls(data)
+    mba.build()
+    mba.model.update()
+    out = {"int_vars": mba.model.NumIntVars, "rows": mba.model.NumConstrs, "build_s": time.perf_counter() - t0}
+    mba.model.Params.OutputFlag = 0
+    mba.model.Params.TimeLimit = time_limit
+    mba.model.Params.Threads = threads
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            mba.solve()
+        out["obj"] = mba.model.ObjVal if mba.model.SolCount > 0 else None
+        out["solve_s"] = mba.model.Runtime
+    except GurobiError as e:          # es. licenza limitata
+        out.update({"obj": None, "solve_s": None, "error": e.errno})
+    mba.model.dispose()
+    return out
+
+
+
+def compare_rigid(instances, time_limit=600, threads=1):
+    """instances: {nome: data}"""
+    rows = []
+    for name, data in instances.items():
+        rows.append({"instance": name,
+                     "segment": run_rigid(MBA_ILP_RIGID, data, time_limit, threads),
+                     "line": run_rigid(MBA_ILP_RIGID_LINE, data, time_limit, threads)})
+
+    fmt = lambda v, spec: format(v, spec) if v is not None else format("-", spec.split(".")[0])
+    print(f"\n{'instance':<10}{'int':>8}{'rows':>8}{'build':>8}{'solve':>8}{'obj':>13}"
+          f"{'| int':>8}{'rows':>8}{'build':>8}{'solve':>8}{'obj':>13}")
+    for r in rows:
+        s, l = r["segment"], r["line"]
+        print(f"{r['instance']:<10}{s['int_vars']:>8}{s['rows']:>8}{s['build_s']:>8.3f}{fmt(s['solve_s'], '>8.3f')}"
+              f"{fmt(s['obj'], '>13.2f')}{l['int_vars']:>8}{l['rows']:>8}{l['build_s']:>8.3f}"
+              f"{fmt(l['solve_s'], '>8.3f')}{fmt(l['obj'], '>13.2f')}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {}
+    for name in ["cross", "grid", "city"]:
+        try:
+            instances[name], _ = load_instance(name)
+        except Exception as e:
+            print(f"⚠️ Istanza {name} non caricata: {e}")
+    for n_lines in (5, 20, 80):
+        instances[f"synth{n_lines}"] = make_synthetic_instance(n_lines=n_lines, n_requests=60,
+                                                               grid_size=max(10, 2 * n_lines), seed=0)
+    compare_rigid(instances)
@@ -0,0 +1,79 @@
+### Benchmark: rolling horizon su un modello riusato vs finestre ricostruite da zero
+### (e piano unico sul picco della giornata, window = tutti i periodi)
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_rolling
+
+import contextlib
+import io
+import random
+import time
+from models.pipeline_mba import MODELS, CASCADE
+from models.rolling_mba import MBA_RollingHorizon
+from benchmarks.synthetic_instance import make_synthetic_instance
+
+
+PROFILE = (0.4, 1.0, 1.6, 1.1, 0.7, 0.8, 1.5, 1.2, 0.5)     # fasce orarie: mattina, picchi, sera
+
+
+
+def period_demand(data, profile=PROFILE, seed=0):
+    """Domanda per periodo: p_k scalato dal profilo con rumore ±30%"""
+    rng = random.Random(seed)
+    return {f"t{n}": {k: max(0, round(data["p"][k] * f * rng.uniform(0.7, 1.3))) for k in data["K"]}
+            for n, f in enumerate(profile)}
+
+
+
+def run_reused(data, demand, variant, window, step):
+    t0 = time.perf_counter()
+    rh = MBA_RollingHorizon(data, demand, variant, window=window, step=step)
+    rh.build()
+    rh.mba.model.Params.OutputFlag = 0
+    rh.mba.model.Params.Threads = 1
+    st = rh.solve()
+    return {"cost": st["plan_cost"], "windows": len(st["windows"]), "total_s": time.perf_counter() - t0}
+
+
+def run_rebuilt(data, demand, variant, window, step):
+    """Stesse finestre, ma un modello nuovo (build da zero) per ognuna"""
+    t0 = time.perf_counter()
+    rh = MBA_RollingHorizon(data, demand, variant, window=window, step=step)
+    cost = 0.0
+    for periods, committed in rh.windows():
+        d = dict(data)
+        d["p"] = {k: max(demand[t].get(k, 0) for t in periods) for k in data["K"]}
+        mba = MODELS[variant](d)
+        mba.build()
+        mba.model.Params.OutputFlag = 0
+        mba.model.Params.Threads = 1
+        with contextlib.redirect_stdout(io.StringIO()):
+            mba.solve()
+        cost += mba.model.ObjVal * len(committed)
+        mba.model.dispose()
+    return {"cost": cost, "total_s": time.perf_counter() - t0}
+
+
+
+def compare_rolling(instances, variants=CASCADE, window=2, step=1):
+    """instances: {nome: data}"""
+    rows = []
+    for name, data in instances.items():
+        demand = period_demand(data)
+        for variant in variants:
+            rows.append({"instance": name, "variant": variant,
+                         "reused": run_reused(data, demand, variant, window, step),
+                         "rebuilt": run_rebuilt(data, demand, variant, window, step),
+                         "peak": run_reused(data, demand, variant, len(demand), len(demand))})
+
+    print(f"\n{'instance':<10}{'variant':>8}{'windows':>9}{'reused [s]':>12}{'rebuilt [s]':>13}"
+          f"{'plan cost':>13}{'peak-only cost':>16}")
+    for r in rows:
+        print(f"{r['instance']:<10}{r['variant']:>8}{r['reused']['windows']:>9}{r['reused']['total_s']:>12.3f}"
+              f"{r['rebuilt']['total_s']:>13.3f}{r['reused']['cost']:>13.2f}{r['peak']['cost']:>16.2f}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {f"synth{n}": make_synthetic_instance(n_lines=5, n_requests=n, seed=1) for n in (20, 40, 60)}
+    compare_rolling(instances)
@@ -0,0 +1,77 @@
+### Benchmark: batch di scenari di domanda su un modello riusato (MBA_Scenarios) vs un modello per scenario
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_scenarios
+
+import contextlib
+import io
+import random
+import time
+import pandas as pd
+from models.pipeline_mba import MODELS, CASCADE
+from models.scenarios_mba import MBA_Scenarios
+from benchmarks.synthetic_instance import make_synthetic_instance
+
+
+
+def demand_profiles(data, n_scenarios=12, seed=0):
+    """Scenari: p_k scalato da un fattore globale (0.5-1.5) con rumore ±30% per richiesta"""
+    rng = random.Random(seed)
+    profiles = {}
+    for n in range(n_scenarios):
+        f = rng.uniform(0.5, 1.5)
+        profiles[f"s{n}"] = {k: max(0, round(data["p"][k] * f * rng.uniform(0.7, 1.3))) for k in data["K"]}
+    return pd.DataFrame(profiles)
+
+
+
+def run_batch(data, profiles, variant):
+    t0 = time.perf_counter()
+    sc = MBA_Scenarios(data, profiles, variant)
+    sc.build()
+    sc.mba.model.Params.OutputFlag = 0
+    sc.mba.model.Params.Threads = 1
+    table = sc.solve()
+    return {"obj": table["obj"].tolist(), "total_s": time.perf_counter() - t0}
+
+
+def run_rebuilt(data, profiles, variant):
+    t0 = time.perf_counter()
+    objs = []
+    for scenario in profiles.columns:
+        d = dict(data)
+        d["p"] = profiles[scenario].to_dict()
+        mba = MODELS[variant](d)
+        mba.build()
+        mba.model.Params.OutputFlag = 0
+        mba.model.Params.Threads = 1
+        with contextlib.redirect_stdout(io.StringIO()):
+            mba.solve()
+        objs.append(mba.model.ObjVal if mba.model.SolCount > 0 else None)
+        mba.model.dispose()
+    return {"obj": objs, "total_s": time.perf_counter() - t0}
+
+
+
+def compare_scenarios(instances, variants=CASCADE, n_scenarios=12, tol=1e-4):
+    """instances: {nome: data}. tol: differenza relativa ammessa tra gli obiettivi (MIPGap di default)"""
+    rows = []
+    for name, data in instances.items():
+        profiles = demand_profiles(data, n_scenarios)
+        for variant in variants:
+            batch, rebuilt = run_batch(data, profiles, variant), run_rebuilt(data, profiles, variant)
+            same = sum(a is not None and b is not None and abs(a - b) <= tol * max(1.0, abs(b))
+                       for a, b in zip(batch["obj"], rebuilt["obj"]))
+            rows.append({"instance": name, "variant": variant, "batch": batch, "rebuilt": rebuilt, "same": same})
+
+    print(f"\n{'instance':<10}{'variant':>8}{'scenarios':>11}{'batch [s]':>11}{'rebuilt [s]':>13}{'speedup':>9}{'same obj':>10}")
+    for r in rows:
+        b, f = r["batch"]["total_s"], r["rebuilt"]["total_s"]
+        print(f"{r['instance']:<10}{r['variant']:>8}{n_scenarios:>11}{b:>11.3f}{f:>13.3f}{f / b:>9.2f}"
+              f"{r['same']:>7}/{n_scenarios}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {f"synth{n}": make_synthetic_instance(n_lines=5, n_requests=n, seed=1) for n in (20, 40, 60)}
+    compare_scenarios(instances)
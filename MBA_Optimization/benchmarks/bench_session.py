@@ -0,0 +1,86 @@
+### Benchmark: modifica di una richiesta con MBA_Session vs ricostruzione completa del modello
+### Per ogni operazione (add / update / remove): tempo della modifica, della riottimizzazione e del rebuild
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_session
+
+import contextlib
+import copy
+import io
+import time
+from gurobipy import GurobiError
+from models.pipeline_mba import MODELS
+from models.session_mba import MBA_Session
+from benchmarks.synthetic_instance import make_synthetic_instance
+
+
+
+def _solve(model):
+    """Tempo di optimize() (None se la licenza non basta)"""
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            model.optimize()
+    except GurobiError:
+        return None
+    return model.Runtime
+
+
+def rebuild(data, variant):
+    t0 = time.perf_counter()
+    mba = MODELS[variant](copy.deepcopy(data))
+    mba.build()
+    mba.model.Params.OutputFlag = 0
+    mba.model.Params.Threads = 1
+    mba.model.update()
+    out = {"build_s": time.perf_counter() - t0, "solve_s": _solve(mba.model)}
+    mba.model.dispose()
+    return out
+
+
+
+def compare_session(n_requests_list=(40, 200, 1000), variant="FLEX", n_lines=5, seed=1):
+    rows = []
+    for n_requests in n_requests_list:
+        data = make_synthetic_instance(n_lines=n_lines, n_requests=n_requests + 1, seed=seed)
+        k_new = data["K"][-1]
+        path, p = data["Pk"][k_new], data["p"][k_new]
+        base = copy.deepcopy(data)                    # istanza senza l'ultima richiesta
+        base["K"].pop()
+        for name in ("p", "Pk"):
+            del base[name][k_new]
+        base["Akl"] = {key: v for key, v in base["Akl"].items() if key[0] != k_new}
+        base["Blk"] = {key: v for key, v in base["Blk"].items() if key[1] != k_new}
+        base.pop("arc_req", None)
+
+        mba = MODELS[variant](base)
+        mba.build()
+        mba.model.Params.OutputFlag = 0
+        mba.model.Params.Threads = 1
+        session = MBA_Session(mba)
+        licensed = _solve(mba.model) is not None
+        if licensed:
+            session.previous = mba.get_solution()
+
+        k_first = base["K"][0]
+        for op, change in (("add", lambda: session.add_request(k_new, path, p)),
+                           ("update", lambda: session.update_passengers(k_first, 2 * base["p"][k_first])),
+                           ("remove", lambda: session.remove_request(k_new))):
+            t0 = time.perf_counter()
+            change()
+            mba.model.update()
+            modify_s = time.perf_counter() - t0
+            resolve_s = session.solve()["runtime_s"] if licensed else None
+            rows.append({"K": n_requests, "op": op, "modify_s": modify_s, "resolve_s": resolve_s,
+                         **rebuild(session.data, variant)})
+        mba.model.dispose()
+
+    fmt = lambda v, spec: format(v, spec) if v is not None else format("-", spec.split(".")[0])
+    print(f"\n{'|K|':>6}{'op':>8}{'modify [s]':>12}{'resolve [s]':>13}{'rebuild [s]':>13}{'solve [s]':>11}")
+    for r in rows:
+        print(f"{r['K']:>6}{r['op']:>8}{r['modify_s']:>12.4f}{fmt(r['resolve_s'], '>13.4f')}"
+              f"{r['build_s']:>13.4f}{fmt(r['solve_s'], '>11.4f')}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    compare_session()
@@ -0,0 +1,73 @@
+### Benchmark: tre build() indipendenti vs un solo core + derive() delle varianti
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_shared_core
+
+import time
+from utils.f_for_data import load_instance
+from models.models_mba import MBA_ILP_RIGID, MBA_ILP_SEMI, MBA_ILP_FLEX, build_all_variants
+
+
+MODELS = (MBA_ILP_RIGID, MBA_ILP_SEMI, MBA_ILP_FLEX)
+
+
+
+def time_separate(data):
+    """Tre modelli costruiti da zero (come nei vecchi main_*.py)"""
+    t0 = time.perf_counter()
+    models = []
+    for cls in MODELS:
+        mba = cls(data)
+        mba.build()
+        mba.model.update()
+        models.append(mba)
+    elapsed = time.perf_counter() - t0
+    for mba in models:
+        mba.model.dispose()
+    return elapsed
+
+
+def time_single(data, cls=MBA_ILP_FLEX):
+    """Un solo modello, come riferimento"""
+    t0 = time.perf_counter()
+    mba = cls(data)
+    mba.build()
+    mba.model.update()
+    elapsed = time.perf_counter() - t0
+    mba.model.dispose()
+    return elapsed
+
+
+def time_shared(data):
+    """Core una volta + tre varianti derivate"""
+    t0 = time.perf_counter()
+    models = build_all_variants(data)
+    for mba in models.values():
+        mba.model.update()
+    elapsed = time.perf_counter() - t0
+    for mba in models.values():
+        mba.model.dispose()
+    return elapsed
+
+
+
+def compare_shared_core(instances):
+    rows = []
+    for name, data in instances.items():
+        rows.append({"instance": name, "one_s": time_single(data),
+                     "separate_s": time_separate(data), "shared_s": time_shared(data)})
+
+    print(f"\n{'instance':<12}{'1 model [s]':>13}{'3 separate [s]':>16}{'core+3 [s]':>12}")
+    for r in rows:
+        print(f"{r['instance']:<12}{r['one_s']:>13.4f}{r['separate_s']:>16.4f}{r['shared_s']:>12.4f}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {}
+    for name in ["cross", "grid", "city"]:
+        try:
+            instances[name], _ = load_instance(name)
+        except Exception as e:
+            print(f"⚠️ Istanza {name} non caricata: {e}")
+    compare_shared_core(instances)
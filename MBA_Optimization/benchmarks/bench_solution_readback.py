@@ -0,0 +1,61 @@
+### Benchmark: lettura della soluzione tramite VarName vs getAttr in blocco
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_solution_readback
+
+import time
+from gurobipy import GRB
+from benchmarks.synthetic_instance import make_synthetic_instance
+from models.models_mba import MBA_ILP_FLEX
+
+
+
+def solution_by_varname(model):
+    """Vecchia estrazione: v.X e split di v.VarName per ogni variabile del modello"""
+    x_sol, w_sol, z_sol, v_sol = {}, {}, {}, {}
+    for v in model.getVars():
+        if v.VarName.startswith("x") and v.X > 1e-6:
+            _, k, i, j, ell = v.VarName.split("_")
+            x_sol[(int(k), int(i), int(j), ell)] = 1
+        elif v.VarName.startswith("w") and v.X > 1e-6:
+            _, ell, h = v.VarName.split("_")
+            w_sol[(ell, int(h))] = int(round(v.X))
+        elif v.VarName.startswith("z") and v.X > 1e-6:
+            _, k, j = v.VarName.split("_")
+            z_sol[(int(k), int(j))] = 1
+        elif v.VarName.startswith("v") and v.X > 1e-6:
+            _, i, j = v.VarName.split("_")
+            v_sol[(int(i), int(j))] = int(round(v.X))
+    return x_sol, w_sol, z_sol, v_sol
+
+
+
+def compare_readback(n_lines=6, n_requests=40, repeat=5, seed=0):
+    """Risolve un'istanza FLEX e confronta i due modi di leggere la soluzione"""
+    data = make_synthetic_instance(n_lines=n_lines, n_requests=n_requests, seed=seed)
+    mba = MBA_ILP_FLEX(data)
+    mba.build()
+    mba.model.Params.OutputFlag = 0
+    mba.model.optimize()
+    if mba.model.Status != GRB.OPTIMAL:
+        print(f"⚠️ Status {mba.model.Status}: niente soluzione da leggere")
+        return None
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        old = solution_by_varname(mba.model)
+    t_old = (time.perf_counter() - t0) / repeat
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        new = mba.get_solution()
+    t_new = (time.perf_counter() - t0) / repeat
+
+    assert old == new
+    print(f"\nvars={mba.model.NumVars}  VarName: {t_old:.4f}s  getAttr: {t_new:.4f}s  "
+          f"speedup x{t_old / max(t_new, 1e-12):.1f}")
+    return {"vars": mba.model.NumVars, "varname_s": t_old, "getattr_s": t_new}
+
+
+
+if __name__ == "__main__":
+    compare_readback()
@@ -0,0 +1,86 @@
+### Benchmark: variabili x ristrette ai path Pk[k] (vs prodotto completo K × A)
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_sparse_x
+
+import multiprocessing as mp
+import resource
+from gurobipy import Model, GRB
+from utils.f_for_data import load_instance, path_x_keys
+from models.models_mba import MBA_ILP_RIGID, MBA_ILP_SEMI, MBA_ILP_FLEX
+
+
+MODELS = {"RIGID": MBA_ILP_RIGID, "SEMI": MBA_ILP_SEMI, "FLEX": MBA_ILP_FLEX}
+
+
+
+def _rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # Linux: KB -> MB
+
+
+def _child_build(variant, data, queue):
+    """Costruisce il modello in un processo separato e misura il picco di RSS"""
+    rss0 = _rss_mb()
+    mba = MODELS[variant](data)
+    mba.build()
+    mba.model.update()
+    queue.put((mba.model.NumVars, _rss_mb() - rss0))
+
+
+def _child_dense_x(data, queue):
+    """Solo il blocco x completo K × A (come nel vecchio build()), per confronto"""
+    rss0 = _rss_mb()
+    model = Model("dense_x")
+    x = {}
+    for k in data["K"]:
+        for (i, j, l) in data["A"]:
+            x[k, i, j, l] = model.addVar(vtype=GRB.BINARY, name=f"x_{k}_{i}_{j}_{l}")
+    model.update()
+    queue.put((len(x), _rss_mb() - rss0))
+
+
+def _run_child(target, *args):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=target, args=(*args, queue))
+    proc.start()
+    out = queue.get()
+    proc.join()
+    return out
+
+
+
+def compare_sparse_x(instances, variant="FLEX"):
+    """
+    instances: {nome: data}. Per ogni istanza confronta il numero di x e il picco di memoria
+    del build() attuale (x ristrette ai path) con il solo blocco x completo K × A.
+    """
+    rows = []
+    for name, data in instances.items():
+        n_x_sparse = len(path_x_keys(data["K"], data["Pk"], data["L_ij"]))
+        n_vars, rss_build = _run_child(_child_build, variant, data)
+        n_x_dense, rss_dense_x = _run_child(_child_dense_x, data)
+        n_other = n_vars - n_x_sparse
+        rows.append({
+            "instance": name,
+            "x_dense": n_x_dense, "x_sparse": n_x_sparse,
+            "vars_dense": n_x_dense + n_other, "vars_sparse": n_vars,
+            "rss_build_MB": rss_build, "rss_dense_x_MB": rss_dense_x,
+        })
+
+    print(f"\n{'instance':<10}{'x (K×A)':>12}{'x (path)':>10}{'vars before':>13}{'vars after':>12}"
+          f"{'RSS build [MB]':>16}{'RSS x K×A [MB]':>16}")
+    for r in rows:
+        print(f"{r['instance']:<10}{r['x_dense']:>12}{r['x_sparse']:>10}{r['vars_dense']:>13}{r['vars_sparse']:>12}"
+              f"{r['rss_build_MB']:>16.1f}{r['rss_dense_x_MB']:>16.1f}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {}
+    for name in ["cross", "grid", "city"]:
+        try:
+            instances[name], _ = load_instance(name)
+        except Exception as e:
+            print(f"⚠️ Istanza {name} non caricata: {e}")
+    compare_sparse_x(instances)
@@ -0,0 +1,64 @@
+### Benchmark: parameter_sweep (modelli costruiti una volta) vs un build + solve da zero per ogni punto
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_sweep
+
+import contextlib
+import io
+import itertools
+import time
+from models.pipeline_mba import MODELS, CASCADE
+from models.sweep_mba import parameter_sweep
+from benchmarks.synthetic_instance import make_synthetic_instance
+
+
+GRID = {"Q": [6, 8, 10], "alpha": [0.05, 0.1, 0.5], "speed_lines": [25, 35], "speed_reb": [30, 40]}
+
+
+
+def sweep_from_scratch(data, grid, variants=CASCADE, base_speeds=(35, 40)):
+    """Come rilanciare lo script per ogni punto: nuovi data e nuovi modelli"""
+    t0 = time.perf_counter()
+    names = list(grid)
+    objs = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        point = dict(zip(names, values))
+        d = dict(data)
+        d["Q"], d["alpha"] = point["Q"], point["alpha"]
+        d["t"] = {key: val * base_speeds[0] / point["speed_lines"] for key, val in data["t"].items()}
+        d["tr"] = {key: val * base_speeds[1] / point["speed_reb"] for key, val in data["tr"].items()}
+        for variant in variants:
+            mba = MODELS[variant](d)
+            mba.build()
+            mba.model.Params.OutputFlag = 0
+            with contextlib.redirect_stdout(io.StringIO()):
+                mba.solve()
+            objs.append(mba.model.ObjVal)
+            mba.model.dispose()
+    return objs, time.perf_counter() - t0
+
+
+
+def compare_sweep(instances, grid=GRID):
+    """instances: {nome: data}"""
+    rows = []
+    for name, data in instances.items():
+        t0 = time.perf_counter()
+        table = parameter_sweep(data, grid)
+        sweep_s = time.perf_counter() - t0
+        objs, scratch_s = sweep_from_scratch(data, grid)
+        # stesso ottimo a meno della tolleranza MIPGap di default (1e-4)
+        same = all(abs(a - b) <= 1e-4 * max(1.0, abs(b)) for a, b in zip(table["obj"], objs))
+        rows.append({"instance": name, "points": len(table), "sweep_s": sweep_s,
+                     "scratch_s": scratch_s, "same_obj": same})
+
+    print(f"\n{'instance':<10}{'runs':>6}{'sweep [s]':>11}{'scratch [s]':>13}{'speedup':>9}{'same obj':>10}")
+    for r in rows:
+        print(f"{r['instance']:<10}{r['points']:>6}{r['sweep_s']:>11.3f}{r['scratch_s']:>13.3f}"
+              f"{r['scratch_s'] / r['sweep_s']:>9.2f}{str(r['same_obj']):>10}")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {f"synth{n}": make_synthetic_instance(n_lines=5, n_requests=n, seed=1) for n in (20, 40, 60)}
+    compare_sweep(instances)
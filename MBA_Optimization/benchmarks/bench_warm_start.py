@@ -0,0 +1,61 @@
+### Benchmark: cascata RIGID -> SEMI -> FLEX a freddo vs con MIP start
+### Uso (dalla cartella MBA_Optimization):
+###     python -m benchmarks.bench_warm_start
+
+import contextlib
+import io
+from utils.f_for_data import load_instance
+from models.models_mba import build_all_variants
+from models.pipeline_mba import solve_cascade, CASCADE
+
+
+
+def run_cascade(data, warm_start, threads=None):
+    """Costruisce le tre varianti e risolve la cascata; ritorna le statistiche di solve_cascade"""
+    models = build_all_variants(data)
+    for mba in models.values():
+        mba.model.Params.OutputFlag = 0
+        if threads is not None:
+            mba.model.Params.Threads = threads
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = solve_cascade(models, warm_start=warm_start)
+    for mba in models.values():
+        mba.model.dispose()
+    return stats
+
+
+
+def compare_warm_start(instances, threads=1):
+    """instances: {nome: data}. Tempo al primo incumbent e tempo totale, a freddo e a caldo"""
+    rows = []
+    for name, data in instances.items():
+        cold = run_cascade(data, warm_start=False, threads=threads)
+        warm = run_cascade(data, warm_start=True, threads=threads)
+        for variant in CASCADE:
+            c, w = cold[variant], warm[variant]
+            assert c["obj"] is None or w["obj"] is None or abs(c["obj"] - w["obj"]) <= 1e-6 * max(1.0, abs(c["obj"]))
+            rows.append({"instance": name, "variant": variant,
+                         "cold_first_s": c.get("first_incumbent_s"), "warm_first_s": w.get("first_incumbent_s"),
+                         "cold_first_obj": c.get("first_incumbent_obj"), "warm_first_obj": w.get("first_incumbent_obj"),
+                         "cold_total_s": c["runtime_s"], "warm_total_s": w["runtime_s"], "obj": w["obj"]})
+
+    print(f"\n{'instance':<10}{'variant':>8}{'1st inc cold':>14}{'1st inc warm':>14}"
+          f"{'1st obj cold':>14}{'1st obj warm':>14}{'total cold':>12}{'total warm':>12}")
+    for r in rows:
+        fmt = lambda v, spec: format(v, spec) if v is not None else "-"
+        print(f"{r['instance']:<10}{r['variant']:>8}{fmt(r['cold_first_s'], '>14.4f')}{fmt(r['warm_first_s'], '>14.4f')}"
+              f"{fmt(r['cold_first_obj'], '>14.1f')}{fmt(r['warm_first_obj'], '>14.1f')}"
+              f"{r['cold_total_s']:>12.4f}{r['warm_total_s']:>12.4f}")
+    print(f"\nTOTAL cold {sum(r['cold_total_s'] for r in rows):.4f}s  warm {sum(r['warm_total_s'] for r in rows):.4f}s")
+    return rows
+
+
+
+if __name__ == "__main__":
+    instances = {}
+    for name in ["cross", "grid", "city"]:
+        try:
+            instances[name], _ = load_instance(name)
+        except Exception as e:
+            print(f"⚠️ Istanza {name} non caricata: {e}")
+    compare_warm_start(instances)
@@ -0,0 +1,79 @@
+### Istanze sintetiche su griglia per i benchmark di scalabilità ###
+### Stessa struttura dei dati "grid" (linee andata/ritorno), ma di dimensione arbitraria
+
+import os
+import json
+import random
+import tempfile
+import pandas as pd
+from utils.f_for_data import load_sets, load_requests, build_delta_sets
+
+
+
+def _random_line(rng, grid_size, n_stops):
+    """Cammino casuale senza ripetizioni sulla griglia (lista di nodi)"""
+    while True:
+        r, c = rng.randrange(grid_size), rng.randrange(grid_size)
+        nodes = [r * grid_size + c]
+        while len(nodes) < n_stops:
+            moves = [(r + dr, c + dc) for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                     if 0 <= r + dr < grid_size and 0 <= c + dc < grid_size
+                     and (r + dr) * grid_size + (c + dc) not in nodes]
+            if not moves:
+                break
+            r, c = rng.choice(moves)
+            nodes.append(r * grid_size + c)
+        if len(nodes) == n_stops:
+            return nodes
+
+
+
+def make_synthetic_instance(n_lines=10, n_stops=12, grid_size=15, n_requests=100,
+                            Q=8, alpha=0.1, seed=0):
+    """
+    Genera linee (andata + ritorno) su una griglia e richieste lungo tratti di linea,
+    poi carica tutto con load_sets / load_requests come per le istanze reali.
+    Tempi t e tr unitari (servono solo per costruire i modelli).
+    """
+    rng = random.Random(seed)
+    lines = []
+    for ref in range(1, n_lines + 1):
+        fwd = _random_line(rng, grid_size, n_stops)
+        lines.append({"route": "bus", "ref": ref, "name": f"Line {ref}",
+                      "geometry": json.dumps(fwd + fwd[-2::-1])})
+
+    stops = sorted({n for line in lines for n in json.loads(line["geometry"])})
+    df_stops = pd.DataFrame({"stop_id": stops, "name": stops, "type": "bus_stop", "node": stops,
+                             "x": [n % grid_size for n in stops], "y": [n // grid_size for n in stops]})
+
+    requests = []
+    for k in range(n_requests):
+        geometry = json.loads(rng.choice(lines)["geometry"])
+        half = (len(geometry) + 1) // 2
+        if rng.random() < 0.5:
+            nodes = geometry[:half]            # andata
+        else:
+            nodes = geometry[half - 1:]        # ritorno
+        a = rng.randrange(len(nodes) - 1)
+        b = rng.randrange(a + 1, len(nodes))
+        requests.append({"request_id": k, "origin": nodes[a], "destination": nodes[b],
+                         "path_nodes": json.dumps(nodes[a:b + 1]),
+                         "avg_passengers_per_time_unit": rng.randint(1, 20)})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lines_csv = os.path.join(tmp, "lines.csv")
+        stops_csv = os.path.join(tmp, "stops.csv")
+        requests_csv = os.path.join(tmp, "requests.csv")
+        pd.DataFrame(lines).to_csv(lines_csv, index=False)
+        df_stops.to_csv(stops_csv, index=False)
+        pd.DataFrame(requests).to_csv(requests_csv, index=False)
+
+        data = load_sets(lines_csv, stops_csv)
+        data["Q"], data["alpha"] = Q, alpha
+        data["t"] = {(l, h): 1.0 for l, segs in data["Nl"].items() for h in range(len(segs))}
+        data["tr"] = {(i, j): 1.0 for (i, j) in data["R"]}
+        K, p, Pk, Akl, Blk = load_requests(requests_csv, data)
+
+    data["K"], data["p"], data["Pk"], data["Akl"], data["Blk"] = K, p, Pk, Akl, Blk
+    data["Delta_plus"], data["Delta_minus"] = build_delta_sets(data["Nl"], data["J"], data["T"])
+    return data
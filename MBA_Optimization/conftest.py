@@ -0,0 +1 @@
+### pytest dalla cartella MBA_Optimization: questo file mette la cartella in sys.path (import models.*, utils.*)
@@ -1,12 +1,15 @@
 from utils.f_for_data import *
 from utils.f_for_results import *
 from models.models_mba import *
+from models.pipeline_mba import *
 from data.demands.demand_creation import *
 from data.bus_lines.city.bus_line_creation_city import *
 
 FLAG_g = 1   # 1 = rigenera le linee (OSM + bus), 0 = usa file esistenti
 FLAG_r = 1   # 1 = rigenera richieste casuali
 FLAG_d = 1   # debug prints
+FLAG_p = 0   # 1 = risolve RIGID/SEMI/FLEX in processi paralleli
+N_CORES = None   # core da dividere tra i processi (None = tutti)
 
 
 
@@ -55,6 +58,9 @@ if __name__ == "__main__":
     # === CAPACITÀ BUS ===
     data["Q"] = 10  # moduli max per linea (es. bus modulari da 10 posti)
 
+    # === ALPHA ===
+    data["alpha"] = 0.1
+
     # === GRAFI ===
     with open(f"data/bus_lines/city/city_{city_clean}_bus_lines_graph.gpickle", "rb") as f:
         G_lines = pickle.load(f)
@@ -110,26 +116,29 @@ if __name__ == "__main__":
         for j in list(set(data["J"]) | set(data["T"]))[:5]:
             print(f"Node {j}: Δ⁺={Delta_plus.get(j, set())}, Δ⁻={Delta_minus.get(j, set())}")
 
-    # === MODELLI ===
-    mba_base = MBA_ILP_BASE(data)
-    mba_base.build()
-    mba_full = MBA_ILP_FULL(data)
-    mba_full.build()
-
-    # === RISOLUZIONE ===
-    print(f"\n============== RISOLUZIONE BASE MODEL ({city_clean}) ==============\n")
-    mba_base.solve()
-    print(f"\n============== RISOLUZIONE FULL MODEL ({city_clean}) ==============\n")
-    mba_full.solve()
+    # === MODELLI + RISOLUZIONE ===
+    if FLAG_p == 1:
+        # RIGID / SEMI / FLEX in processi separati, Threads di Gurobi divisi su N_CORES
+        results = solve_parallel(data, cores=N_CORES, save_to=("results/city", city_clean))
+        mba_rigid, mba_semi, mba_flex = results["RIGID"], results["SEMI"], results["FLEX"]
+    else:
+        # core costruito una volta + varianti derivate, risolte in cascata con MIP start
+        models = build_all_variants(data)
+        mba_rigid, mba_semi, mba_flex = models["RIGID"], models["SEMI"], models["FLEX"]
+        solve_stats = solve_cascade(models, warm_start=True)
 
     # === DISPLAY + SAVE ===
     if FLAG_d:
-        display_results(mba_base, f"{city_clean}_BASE", data)
-    x_base, w_base, z_base = save_results_model(mba_base, f"{city_clean}_BASE", data, G_lines)
+        display_results(mba_rigid, f"{city_clean}_RIGID", data)
+    x_rigid, w_rigid, z_rigid = save_results_model(mba_rigid, f"{city_clean}_RIGID", data, G_lines, "city")
+
+    if FLAG_d:
+        display_results(mba_semi, f"{city_clean}_SEMI", data)
+    x_semi, w_semi, z_semi = save_results_model(mba_semi, f"{city_clean}_SEMI", data, G_lines, "city")
 
     if FLAG_d:
-        display_results(mba_full, f"{city_clean}_FULL", data)
-    x_full, w_full, z_full, v_full = save_results_model(mba_full, f"{city_clean}_FULL", data, G_lines)
+        display_results(mba_flex, f"{city_clean}_FLEX", data)
+    x_flex, w_flex, z_flex, v_flex = save_results_model(mba_flex, f"{city_clean}_FLEX", data, G_lines, "city")
 
     # === OPTIONAL VISUAL COMPARISON ===
-    # plot_comparison_base_full(G_lines, G_reb, w_base, w_full, v_full)
+    # plot_comparison_base_full(G_lines, G_reb, w_rigid, w_flex, v_flex)
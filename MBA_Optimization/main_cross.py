@@ -1,6 +1,7 @@
 from utils.f_for_data import *
 from utils.f_for_results import *
 from models.models_mba import *
+from models.pipeline_mba import *
 from data.demands.demand_creation import *
 from data.bus_lines.cross.bus_line_creation_cross import *
 
@@ -8,6 +9,8 @@ from data.bus_lines.cross.bus_line_creation_cross import *
 FLAG_g = 0  # Re-create the bus lines (YES/NO)
 FLAG_r = 1   # Re-create the requests (YES/NO)
 FLAG_d = 1   # Flag for debug
+FLAG_p = 0   # Solve RIGID/SEMI/FLEX in parallel processes (YES/NO)
+N_CORES = None   # Core budget for the parallel solve (None = all)
 
 if __name__ == "__main__":
 
@@ -148,28 +151,20 @@ if __name__ == "__main__":
 
 
 
-    # === MODEL CREATION ===
-    mba_rigid = MBA_ILP_RIGID(data)
-    mba_rigid.build()
-    mba_semi = MBA_ILP_SEMI(data)
-    mba_semi.build()
-    mba_flex = MBA_ILP_FLEX(data)
-    mba_flex.build()
+    # === MODEL CREATION + OPTIMIZATION ===
+    if FLAG_p == 1:
+        # RIGID / SEMI / FLEX in processi separati, Threads di Gurobi divisi su N_CORES
+        results = solve_parallel(data, cores=N_CORES, save_to=("results/cross", "cross"))
+        mba_rigid, mba_semi, mba_flex = results["RIGID"], results["SEMI"], results["FLEX"]
+    else:
+        # core (x, w, z, vincoli 1-3) costruito una volta, le varianti aggiungono solo le proprie righe
+        models = build_all_variants(data)
+        mba_rigid, mba_semi, mba_flex = models["RIGID"], models["SEMI"], models["FLEX"]
 
+        # RIGID -> SEMI -> FLEX: ogni ottimo è il MIP start della variante successiva
+        print("\n\n\n")
+        solve_stats = solve_cascade(models, warm_start=True)
 
-    # === OPTIMIZATION ===
-    print("\n\n\n")
-    print("\n============== RISOLUZIONE RIGID MODEL ==============\n")
-    mba_rigid.solve()
-    print("\n\n\n")
-    print("============== RISOLUZIONE SEMI MODEL ==============\n")
-    mba_semi.solve()
-    print("\n\n\n")
-    print("\n============== RISOLUZIONE FLEX MODEL ==============\n")
-    mba_flex.solve()
-
-    print("\n\n\n")
-    
 
     # === DISPLAY + SAVE ===
     if FLAG_d == 1:
@@ -1,12 +1,15 @@
 from utils.f_for_data import *
 from utils.f_for_results import *
 from models.models_mba import *
+from models.pipeline_mba import *
 from data.demands.demand_creation import *
 from data.bus_lines.grid.bus_line_creation_grid import *
 
 FLAG_g = 1  # 1 per ricreare il dataset bus lines
 FLAG_r = 1  # 1 per ricreare le richieste
 FLAG_d = 1  # debug print
+FLAG_p = 0  # 1 per risolvere RIGID/SEMI/FLEX in processi paralleli
+N_CORES = None  # core da dividere tra i processi (None = tutti)
 
 if __name__ == "__main__":
 
@@ -95,30 +98,20 @@ if __name__ == "__main__":
 
  
  
-     # === MODEL CREATION ===
-    mba_rigid = MBA_ILP_RIGID(data)
-    mba_rigid.build()
-    mba_semi = MBA_ILP_SEMI(data)
-    mba_semi.build()
-    mba_flex = MBA_ILP_FLEX(data)
-    mba_flex.build()
-
-
-
-
-    # === OPTIMIZATION ===
-    print("\n\n\n")
-    print("\n============== RISOLUZIONE RIGID MODEL ==============\n")
-    mba_rigid.solve()
-    print("\n\n\n")
-    print("============== RISOLUZIONE SEMI MODEL ==============\n")
-    mba_semi.solve()
-    print("\n\n\n")
-    print("\n============== RISOLUZIONE FLEX MODEL ==============\n")
-    mba_flex.solve()
-
-    print("\n\n\n")
-    
+    # === MODEL CREATION + OPTIMIZATION ===
+    if FLAG_p == 1:
+        # RIGID / SEMI / FLEX in processi separati, Threads di Gurobi divisi su N_CORES
+        results = solve_parallel(data, cores=N_CORES, save_to=("results/grid", "grid"))
+        mba_rigid, mba_semi, mba_flex = results["RIGID"], results["SEMI"], results["FLEX"]
+    else:
+        # core (x, w, z, vincoli 1-3) costruito una volta, le varianti aggiungono solo le proprie righe
+        models = build_all_variants(data)
+        mba_rigid, mba_semi, mba_flex = models["RIGID"], models["SEMI"], models["FLEX"]
+
+        # RIGID -> SEMI -> FLEX: ogni ottimo è il MIP start della variante successiva
+        print("\n\n\n")
+        solve_stats = solve_cascade(models, warm_start=True)
+
 
     # === DISPLAY + SAVE ===
     if FLAG_d == 1:
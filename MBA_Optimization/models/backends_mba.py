@@ -0,0 +1,300 @@
+### Backend di risoluzione per i modelli MBA ###
+### I tre modelli (RIGID / SEMI / FLEX) sono definiti una sola volta nella forma matriciale
+### di assemble_mba_matrices; ogni backend riceve le stesse matrici:
+###  - gurobi: gurobipy (default, licenza)
+###  - highs:  highspy
+###  - scipy:  scipy.optimize.milp (HiGHS incluso in SciPy)
+###  - cbc:    OR-Tools pywraplp con CBC
+###  - cpsat:  OR-Tools CP-SAT (richiede coefficienti interi nei vincoli e bound finiti)
+### I pacchetti sono importati solo quando il backend viene usato.
+### NB: highspy e ortools contengono due copie di HiGHS e non vanno caricati nello stesso processo.
+
+import math
+import time
+import numpy as np
+from models.matrix_mba import assemble_mba_matrices
+from models.models_mba import solution_key
+from models.pipeline_mba import MBA_Result
+
+
+
+# === UTILITY COMUNI ===
+def row_bounds(mats):
+    """Sense/rhs -> intervallo [lo, hi] per riga ('<' : (-inf, rhs), '>' : (rhs, inf), '=' : (rhs, rhs))"""
+    sense, rhs = mats["sense"], mats["rhs"]
+    lo = np.where(sense == "<", -np.inf, rhs)
+    hi = np.where(sense == ">", np.inf, rhs)
+    return lo, hi
+
+
+def col_bounds(mats, int_ub=None):
+    """Bound di colonna: binarie in [0, 1], intere in [0, int_ub] (inf se int_ub è None)"""
+    ub = np.where(mats["vtype"] == "B", 1.0, np.inf if int_ub is None else float(int_ub))
+    return mats["lb"], ub
+
+
+def _result(backend, status, obj, values, build_s, runtime_s):
+    return {"backend": backend, "status": status, "obj": obj, "values": values,
+            "build_s": build_s, "runtime_s": runtime_s}
+
+
+
+# === GUROBI ===
+def solve_gurobi(mats, time_limit=None, threads=None, mip_gap=None, int_ub=None, verbose=False):
+    from gurobipy import Model, GRB
+
+    t0 = time.perf_counter()
+    model = Model("MBA_matrix")
+    model.Params.OutputFlag = int(verbose)
+    lb, ub = col_bounds(mats, int_ub)
+    y = model.addMVar(len(mats["obj"]), vtype=mats["vtype"], lb=lb, ub=ub, obj=mats["obj"])
+    model.ModelSense = GRB.MINIMIZE
+    if mats["M"].shape[0] > 0:
+        model.addMConstr(mats["M"], y, mats["sense"], mats["rhs"])
+    if time_limit is not None:
+        model.Params.TimeLimit = time_limit
+    if threads is not None:
+        model.Params.Threads = threads
+    if mip_gap is not None:
+        model.Params.MIPGap = mip_gap
+    model.update()
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    model.optimize()
+    runtime_s = time.perf_counter() - t0
+
+    if model.Status == GRB.OPTIMAL:
+        status = "OPTIMAL"
+    elif model.Status == GRB.INFEASIBLE:
+        status = "INFEASIBLE"
+    else:
+        status = "FEASIBLE" if model.SolCount > 0 else "NO_SOLUTION"
+    has_sol = model.SolCount > 0
+    out = _result("gurobi", status, model.ObjVal if has_sol else None,
+                  np.array(model.getAttr("X")) if has_sol else None, build_s, runtime_s)
+    model.dispose()
+    return out
+
+
+
+# === HiGHS (highspy) ===
+def solve_highs(mats, time_limit=None, threads=None, mip_gap=None, int_ub=None, verbose=False):
+    import highspy
+
+    t0 = time.perf_counter()
+    M = mats["M"].tocsr()
+    lo, hi = row_bounds(mats)
+    lb, ub = col_bounds(mats, int_ub)
+
+    lp = highspy.HighsLp()
+    lp.num_col_, lp.num_row_ = M.shape[1], M.shape[0]
+    lp.col_cost_ = mats["obj"]
+    lp.col_lower_, lp.col_upper_ = lb, ub
+    lp.row_lower_, lp.row_upper_ = lo, hi
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+    lp.a_matrix_.start_, lp.a_matrix_.index_, lp.a_matrix_.value_ = M.indptr, M.indices, M.data
+    lp.integrality_ = [highspy.HighsVarType.kInteger] * M.shape[1]
+
+    h = highspy.Highs()
+    h.setOptionValue("output_flag", verbose)
+    if time_limit is not None:
+        h.setOptionValue("time_limit", float(time_limit))
+    if threads is not None:
+        h.setOptionValue("threads", int(threads))
+    if mip_gap is not None:
+        h.setOptionValue("mip_rel_gap", float(mip_gap))
+    h.passModel(lp)
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    h.run()
+    runtime_s = time.perf_counter() - t0
+
+    model_status = h.getModelStatus()
+    has_sol = h.getInfo().primal_solution_status == 2    # kSolutionStatusFeasible
+    if model_status == highspy.HighsModelStatus.kOptimal:
+        status = "OPTIMAL"
+    elif model_status == highspy.HighsModelStatus.kInfeasible:
+        status = "INFEASIBLE"
+    else:
+        status = "FEASIBLE" if has_sol else "NO_SOLUTION"
+    values = np.array(h.getSolution().col_value) if has_sol else None
+    return _result("highs", status, h.getInfo().objective_function_value if has_sol else None,
+                   values, build_s, runtime_s)
+
+
+
+# === SciPy (scipy.optimize.milp) ===
+def solve_scipy(mats, time_limit=None, threads=None, mip_gap=None, int_ub=None, verbose=False):
+    from scipy.optimize import milp, LinearConstraint, Bounds
+
+    t0 = time.perf_counter()
+    lo, hi = row_bounds(mats)
+    lb, ub = col_bounds(mats, int_ub)
+    constraints = [LinearConstraint(mats["M"], lo, hi)] if mats["M"].shape[0] > 0 else []
+    options = {"disp": verbose}
+    if time_limit is not None:
+        options["time_limit"] = float(time_limit)
+    if mip_gap is not None:
+        options["mip_rel_gap"] = float(mip_gap)
+    build_s = time.perf_counter() - t0     # threads: milp non ha l'opzione
+
+    t0 = time.perf_counter()
+    res = milp(c=mats["obj"], integrality=np.ones(len(mats["obj"])), bounds=Bounds(lb, ub),
+               constraints=constraints, options=options)
+    runtime_s = time.perf_counter() - t0
+
+    status = {0: "OPTIMAL", 2: "INFEASIBLE"}.get(res.status, "FEASIBLE" if res.x is not None else "NO_SOLUTION")
+    return _result("scipy", status, res.fun if res.x is not None else None, res.x, build_s, runtime_s)
+
+
+
+# === OR-Tools CBC ===
+def solve_cbc(mats, time_limit=None, threads=None, mip_gap=None, int_ub=None, verbose=False):
+    from ortools.linear_solver import pywraplp
+
+    t0 = time.perf_counter()
+    solver = pywraplp.Solver.CreateSolver("CBC")
+    if verbose:
+        solver.EnableOutput()
+    inf = solver.infinity()
+    lb, ub = col_bounds(mats, int_ub)
+    cols = [solver.IntVar(float(lb[c]), float(ub[c]) if np.isfinite(ub[c]) else inf, "")
+            for c in range(len(mats["obj"]))]
+
+    lo, hi = row_bounds(mats)
+    M = mats["M"].tocsr()
+    for r in range(M.shape[0]):
+        row = solver.RowConstraint(float(lo[r]) if np.isfinite(lo[r]) else -inf,
+                                   float(hi[r]) if np.isfinite(hi[r]) else inf, "")
+        for c, a in zip(M.indices[M.indptr[r]:M.indptr[r + 1]], M.data[M.indptr[r]:M.indptr[r + 1]]):
+            row.SetCoefficient(cols[c], float(a))
+
+    objective = solver.Objective()
+    for c in np.flatnonzero(mats["obj"]):
+        objective.SetCoefficient(cols[c], float(mats["obj"][c]))
+    objective.SetMinimization()
+    if time_limit is not None:
+        solver.SetTimeLimit(int(time_limit * 1000))
+    if threads is not None:
+        solver.SetNumThreads(int(threads))
+    params = pywraplp.MPSolverParameters()
+    if mip_gap is not None:
+        params.SetDoubleParam(pywraplp.MPSolverParameters.RELATIVE_MIP_GAP, float(mip_gap))
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    code = solver.Solve(params)
+    runtime_s = time.perf_counter() - t0
+
+    status = {pywraplp.Solver.OPTIMAL: "OPTIMAL", pywraplp.Solver.FEASIBLE: "FEASIBLE",
+              pywraplp.Solver.INFEASIBLE: "INFEASIBLE"}.get(code, "NO_SOLUTION")
+    has_sol = status in ("OPTIMAL", "FEASIBLE")
+    values = np.array([v.solution_value() for v in cols]) if has_sol else None
+    return _result("cbc", status, objective.Value() if has_sol else None, values, build_s, runtime_s)
+
+
+
+# === OR-Tools CP-SAT ===
+def solve_cpsat(mats, time_limit=None, threads=None, mip_gap=None, int_ub=None, verbose=False):
+    from ortools.sat.python import cp_model
+
+    if int_ub is None:
+        raise ValueError("CP-SAT richiede un bound finito per le variabili intere (int_ub).")
+    M = mats["M"].tocsr()
+    if not np.all(M.data == np.round(M.data)) or not np.all(mats["rhs"] == np.round(mats["rhs"])):
+        raise ValueError("CP-SAT richiede coefficienti interi nei vincoli (p[k] e Q interi).")
+
+    t0 = time.perf_counter()
+    model = cp_model.CpModel()
+    lb, ub = col_bounds(mats, int_ub)
+    cols = [model.NewIntVar(int(lb[c]), int(ub[c]), "") for c in range(len(mats["obj"]))]
+    for r in range(M.shape[0]):
+        idx, coefs = M.indices[M.indptr[r]:M.indptr[r + 1]], M.data[M.indptr[r]:M.indptr[r + 1]]
+        expr = cp_model.LinearExpr.WeightedSum([cols[c] for c in idx], [int(a) for a in coefs])
+        b, s = int(mats["rhs"][r]), mats["sense"][r]
+        model.Add(expr <= b if s == "<" else expr >= b if s == ">" else expr == b)
+    nz = np.flatnonzero(mats["obj"])
+    model.Minimize(cp_model.LinearExpr.WeightedSum([cols[c] for c in nz], [float(mats["obj"][c]) for c in nz]))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.log_search_progress = verbose
+    if time_limit is not None:
+        solver.parameters.max_time_in_seconds = float(time_limit)
+    if threads is not None:
+        solver.parameters.num_workers = int(threads)
+    if mip_gap is not None:
+        solver.parameters.relative_gap_limit = float(mip_gap)
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    code = solver.Solve(model)
+    runtime_s = time.perf_counter() - t0
+
+    status = {cp_model.OPTIMAL: "OPTIMAL", cp_model.FEASIBLE: "FEASIBLE",
+              cp_model.INFEASIBLE: "INFEASIBLE"}.get(code, "NO_SOLUTION")
+    has_sol = status in ("OPTIMAL", "FEASIBLE")
+    values = np.array([solver.Value(v) for v in cols], dtype=float) if has_sol else None
+    return _result("cpsat", status, solver.ObjectiveValue() if has_sol else None, values, build_s, runtime_s)
+
+
+
+BACKENDS = {
+    "gurobi": solve_gurobi,
+    "highs": solve_highs,
+    "scipy": solve_scipy,
+    "cbc": solve_cbc,
+    "cpsat": solve_cpsat,
+}
+
+
+
+# === MODELLO MBA SU UN BACKEND ===
+def integer_upper_bound(data):
+    """
+    Bound valido per w e v: in una soluzione ottima ogni w[l,h] / v[i,j] non supera la somma
+    dei moduli minimi richiesti da tutti i segmenti, ≤ |segmenti| · ceil(Σ p_k / Q).
+    """
+    n_segments = sum(len(segs) for segs in data["Nl"].values())
+    return max(1, n_segments * math.ceil(sum(data["p"].values()) / data["Q"]))
+
+
+def solution_from_values(mats, values, has_v):
+    """Vettore delle colonne -> tupla come get_solution() (x, w, z[, v])"""
+    sols, offset = {"x": {}, "w": {}, "z": {}, "v": {}}, 0
+    for kind, block_keys in mats["blocks"]:
+        block = values[offset:offset + len(block_keys)]
+        for n in np.flatnonzero(block > 0.5):
+            sols[kind][solution_key(kind, block_keys[n])] = 1 if kind in ("x", "z") else int(round(block[n]))
+        offset += len(block_keys)
+    for kind in ("x", "z"):                     # fissate a 1 da presolve_assignments
+        sols[kind].update({solution_key(kind, key): 1 for key in mats["fixed"][kind]})
+    if has_v:
+        return sols["x"], sols["w"], sols["z"], sols["v"]
+    return sols["x"], sols["w"], sols["z"]
+
+
+def solve_variant(data, variant, backend="gurobi", **options):
+    """
+    Assembla la variante (RIGID / SEMI / FLEX) e la risolve con il backend scelto.
+    options: time_limit, threads, mip_gap, verbose (int_ub calcolato da integer_upper_bound se assente).
+    Ritorna MBA_Result: get_solution() vuota se lo stato non è OPTIMAL (come MBA_ILP_CORE.get_solution).
+    """
+    t0 = time.perf_counter()
+    mats = assemble_mba_matrices(data, variant, names=False)
+    assemble_s = time.perf_counter() - t0
+    options.setdefault("int_ub", integer_upper_bound(data))
+
+    res = BACKENDS[backend](mats, **options)
+    has_v = variant == "FLEX"
+    if res["status"] == "OPTIMAL":
+        solution = solution_from_values(mats, res["values"], has_v)
+    else:
+        solution = ({}, {}, {}, {}) if has_v else ({}, {}, {})
+
+    stats = {k: v for k, v in res.items() if k != "values"}
+    if stats["obj"] is not None:
+        stats["obj"] += mats["obj_const"]
+    stats["assemble_s"] = assemble_s
+    return MBA_Result(variant, solution, stats)
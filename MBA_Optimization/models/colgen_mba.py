@@ -0,0 +1,219 @@
+### Generazione di colonne: ogni richiesta sceglie un "line pattern" ###
+### Pattern = una linea per ogni arco servito del path Pk, con i cambi nei nodi J (costo α p_k).
+### Master ristretto (stesse w, v e righe di variante del modello compatto):
+###     min Σ t w + Σ tr v + Σ_k Σ_q c_q λ_q
+###         Σ_q λ_q = 1                                   per richiesta k (convessità)
+###         Σ_k Σ_q p_k a_q[r] λ_q - Q w[r] ≤ 0           per riga di capacità r (arco per RIGID, segmento per SEMI/FLEX)
+###         + constW (RIGID) / conservazione (SEMI) / bilancio con v (FLEX)
+### Pricing: costo ridotto = cammino minimo di pricing_mba con prezzo -π_cap per colonna x, meno σ_k.
+### Alla fine il master ristretto viene risolto intero (price-and-branch): upper bound + gap sul bound LP.
+### Il bound LP coincide con quello del modello compatto (con contJ il poliedro x, z di una richiesta è già
+### intero): il vantaggio è nelle dimensioni del master, non nel bound.
+### Assegnazione, continuità su S e J e variabili z spariscono dal master: sono dentro i pattern.
+
+import time
+import numpy as np
+from gurobipy import Model, GRB, Column, LinExpr, quicksum
+from models.pricing_mba import MBA_Pricing
+from models.models_mba import solution_key
+
+
+
+
+
+class MBA_ColGen:
+    """
+    Formulazione a pattern di RIGID / SEMI / FLEX.
+    - build(): master con un pattern iniziale per richiesta (meno cambi di linea)
+    - solve(): generazione di colonne sul rilassamento LP, poi master ristretto intero
+    - get_solution(): stesso formato dei modelli compatti (x, w, z[, v])
+    - history: per iterazione valore LP, colonne aggiunte e tempo
+    """
+
+    def __init__(self, data, variant="FLEX"):
+        if variant not in ("RIGID", "SEMI", "FLEX"):
+            raise ValueError(f"Variante sconosciuta: {variant}")
+        self.data = data
+        self.variant = variant
+        self.has_v = variant == "FLEX"
+        self.model = Model(f"MBA_ColGen_{variant}")
+        self.patterns = []      # (richiesta r, colonne x, archi di transizione, Var λ)
+        self.history = []
+        self.stats = {}
+
+
+
+    # === COSTRUZIONE ===
+    def build(self):
+        d = self.data
+        pr = self.pricing = MBA_Pricing(d)
+        Q = d["Q"]
+
+        # === w, v ===
+        self.w = {key: self.model.addVar(vtype=GRB.CONTINUOUS, lb=0, obj=d["t"][key], name=f"w_{key[0]}_{key[1]}")
+                  for key in pr.segments}
+        self.v = {}
+        if self.has_v:
+            self.v = {(i, j): self.model.addVar(vtype=GRB.CONTINUOUS, lb=0, obj=d["tr"][i, j], name=f"v_{i}_{j}")
+                      for (i, j) in d["R"]}
+
+        # === righe di capacità: una per arco della linea (RIGID) o per segmento (SEMI / FLEX) ===
+        if self.variant == "RIGID":
+            cap_keys = [(l, h, i, j) for (l, h) in pr.segments
+                        for (i, j) in zip(d["Nl"][l][h][:-1], d["Nl"][l][h][1:])]
+            row_of = {(l, i, j): r for r, (l, h, i, j) in enumerate(cap_keys)}
+            self.col_row = np.array([row_of.get((l, i, j), -1) for (k, i, j, l) in pr.x_keys], dtype=np.int64)
+            self.cap = [self.model.addConstr(-Q * self.w[l, h] <= 0, name=f"cap_l{l}_h{h}_{i}_{j}")
+                        for (l, h, i, j) in cap_keys]
+            for l, segs in d["Nl"].items():
+                for h in range(1, len(segs)):
+                    self.model.addConstr(self.w[l, h] == self.w[l, 0], name=f"constW_{l}_{h}")
+        else:
+            self.col_row = pr.col_seg
+            self.cap = [self.model.addConstr(-Q * self.w[l, h] <= 0, name=f"capacity_{l}_{h}")
+                        for (l, h) in pr.segments]
+            for j in (set(d["J"]) | set(d["T"])):
+                incoming = [self.w[key] for key in d["Delta_minus"].get(j, [])]
+                outgoing = [self.w[key] for key in d["Delta_plus"].get(j, [])]
+                if self.has_v:
+                    incoming += [self.v[i, j] for i in d["R_in"].get(j, [])]
+                    outgoing += [self.v[j, m] for m in d["R_out"].get(j, [])]
+                self.model.addConstr(quicksum(incoming) == quicksum(outgoing), name=f"flow_{j}")
+
+        # === convessità: un pattern per richiesta (le richieste senza archi serviti non entrano) ===
+        self.conv = {r: self.model.addConstr(LinExpr() == 1, name=f"conv_{k}")
+                     for r, k in enumerate(pr.K) if pr.n_steps[r] > 0}
+        self.model.ModelSense = GRB.MINIMIZE
+        self.model.update()
+
+        self._pattern_ids = set()
+        value, chosen, used_edges = pr.price(np.zeros(len(pr.x_keys)))
+        self._add_patterns(np.array(list(self.conv)), chosen, used_edges)
+        self.model.update()
+
+
+
+    def _add_patterns(self, requests, chosen, used_edges):
+        """Aggiunge al master i pattern scelti dal pricing per le richieste indicate; ritorna quanti sono nuovi"""
+        pr, d = self.pricing, self.data
+        wanted = set(requests.tolist())
+        by_request, edges_by_request = {}, {}
+        for c in np.flatnonzero(chosen):
+            r = int(pr.col_k[c])
+            if r in wanted:
+                by_request.setdefault(r, []).append(c)
+        for e in used_edges:
+            r = int(pr.col_k[pr.edge_dst[e]])
+            if r in wanted:
+                edges_by_request.setdefault(r, []).append(e)
+
+        added = 0
+        for r in requests.tolist():
+            pat_cols = np.array(by_request.get(r, []), dtype=np.int64)
+            pattern_id = (r, tuple(pat_cols.tolist()))
+            if pattern_id in self._pattern_ids:
+                continue
+            pat_edges = np.array(edges_by_request.get(r, []), dtype=np.int64)
+            cost = float(pr.edge_cost[pat_edges].sum()) if len(pat_edges) else 0.0
+            rows, coefs = np.unique(self.col_row[pat_cols], return_counts=True)
+            coefs = coefs * d["p"][pr.K[r]]
+            mask = rows >= 0
+            column = Column([1.0] + coefs[mask].astype(float).tolist(),
+                            [self.conv[r]] + [self.cap[n] for n in rows[mask]])
+            lam = self.model.addVar(lb=0.0, obj=cost, column=column, name=f"lambda_{pr.K[r]}_{len(self.patterns)}")
+            self.patterns.append((r, pat_cols, pat_edges, lam))
+            self._pattern_ids.add(pattern_id)
+            added += 1
+        return added
+
+
+
+    # === RISOLUZIONE ===
+    def solve(self, max_iter=1000, time_limit=None, integer=True, callback=None):
+        """
+        Generazione di colonne fino a costo ridotto ≥ 0 (bound LP del master = bound della formulazione a pattern),
+        poi (integer=True) il master ristretto con λ binarie e w, v intere.
+        """
+        pr = self.pricing
+        t0 = time.perf_counter()
+        self.history = []
+        lb = None
+        requests = np.array(list(self.conv), dtype=np.int64)
+        output_flag = self.model.Params.OutputFlag
+        self.model.Params.OutputFlag = 0                                  # niente log per ogni LP del ciclo
+        for it in range(max_iter):
+            self.model.optimize()
+            if self.model.Status != GRB.OPTIMAL:
+                break
+            mu = -np.array([c.Pi for c in self.cap])                     # π ≤ 0 sulle righe ≤
+            sigma = np.array([self.conv[r].Pi for r in requests])
+            col_cost = np.where(self.col_row >= 0, mu[np.maximum(self.col_row, 0)], 0.0) * pr.col_p
+            value, chosen, used_edges = pr.price(col_cost)
+            reduced = value[requests] - sigma
+            # bound lagrangiano (Farley / Lasdon): LP + Σ costi ridotti negativi
+            lp = self.model.ObjVal
+            lb = max(lb if lb is not None else -np.inf, lp + float(np.minimum(reduced, 0.0).sum()))
+            negative = requests[reduced < -1e-9 * max(1.0, abs(lp))]
+            added = self._add_patterns(negative, chosen, used_edges) if len(negative) else 0
+            self.history.append({"iter": it, "lp": lp, "lower_bound": lb, "added": added,
+                                 "columns": len(self.patterns), "time_s": time.perf_counter() - t0})
+            if added == 0:
+                lb = lp
+                break
+            if time_limit is not None and time.perf_counter() - t0 >= time_limit:
+                break
+            self.model.update()
+
+        lp_bound = self.history[-1]["lp"] if self.history else None
+        t_lp = time.perf_counter() - t0
+
+        # === master ristretto intero ===
+        self.model.Params.OutputFlag = output_flag
+        if integer:
+            for (_, _, _, lam) in self.patterns:
+                lam.VType = GRB.BINARY
+            for var in list(self.w.values()) + list(self.v.values()):
+                var.VType = GRB.INTEGER
+            if time_limit is not None:
+                self.model.Params.TimeLimit = max(1.0, time_limit - t_lp)
+            self.model.optimize(callback)
+        ub = self.model.ObjVal if integer and self.model.SolCount > 0 else None
+
+        self.stats = {
+            "status": self.model.Status,
+            "lp_bound": lp_bound,
+            "lower_bound": lb,
+            "upper_bound": ub,
+            "gap": (ub - lb) / max(abs(ub), 1e-9) if lb is not None and ub is not None else None,
+            "iterations": len(self.history),
+            "columns": len(self.patterns),
+            "rows": self.model.NumConstrs,
+            "variables": self.model.NumVars,
+            "lp_s": t_lp,
+            "runtime_s": time.perf_counter() - t0,
+        }
+        return self.stats
+
+
+
+    # === ESTRAZIONE SOLUZIONE ===
+    def get_solution(self):
+        """
+        Stesso formato di MBA_ILP_*.get_solution(): (x_sol, w_sol, z_sol[, v_sol]).
+        None se il master non ha una soluzione (inammissibile, time limit senza incumbent).
+        """
+        if self.model.SolCount == 0:
+            return None
+        pr = self.pricing
+        x_sol, z_sol = {}, {}
+        for (r, pat_cols, pat_edges, lam) in self.patterns:
+            if lam.X > 0.5:
+                for c in pat_cols:
+                    x_sol[solution_key("x", pr.x_keys[c])] = 1
+                for key in pr.z_keys(pat_edges):
+                    z_sol[solution_key("z", key)] = 1
+        w_sol = {solution_key("w", key): int(round(var.X)) for key, var in self.w.items() if var.X > 0.5}
+        if not self.has_v:
+            return x_sol, w_sol, z_sol
+        v_sol = {solution_key("v", key): int(round(var.X)) for key, var in self.v.items() if var.X > 0.5}
+        return x_sol, w_sol, z_sol, v_sol
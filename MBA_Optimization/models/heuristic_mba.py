@@ -0,0 +1,305 @@
+### Euristica costruttiva per RIGID / SEMI / FLEX (nessun solver MIP) ###
+### 1) Assegnazione: ogni richiesta sul cammino di linee che minimizza cambi (α p_k) + costo marginale
+###    dei moduli, dati i carichi già assegnati (pricing_mba.price_request). Ordine delle richieste:
+###     - "greedy": p decrescente
+###     - "regret": a giri, prima le richieste con rimpianto maggiore = costo della miglior alternativa
+###       (cammino senza le colonne scelte sugli archi con più linee) - costo del cammino migliore,
+###       ricalcolato per tutte le richieste ancora libere con i carichi correnti (price vettorizzato)
+###    passes > 1: ogni richiesta viene tolta e riassegnata, nello stesso ordine.
+### 2) Moduli: w = ceil(carico / Q) per segmento (per linea in RIGID: massimo sugli archi).
+###    SEMI / FLEX: circolazione di costo minimo con w ≥ ceil(carico / Q) che ripristina la
+###    conservazione in T ∪ J (FLEX: con i flussi v di ribilanciamento). LP di rete -> soluzione intera.
+### get_solution() ha lo stesso formato dei modelli: va bene per save_results / VOS-VOR / set_start.
+### MBA_LPRounding: stesso passo 2), ma l'assegnazione arrotonda il rilassamento continuo (bound()):
+###    cammino minimo per richiesta con costo (1 - x_LP) α p_k per colonna (lasciare la linea scelta
+###    dall'LP costa come un cambio); gap dimostrato rispetto al bound LP.
+
+import math
+import time
+import numpy as np
+from scipy.optimize import linprog
+from models.pricing_mba import MBA_Pricing, balance_matrix
+from models.models_mba import solution_key
+from models.pipeline_mba import MODELS
+
+
+
+
+
+class MBA_Heuristic:
+    """
+    Soluzione ammissibile veloce per "RIGID" / "SEMI" / "FLEX".
+    - solve(): assegnazione + moduli; ritorna stats con obj e tempo
+    - get_solution(): (x_sol, w_sol, z_sol[, v_sol]) come MBA_ILP_*.get_solution()
+    model è None (nessun modello Gurobi): save_results_model salta i file .ilp / .sol
+    """
+
+    def __init__(self, data, variant="FLEX"):
+        if variant not in ("RIGID", "SEMI", "FLEX"):
+            raise ValueError(f"Variante sconosciuta: {variant}")
+        self.data = data
+        self.variant = variant
+        self.has_v = variant == "FLEX"
+        self.model = None
+        self.pricing = None
+        self.solution = None
+        self.stats = {}
+
+
+
+    def build(self):
+        d = self.data
+        pr = self.pricing = MBA_Pricing(d)
+        self.t = np.array([d["t"][key] for key in pr.segments], dtype=float)
+
+        if self.variant == "RIGID":
+            # capacità per arco della linea; costo di un modulo = somma dei t dei segmenti della linea
+            arcs = [(l, i, j) for (l, h) in pr.segments for (i, j) in zip(d["Nl"][l][h][:-1], d["Nl"][l][h][1:])]
+            row_of = {key: r for r, key in enumerate(arcs)}
+            self.col_row = np.array([row_of.get((l, i, j), -1) for (k, i, j, l) in pr.x_keys], dtype=np.int64)
+            lines = list(d["Nl"])
+            line_pos = {l: n for n, l in enumerate(lines)}
+            self.row_line = np.array([line_pos[l] for (l, i, j) in arcs], dtype=np.int64)
+            line_t = np.zeros(len(lines))
+            self.seg_line = np.array([line_pos[l] for (l, h) in pr.segments], dtype=np.int64)
+            np.add.at(line_t, self.seg_line, self.t)
+            self.row_cost = line_t[self.row_line]
+            self.n_lines = len(lines)
+        else:
+            self.col_row = pr.col_seg
+            self.row_cost = self.t
+        self.n_rows = len(self.row_cost)
+        # colonne di un arco servito da più linee per la stessa richiesta (alternative per il rimpianto)
+        step_id = pr.req_cols[pr.col_k] + pr.col_step
+        self._multi_line = np.bincount(step_id, minlength=len(pr.x_keys))[step_id] > 1
+
+
+
+    # === 1) ASSEGNAZIONE ===
+    def _marginal_costs(self, r, load, modules):
+        """Costo delle colonne di r: moduli in più che servirebbero per portare p_k in ogni riga"""
+        pr = self.pricing
+        return self._column_costs(slice(pr.req_cols[r], pr.req_cols[r + 1]), load, modules)
+
+
+    def _column_costs(self, cols, load, modules):
+        """Come _marginal_costs, per un insieme qualsiasi di colonne (slice o indici)"""
+        pr, Q = self.pricing, self.data["Q"]
+        rows, p = self.col_row[cols], pr.col_p[cols]
+        cost = np.zeros(len(rows))
+        ok = rows >= 0
+        rr = rows[ok]
+        cap = Q * modules[rr]
+        # moduli da aggiungere, ripartiti in modo lineare (il costo vero è a gradino)
+        extra = np.maximum(0.0, load[rr] + p[ok] - cap) / Q
+        cost[ok] = self.row_cost[rr] * extra
+        return cost
+
+
+    def _modules(self, load):
+        Q = self.data["Q"]
+        need = np.ceil(load / Q - 1e-9)
+        if self.variant == "RIGID":          # moduli costanti per linea: il massimo sui suoi archi
+            per_line = np.zeros(self.n_lines)
+            np.maximum.at(per_line, self.row_line, need)
+            return per_line[self.row_line]
+        return need
+
+
+    def _assign(self, passes, order="greedy", rounds=10):
+        pr = self.pricing
+        n_req = len(pr.K)
+        load = np.zeros(self.n_rows)
+        chosen = [None] * n_req
+
+        def add(cols, sign):
+            rows = self.col_row[cols]
+            ok = rows >= 0
+            np.add.at(load, rows[ok], sign * pr.col_p[cols[ok]])
+
+        def insert(r):
+            if chosen[r] is not None:
+                add(chosen[r][0], -1.0)
+            value, cols, edges = pr.price_request(r, self._marginal_costs(r, load, self._modules(load)))
+            if not math.isfinite(value):
+                raise ValueError(f"Richiesta {pr.K[r]} senza assegnazione ammissibile (contS)")
+            chosen[r] = (cols, edges)
+            add(cols, +1.0)
+
+        if order == "greedy":
+            sequence = sorted(np.flatnonzero(pr.n_steps > 0).tolist(), key=lambda r: -pr.col_p[pr.req_cols[r]])
+        elif order == "regret":
+            sequence = []
+            free = pr.n_steps > 0
+            batch = max(1, math.ceil(free.sum() / max(1, rounds)))
+            while free.any():
+                regret = self._regret(load)
+                cand = np.flatnonzero(free)
+                # rimpianto decrescente, a parità p decrescente
+                pick = cand[np.lexsort((-pr.col_p[pr.req_cols[cand]], -regret[cand]))[:batch]]
+                for r in pick.tolist():
+                    insert(r)
+                free[pick] = False
+                sequence += pick.tolist()
+            passes -= 1                                   # il primo passaggio è fatto dai giri
+        else:
+            raise ValueError(f"Ordine sconosciuto: {order}")
+
+        for it in range(passes if order == "regret" else max(1, passes)):
+            for r in sequence:
+                insert(r)
+        return chosen, load
+
+
+    def _regret(self, load):
+        """Per richiesta: costo della miglior alternativa - costo del cammino migliore (inf se non c'è alternativa)"""
+        pr = self.pricing
+        cost = self._column_costs(slice(None), load, self._modules(load))
+        best, chosen, _ = pr.price(cost)
+        alternative, _, _ = pr.price(np.where(chosen & self._multi_line, np.inf, cost))
+        with np.errstate(invalid="ignore"):
+            return np.where(np.isfinite(alternative), alternative - best, np.inf)
+
+
+
+    # === 2) MODULI (e ribilanciamento) ===
+    def _circulation(self, w_min):
+        """min Σ t w + Σ tr v, w ≥ w_min, bilancio in T ∪ J (v solo FLEX). None se non ammissibile."""
+        d, pr = self.data, self.pricing
+        R = list(d["R"]) if self.has_v else []
+        tr = np.array([d["tr"][a] for a in R], dtype=float)
+        A = balance_matrix(d, pr.segments, R)
+        bounds = list(zip(w_min.tolist(), [None] * len(w_min))) + [(0, None)] * len(R)
+        res = linprog(np.concatenate([self.t, tr]), A_eq=A if A.shape[0] else None,
+                      b_eq=np.zeros(A.shape[0]) if A.shape[0] else None, bounds=bounds, method="highs")
+        if res.status != 0:
+            return None, None
+        values = np.round(res.x)
+        return values[:len(pr.segments)], dict(zip(R, values[len(pr.segments):]))
+
+
+
+    # === RISOLUZIONE ===
+    def solve(self, passes=2, order="greedy", rounds=10):
+        """order: "greedy" (p decrescente) o "regret" (rounds giri di ricalcolo del rimpianto)"""
+        if self.pricing is None:
+            self.build()
+        t0 = time.perf_counter()
+        chosen, load = self._assign(passes, order, rounds)
+        return self._complete(chosen, load, t0)
+
+
+    def _complete(self, chosen, load, t0):
+        """2) moduli (e ribilanciamento) per l'assegnazione chosen; soluzione e stats"""
+        d, pr = self.data, self.pricing
+        modules = self._modules(load)
+        if self.variant == "RIGID":
+            per_line = np.zeros(self.n_lines)
+            per_line[self.row_line] = modules            # già costanti sulla linea
+            w, v = per_line[self.seg_line], {}
+        else:
+            w, v = self._circulation(modules)
+            if w is None:
+                raise ValueError(f"Nessuna circolazione dei moduli ammissibile per {self.variant}")
+
+        # === soluzione nel formato di get_solution() ===
+        x_sol, z_sol = {}, {}
+        transfer = 0.0
+        for r, pick in enumerate(chosen):
+            if pick is None:
+                continue
+            cols, edges = pick
+            for c in cols:
+                x_sol[solution_key("x", pr.x_keys[c])] = 1
+            for key in pr.z_keys(edges):
+                z_sol[solution_key("z", key)] = 1
+                transfer += d["alpha"] * d["p"][key[0]]
+        w_sol = {solution_key("w", key): int(val) for key, val in zip(pr.segments, w) if val > 0.5}
+        v_sol = {solution_key("v", key): int(val) for key, val in v.items() if val > 0.5}
+        self.solution = (x_sol, w_sol, z_sol, v_sol) if self.has_v else (x_sol, w_sol, z_sol)
+
+        design = float(self.t @ w) + sum(d["tr"][key] * val for key, val in v.items())
+        self.stats = {"obj": float(design + transfer), "runtime_s": time.perf_counter() - t0}
+        return self.stats
+
+
+    def get_solution(self):
+        return self.solution
+
+
+
+
+
+class MBA_LPRounding(MBA_Heuristic):
+    """
+    Euristica primale dal rilassamento continuo di MBA_ILP_<variant> (secondi, non minuti).
+    - solve(cuts=True): LP (con i tagli di relax()) + arrotondamento; stats con obj, bound, gap e tempi
+    - get_solution(): (x_sol, w_sol, z_sol[, v_sol]) come MBA_ILP_*.get_solution()
+    mba: modello della stessa variante già costruito (build() / build_matrix()); se None build_matrix().
+         Domanda e parametri sono quelli correnti di mba.data (MBA_Demand.set / set_parameters).
+    """
+
+    def __init__(self, data, variant="FLEX", mba=None):
+        if mba is not None:
+            if mba.variant != variant:
+                raise ValueError(f"Modello {mba.variant} per la variante {variant}")
+            if mba.index is not None:
+                raise ValueError("MBA_LPRounding richiede i dizionari x / w (build() o build_matrix(), non build_lean()).")
+            data = mba.data
+        super().__init__(data, variant)
+        self.mba = mba
+
+
+    def build(self):
+        super().build()
+        if self.mba is None:
+            self.mba = MODELS[self.variant](self.data)
+            self.mba.build_matrix()
+
+
+    def _round(self, x_lp):
+        """Cammino minimo per richiesta vicino a x_LP: ritorna (chosen, load) come _assign"""
+        pr, alpha = self.pricing, self.data["alpha"]
+        value, mask, edges = pr.price((1.0 - x_lp) * alpha * pr.col_p)
+        bad = np.flatnonzero(~np.isfinite(value))
+        if len(bad):
+            raise ValueError(f"Richiesta {pr.K[bad[0]]} senza assegnazione ammissibile (contS)")
+        cols = np.flatnonzero(mask)
+        col_split = np.searchsorted(cols, pr.req_cols)
+        edges = edges[np.argsort(pr.col_k[pr.edge_dst[edges]], kind="stable")]
+        edge_split = np.searchsorted(pr.col_k[pr.edge_dst[edges]], np.arange(len(pr.K) + 1))
+        chosen = [(cols[col_split[r]:col_split[r + 1]], edges[edge_split[r]:edge_split[r + 1]]) if pr.n_steps[r] else None
+                  for r in range(len(pr.K))]
+
+        load = np.zeros(self.n_rows)
+        rows = self.col_row[cols]
+        ok = rows >= 0
+        np.add.at(load, rows[ok], pr.col_p[cols[ok]])
+        return chosen, load
+
+
+    def solve(self, cuts=True):
+        if self.mba is not None and self.mba.data is not self.data:
+            self.data, self.pricing = self.mba.data, None      # parametri cambiati sul modello: pricing da rifare
+        if self.pricing is None:
+            self.build()
+        pr, mba = self.pricing, self.mba
+        t0 = time.perf_counter()
+        lp = mba.bound(cuts)
+        if lp["bound"] is None:
+            raise ValueError(f"Rilassamento continuo non risolto (status {lp['status']})")
+        lp_s = time.perf_counter() - t0
+
+        # x_LP sulle colonne del pricing: x fissate dal presolve = 1, le altre x dello stesso arco = 0
+        rvars = mba.relaxed.getVars()
+        x_fixed = set(self.data.get("presolve", {}).get("x_fixed", []))
+        x_lp = np.array([rvars[mba.x[key].index].X if key in mba.x else float(key in x_fixed)
+                         for key in pr.x_keys])
+
+        t1 = time.perf_counter()
+        chosen, load = self._round(x_lp)
+        stats = self._complete(chosen, load, t1)
+        gap = (stats["obj"] - lp["bound"]) / abs(stats["obj"]) if stats["obj"] else 0.0
+        self.stats = {**stats, "bound": lp["bound"], "gap": gap, "cuts": lp["cuts"], "lp_s": lp_s,
+                      "rounding_s": stats["runtime_s"], "runtime_s": time.perf_counter() - t0}
+        return self.stats
@@ -0,0 +1,283 @@
+### Rilassamento lagrangiano di SEMI / FLEX: capacità per segmento dualizzate con μ[l,h] ≥ 0 ###
+###     L(μ) = Σ_k min_{x_k, z_k} [ Σ μ[l,h] p_k x + α p_k z ]        (pricing_mba: cammino minimo per richiesta)
+###          + min_{w, v} [ Σ (t[l,h] - Q μ[l,h]) w + Σ tr v ]          (circolazione: LP, matrice di rete)
+### L(μ) è un lower bound del modello intero per ogni μ ≥ 0. Entrambi i sottoproblemi hanno soluzioni intere
+### anche da LP (cammino minimo, matrice di rete), quindi max L(μ) = bound LP del modello (con i limiti su w, v).
+### Massimizzato con:
+###  - "bundle" (default): bundle prossimale disaggregato, un taglio per richiesta + uno per (w, v) a ogni
+###    iterazione, master QP  max Σ η - u/2 ||μ - μ̂||²; converge al bound LP
+###  - "subgradient": subgradiente deviato con passo di Polyak, senza master ma più lento (resta sotto il bound LP)
+### Le w, v sono limitate da ub / costo (oltre, la soluzione costerebbe più dell'upper bound) e da
+### integer_upper_bound, altrimenti con costi negativi su un ciclo L(μ) = -inf.
+
+import math
+import time
+import numpy as np
+import scipy.sparse as sp
+from gurobipy import Model, GRB
+from models.pricing_mba import MBA_Pricing, balance_matrix
+from models.backends_mba import integer_upper_bound
+
+
+
+
+
+class MBA_Lagrangian:
+    """
+    Lower bound lagrangiano per "SEMI" / "FLEX" (stessa formulazione di MBA_ILP_SEMI / MBA_ILP_FLEX).
+    - solve(): bundle (o subgradiente) su μ; ritorna stats con lower_bound, upper_bound, gap
+    - history: per iterazione bound, miglior bound, passo (bundle: 1 / u) e tempo
+    upper_bound: valore di una soluzione nota (per il passo di Polyak e i limiti su w, v);
+    se None ne costruisce una (pricing con μ = 0 e w minime ammissibili).
+    Il bound non supera quello LP di bound() (proprietà di integralità): "bundle" lo raggiunge,
+    "subgradient" in genere resta sotto.
+    """
+
+    def __init__(self, data, variant="FLEX", upper_bound=None):
+        if variant not in ("SEMI", "FLEX"):
+            raise ValueError(f"Rilassamento lagrangiano solo per SEMI / FLEX, non {variant}")
+        self.data = data
+        self.variant = variant
+        self.has_v = variant == "FLEX"
+        self.upper_bound = upper_bound
+        self.pricing = None
+        self.history = []
+        self.stats = {}
+        self.mu = None
+
+
+
+    # === COSTRUZIONE ===
+    def build(self):
+        d = self.data
+        self.pricing = MBA_Pricing(d)
+        segs = self.pricing.segments
+        self.t = np.array([d["t"][l, h] for (l, h) in segs], dtype=float)
+        self.Q = d["Q"]
+        self.R = list(d.get("R", [])) if self.has_v else []
+        self.tr = np.array([d["tr"][a] for a in self.R], dtype=float)
+
+        # === bilancio dei moduli in T ∪ J: Σ w_in + v_in - Σ w_out - v_out = 0 ===
+        A = balance_matrix(d, segs, self.R)
+
+        self.lp = Model(f"MBA_Lagrangian_{self.variant}_wv")
+        self.lp.Params.OutputFlag = 0
+        self.wv = self.lp.addMVar(len(segs) + len(self.R), lb=0.0)
+        if A.shape[0] > 0:
+            self.lp.addMConstr(A, self.wv, "=", np.zeros(A.shape[0]))
+        self.lp.update()
+
+
+
+    def _solve_wv(self, cost, lb=None):
+        """Circolazione di costo minimo su w, v (ammissibile -> valori interi, matrice di rete)"""
+        self.wv.Obj = cost
+        self.wv.LB = lb if lb is not None else np.zeros(len(cost))
+        self.lp.optimize()
+        if self.lp.Status != GRB.OPTIMAL:
+            return None, None
+        return self.lp.ObjVal, np.round(np.array(self.wv.X))
+
+
+    def _seg_load(self, chosen):
+        cols = np.flatnonzero(chosen & (self.pricing.col_seg >= 0))
+        return np.bincount(self.pricing.col_seg[cols], weights=self.pricing.col_p[cols],
+                           minlength=len(self.pricing.segments))
+
+
+    def _initial_upper_bound(self):
+        """Soluzione ammissibile: x, z del pricing a μ = 0, w = ceil(carico / Q) completate dalla circolazione"""
+        value, chosen, _ = self.pricing.price(self.pricing.col_costs(np.zeros(len(self.t))))
+        if not np.all(np.isfinite(value)):
+            return None
+        lb = np.zeros(len(self.t) + len(self.R))
+        lb[:len(self.t)] = np.ceil(self._seg_load(chosen) / self.Q - 1e-9)
+        wv_cost, _ = self._solve_wv(np.concatenate([self.t, self.tr]), lb)
+        return None if wv_cost is None else float(value.sum() + wv_cost)
+
+
+    def _set_bounds(self, ub):
+        """w, v ≤ min(integer_upper_bound, ub / costo): vale per ogni soluzione di costo ≤ ub"""
+        cost = np.concatenate([self.t, self.tr])
+        cap = np.full(len(cost), float(integer_upper_bound(self.data)))
+        if ub is not None:
+            pos = cost > 0
+            cap[pos] = np.minimum(cap[pos], np.floor(ub / cost[pos] + 1e-9))
+        self.wv.UB = cap
+
+
+
+    def _evaluate(self, mu):
+        """L(μ): (bound, valore per richiesta, x scelte, w v) oppure None se un sottoproblema non è ammissibile"""
+        value, chosen, _ = self.pricing.price(self.pricing.col_costs(mu))
+        if not np.all(np.isfinite(value)):
+            return None                                          # richiesta senza assegnazione: infeasible
+        wv_cost, wv = self._solve_wv(np.concatenate([self.t - self.Q * mu, self.tr]))
+        if wv_cost is None:
+            return None
+        return float(value.sum() + wv_cost), value, chosen, wv
+
+
+
+    # === RISOLUZIONE ===
+    def solve(self, max_iter=500, time_limit=None, method="bundle", gap_tol=1e-4, tol=1e-6,
+              step=2.0, patience=10, min_step=1e-4, deflection=0.5):
+        """
+        method: "bundle" (tol: stop quando l'aumento previsto dal master è ≤ tol · |L|) o "subgradient"
+        (step, patience, min_step, deflection). Entrambi si fermano con gap ≤ gap_tol rispetto a upper_bound.
+        """
+        if method not in ("bundle", "subgradient"):
+            raise ValueError(f"Metodo sconosciuto: {method}")
+        if self.pricing is None:
+            self.build()
+        t0 = time.perf_counter()
+        ub = self.upper_bound if self.upper_bound is not None else self._initial_upper_bound()
+        self._set_bounds(ub)
+        self.history = []
+        if method == "bundle":
+            best, best_mu = self._bundle(ub, max_iter, time_limit, gap_tol, tol, t0)
+        else:
+            best, best_mu = self._subgradient(ub, max_iter, time_limit, gap_tol, step, patience, min_step,
+                                              deflection, t0)
+
+        self.mu = best_mu
+        lb = best if best > -math.inf else None
+        self.stats = {
+            "method": method,
+            "lower_bound": lb,
+            "upper_bound": ub,
+            "gap": (ub - lb) / max(abs(ub), 1e-9) if lb is not None and ub is not None else None,
+            "iterations": len(self.history),
+            "runtime_s": time.perf_counter() - t0,
+        }
+        return self.stats
+
+
+
+    # === BUNDLE PROSSIMALE ===
+    def _bundle(self, ub, max_iter, time_limit, gap_tol, tol, t0, keep=20):
+        """
+        Tagli (lineari in μ, cammino / circolazione fissati all'iterata μ_i):
+            η_k  ≤ costo dei cambi di k + Σ_s p_k a_k[s] μ_s                 (a_k: archi del cammino sul segmento s)
+            η_wv ≤ t w_i + tr v_i - Q Σ_s w_i[s] μ_s
+        Passo serio se L(μ) ≥ L(μ̂) + 0.1 · aumento previsto (μ̂ ← μ; u dimezzato se l'aumento è almeno metà
+        del previsto, altrimenti × 1.5), altrimenti passo nullo (solo il taglio nuovo, u invariato).
+        Tagli inattivi per `keep` iterazioni tolti dal master; un cammino / una circolazione già nel master
+        non viene aggiunto di nuovo.
+        """
+        pr = self.pricing
+        n_seg, n_req = len(self.t), len(pr.K)
+        master = Model(f"MBA_Lagrangian_{self.variant}_bundle")
+        master.Params.OutputFlag = 0
+        mu = master.addMVar(n_seg, lb=0.0)
+        eta = master.addMVar(n_req + 1, lb=-GRB.INFINITY)           # η_k, η_wv
+        cuts, cut_keys, idle = [], [], np.zeros(0, dtype=np.int64)
+        seen = set()                    # un taglio per cammino / circolazione: niente righe duplicate
+
+        def add_cuts(mu_i, value, chosen, wv):
+            nonlocal idle
+            picked = np.flatnonzero(chosen)
+            keys = [(r, c.tobytes()) for r, c in enumerate(np.split(picked, np.searchsorted(picked, pr.req_cols[1:-1])))]
+            keys.append((n_req, wv.tobytes()))
+            new = [n for n, key in enumerate(keys) if key not in seen]
+            if not new:
+                return
+            cols = np.flatnonzero(chosen & (pr.col_seg >= 0))
+            A = sp.csr_matrix((pr.col_p[cols], (pr.col_k[cols], pr.col_seg[cols])), shape=(n_req, n_seg))
+            w = wv[:n_seg]
+            lhs = sp.bmat([[-A, sp.identity(n_req), None],
+                           [sp.csr_matrix(self.Q * w), None, sp.identity(1)]]).tocsr()
+            rhs = np.concatenate([value - A @ mu_i, [self.t @ w + self.tr @ wv[n_seg:]]])
+            cuts.extend(master.addMConstr(lhs[new], mu.tolist() + eta.tolist(), GRB.LESS_EQUAL, rhs[new]).tolist())
+            cut_keys.extend(keys[n] for n in new)
+            seen.update(keys[n] for n in new)
+            idle = np.concatenate([idle, np.zeros(len(new), dtype=np.int64)])
+
+        center = np.zeros(n_seg) if self.mu is None else self.mu.copy()
+        first = self._evaluate(center)
+        if first is None:
+            return -math.inf, center
+        f_center = first[0]
+        add_cuts(center, *first[1:])
+        g = self._seg_load(first[2]) - self.Q * first[3][:n_seg]
+        # u iniziale: aumento previsto ||g||² / 2u pari al gap con l'upper bound (come il passo di Polyak)
+        target = (ub - f_center) if ub is not None else max(1.0, 0.05 * abs(f_center))
+        u = max(float(g @ g), 1e-9) / (2 * max(target, 1e-9))
+        self.history.append({"iter": 0, "bound": f_center, "best_bound": f_center, "step": 1 / u,
+                             "time_s": time.perf_counter() - t0})
+
+        for it in range(1, max_iter):
+            if ub is not None and ub - f_center <= gap_tol * max(1.0, abs(ub)):
+                break
+            if time_limit is not None and time.perf_counter() - t0 >= time_limit:
+                break
+            master.setObjective(-eta.sum() + (u / 2) * (mu @ mu) - (u * center) @ mu)
+            master.optimize()
+            if master.Status != GRB.OPTIMAL:
+                break
+            trial = np.maximum(np.array(mu.X), 0.0)
+            predicted = float(np.sum(eta.X)) - f_center
+            if predicted <= tol * max(1.0, abs(f_center)):
+                break                                            # il modello non promette più aumento
+
+            slack = np.array(master.getAttr("Slack", cuts))
+            idle = np.where(slack > tol * max(1.0, abs(f_center)), idle + 1, 0)
+            if np.any(idle >= keep):
+                drop = np.flatnonzero(idle >= keep)
+                master.remove([cuts[n] for n in drop])
+                seen.difference_update(cut_keys[n] for n in drop)
+                cuts = [c for n, c in enumerate(cuts) if idle[n] < keep]
+                cut_keys = [key for n, key in enumerate(cut_keys) if idle[n] < keep]
+                idle = idle[idle < keep]
+
+            result = self._evaluate(trial)
+            if result is None:
+                break
+            add_cuts(trial, *result[1:])
+            if result[0] >= f_center + 0.1 * predicted:           # passo serio
+                u = u / 2 if result[0] >= f_center + 0.5 * predicted else u * 1.5
+                center, f_center = trial, result[0]
+            self.history.append({"iter": it, "bound": result[0], "best_bound": f_center, "step": 1 / u,
+                                 "time_s": time.perf_counter() - t0})
+        master.dispose()
+        return f_center, center
+
+
+
+    # === SUBGRADIENTE ===
+    def _subgradient(self, ub, max_iter, time_limit, gap_tol, step, patience, min_step, deflection, t0):
+        """
+        Massimizza L(μ): μ ← max(0, μ + step · (UB - L) / ||d||² · d), g = carico - Q w.
+        Direzione deviata d = g + deflection · d_prec (meno zig-zag del subgradiente puro).
+        step dimezzato dopo `patience` iterazioni senza miglioramento del bound.
+        """
+        mu = np.zeros(len(self.t)) if self.mu is None else self.mu.copy()
+        best, best_mu, stall = -math.inf, mu.copy(), 0
+        direction = np.zeros(len(self.t))
+        for it in range(max_iter):
+            result = self._evaluate(mu)
+            if result is None:
+                break
+            bound, value, chosen, wv = result
+            if not self.history or bound > best + 1e-9 * max(1.0, abs(best)):
+                best, best_mu, stall = bound, mu.copy(), 0
+            else:
+                stall += 1
+                if stall >= patience:
+                    step, stall = step / 2, 0
+
+            g = self._seg_load(chosen) - self.Q * wv[:len(self.t)]
+            self.history.append({"iter": it, "bound": bound, "best_bound": best, "step": step,
+                                 "time_s": time.perf_counter() - t0})
+
+            direction = g + deflection * direction
+            norm2 = float(direction @ direction)
+            target = ub if ub is not None else best + max(1.0, 0.05 * abs(best))
+            if norm2 == 0.0 or step < min_step:
+                break                                            # μ ottimo (g = 0) o passo esaurito
+            if ub is not None and ub - best <= gap_tol * max(1.0, abs(ub)):
+                break
+            if time_limit is not None and time.perf_counter() - t0 >= time_limit:
+                break
+            mu = np.maximum(0.0, mu + step * max(target - bound, 0.0) / norm2 * direction)
+        return best, best_mu
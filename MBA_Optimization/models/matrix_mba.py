@@ -0,0 +1,302 @@
+### Costruzione MATRICIALE dei modelli MBA ###
+### Stesse variabili e stessi vincoli di build(), ma:
+###  - le variabili sono create in blocco con un solo addMVar
+###  - i vincoli sono assemblati come matrice sparsa (SciPy) e passati con un solo addMConstr
+### Modalità lean (names=False): niente nomi e niente dizionari di Var, solo id interi densi
+### e una tabella id -> significato (lean_index / describe_var / describe_row)
+
+from array import array
+import numpy as np
+import scipy.sparse as sp
+from gurobipy import GRB
+from utils.f_for_data import model_x_keys, model_z_keys, arc_requests
+
+
+# Nome di riga per famiglia (stesso formato dei nomi in build())
+ROW_NAME_FMT = {
+    "assign": "assign_{}_{}_{}",
+    "contS": "contS_{}_{}_{}_{}_{}",
+    "contJ_plus": "contJ_plus_{}_{}_{}_{}_{}",
+    "contJ_minus": "contJ_minus_{}_{}_{}_{}_{}",
+    "constW": "constW_{}_{}",
+}
+CAP_NAME_FMT = {"RIGID": "cap_l{}_h{}_{}_{}", "SEMI": "capacity_{}_{}", "FLEX": "capacity_{}_{}"}
+FLOW_NAME_FMT = {"SEMI": "w_flow_{}", "FLEX": "flow_balance_{}"}
+
+# Tabella id -> significato: codici di tipo/famiglia e posizione della linea l nella chiave
+VAR_KINDS = ("x", "w", "z", "v")
+ROW_FAMILIES = ("assign", "contS", "contJ_plus", "contJ_minus", "cap", "constW", "flow")
+LINE_POS = {"x": 3, "w": 0, "contS": 1, "contJ_plus": 1, "contJ_minus": 1, "cap": 0, "constW": 0}
+
+
+
+# === ASSEMBLAGGIO MATRICI ===
+def assemble_mba_matrices(data, variant, names=True):
+    """
+    Costruisce la forma matriciale del modello MBA (variant in CORE / RIGID / SEMI / FLEX):
+        min c^T y   s.t.   M y (sense) rhs,   y = [x | w | z | v]
+    Ritorna un dizionario con:
+    - blocks: lista [(tipo, chiavi)] nell'ordine delle colonne, es. ("x", [(k,i,j,l), ...])
+    - vtype, lb, obj, var_names: array per colonna (var_names = None se names=False)
+    - M (csr), sense, rhs, row_names: una riga per vincolo (row_names = None se names=False)
+    - row_keys: (famiglia, chiave) per ogni riga, es. ("cap", (l,h)) (None se names=False)
+    - index: tabella id -> significato (solo se names=False, vedi lean_index)
+    - obj_const, fixed: costante in obiettivo e chiavi x / z fissate a 1 da presolve_assignments
+    """
+    d = data
+    K, p, Pk, Blk = d["K"], d["p"], d["Pk"], d["Blk"]
+    L_ij, S, J, T, Nl = d["L_ij"], d["S"], d["J"], d["T"], d["Nl"]
+    Delta_plus, Delta_minus = d["Delta_plus"], d["Delta_minus"]
+    t, Q, alpha = d["t"], d["Q"], d["alpha"]
+
+    # presolve_assignments (se eseguito): x / z fissate diventano costanti
+    ps = d.get("presolve", {})
+    x_const = dict.fromkeys(ps.get("x_fixed", []), 1.0)
+    fixed_load = ps.get("arc_load", {})
+
+    # === Colonne (stesso ordine di build()) ===
+    x_keys = model_x_keys(d)
+    w_keys = [(l, h) for l, segs in Nl.items() for h in range(len(segs))]
+    z_keys = model_z_keys(d)
+    v_keys = list(d["R"]) if variant == "FLEX" else []
+
+    blocks = [("x", x_keys), ("w", w_keys), ("z", z_keys)]
+    if variant == "FLEX":
+        blocks.append(("v", v_keys))
+
+    vtype = np.concatenate([
+        np.full(len(x_keys), GRB.BINARY), np.full(len(w_keys), GRB.INTEGER),
+        np.full(len(z_keys), GRB.BINARY), np.full(len(v_keys), GRB.INTEGER),
+    ])
+    obj = np.concatenate([
+        np.zeros(len(x_keys)),
+        np.array([t[l, h] for (l, h) in w_keys], dtype=float),
+        np.array([alpha * p[k] for (k, j) in z_keys], dtype=float),
+        np.array([d["tr"][i, j] for (i, j) in v_keys], dtype=float),
+    ])
+    var_names = None
+    if names:
+        var_names = ([f"x_{k}_{i}_{j}_{l}" for (k, i, j, l) in x_keys]
+                     + [f"w_{l}_{h}" for (l, h) in w_keys]
+                     + [f"z_{k}_{j}" for (k, j) in z_keys]
+                     + [f"v_{i}_{j}" for (i, j) in v_keys])
+
+    # indice di colonna per ogni chiave, separato per tipo di variabile
+    col, offset = {}, 0
+    for kind, block_keys in blocks:
+        col[kind] = {key: offset + c for c, key in enumerate(block_keys)}
+        offset += len(block_keys)
+    x_col, w_col, z_col, v_col = col["x"], col["w"], col["z"], col.get("v", {})
+
+    # === Righe: triplette COO (array compatti, non liste di oggetti Python) ===
+    rows, cols, vals = array("q"), array("q"), array("d")
+    sense, rhs = [], array("d")
+    # chiavi di riga: tuple se names=True, altrimenti codificate subito come interi
+    row_keys = [] if names else None
+    row_family, row_key = array("b"), array("q")
+    family_code = {f: n for n, f in enumerate(ROW_FAMILIES)}
+    line_id = {l: n for n, l in enumerate(Nl)}
+
+    def add_row(coefs, s, b, family, key):
+        rows.extend([len(sense)] * len(coefs))
+        cols.extend(c for c, _ in coefs)
+        vals.extend(a for _, a in coefs)
+        sense.append(s)
+        rhs.append(b)
+        if names:
+            row_keys.append((family, key))
+        else:
+            key = key if isinstance(key, tuple) else (key,)
+            pos = LINE_POS.get(family)
+            row_family.append(family_code[family])
+            row_key.extend([line_id[c] if q == pos else c for q, c in enumerate(key)])
+            row_key.extend([-1] * (5 - len(key)))
+
+    # (1) Assegnazione
+    for k in K:
+        path = Pk[k]
+        for (i, j) in zip(path[:-1], path[1:]):
+            valid_lines = L_ij.get((i, j), [])
+            free = [x_col[k, i, j, l] for l in valid_lines if (k, i, j, l) in x_col]
+            if free:
+                add_row([(c, 1.0) for c in free], GRB.EQUAL, 1.0, "assign", (k, i, j))
+            elif not valid_lines:
+                print(f"⚠️ Nessuna linea collega ({i},{j}) per la richiesta {k} → vincolo saltato")
+
+    # (2) Continuità su S
+    for (l, k), triples in Blk.items():
+        for (i, j, m) in triples:
+            if j in S and (k, i, j, l) in x_col:        # con il presolve: entrambe fissate o entrambe libere
+                add_row([(x_col[k, i, j, l], 1.0), (x_col[k, j, m, l], -1.0)],
+                        GRB.EQUAL, 0.0, "contS", (k, l, i, j, m))
+
+    # (3) Continuità su J
+    for (l, k), triples in Blk.items():
+        for (i, j, m) in triples:
+            a, b = (k, i, j, l), (k, j, m, l)
+            # con il presolve: righe con entrambe le x fissate o con z fissata a 1 non servono
+            if j in J and (k, j) in z_col and (a in x_col or b in x_col):
+                coefs = [(x_col[key], sign) for key, sign in ((a, 1.0), (b, -1.0)) if key in x_col]
+                const = x_const.get(a, 0.0) - x_const.get(b, 0.0)      # x fissate: al lato destro
+                cz = z_col[k, j]
+                add_row(coefs + [(cz, -1.0)], GRB.LESS_EQUAL, -const, "contJ_plus", (k, l, i, j, m))
+                add_row(coefs + [(cz, 1.0)], GRB.GREATER_EQUAL, -const, "contJ_minus", (k, l, i, j, m))
+
+    # (4) Capacità
+    if variant == "RIGID":
+        # per arco del segmento h della linea l
+        for l, segs in Nl.items():
+            for h, seg in enumerate(segs):
+                for (i, j) in zip(seg[:-1], seg[1:]):
+                    coefs = [(x_col[k, i, j, l], p[k]) for k in arc_requests(d, l, i, j) if (k, i, j, l) in x_col]
+                    coefs.append((w_col[l, h], -Q))
+                    add_row(coefs, GRB.LESS_EQUAL, -fixed_load.get((l, i, j), 0.0), "cap", (l, h, i, j))
+    elif variant in ("SEMI", "FLEX"):
+        # per segmento h della linea l
+        for l, segs in Nl.items():
+            for h, seg in enumerate(segs):
+                coefs = [(x_col[k, i, j, l], p[k])
+                         for (i, j) in zip(seg[:-1], seg[1:])
+                         for k in arc_requests(d, l, i, j)
+                         if (k, i, j, l) in x_col]
+                coefs.append((w_col[l, h], -Q))
+                load = sum(fixed_load.get((l, i, j), 0.0) for (i, j) in zip(seg[:-1], seg[1:]))
+                add_row(coefs, GRB.LESS_EQUAL, -load, "cap", (l, h))
+
+    # (5) Moduli costanti (RIGID) / conservazione moduli (SEMI, FLEX)
+    if variant == "RIGID":
+        for l, segs in Nl.items():
+            for h in range(1, len(segs)):
+                add_row([(w_col[l, h], 1.0), (w_col[l, 0], -1.0)],
+                        GRB.EQUAL, 0.0, "constW", (l, h))
+    elif variant in ("SEMI", "FLEX"):
+        for j in (set(J) | set(T)):
+            coefs = [(w_col[seg], 1.0) for seg in Delta_minus.get(j, [])]
+            coefs += [(w_col[seg], -1.0) for seg in Delta_plus.get(j, [])]
+            if variant == "FLEX":
+                coefs += [(v_col[i, j], 1.0) for i in d["R_in"].get(j, [])]
+                coefs += [(v_col[j, m], -1.0) for m in d["R_out"].get(j, [])]
+            add_row(coefs, GRB.EQUAL, 0.0, "flow", j)
+
+    M = sp.csr_matrix(
+        (np.frombuffer(vals, dtype=float), (np.frombuffer(rows, dtype=np.int64), np.frombuffer(cols, dtype=np.int64))),
+        shape=(len(sense), offset)
+    )   # le triplette duplicate vengono sommate (come in quicksum)
+
+    row_names, index = None, None
+    if not names:
+        index = lean_index(blocks, row_family, row_key, list(Nl))
+    else:
+        fmt = dict(ROW_NAME_FMT, cap=CAP_NAME_FMT.get(variant), flow=FLOW_NAME_FMT.get(variant))
+        row_names = [fmt[family].format(*(key if family != "flow" else (key,)))
+                     for family, key in row_keys]
+
+    return {
+        "blocks": blocks,
+        "vtype": vtype,
+        "lb": np.zeros(offset),
+        "obj": obj,
+        "var_names": var_names,
+        "M": M,
+        "sense": np.array(sense),
+        "rhs": np.frombuffer(rhs, dtype=float),
+        "row_names": row_names,
+        "row_keys": row_keys,
+        "index": index,
+        "obj_const": ps.get("obj_const", 0.0),
+        "fixed": {"x": ps.get("x_fixed", []), "z": ps.get("z_fixed", [])},
+    }
+
+
+
+# === TABELLA ID -> SIGNIFICATO (modalità lean) ===
+def lean_index(blocks, row_family, row_key, lines):
+    """
+    Tabella id -> significato per la modalità lean (la linea l diventa il suo id in lines).
+    - var_kind[c] / row_family[r]: codice in VAR_KINDS / ROW_FAMILIES
+    - var_key[c] / row_key[r]: chiave come riga intera (completata con -1)
+    - blocks: [(tipo, inizio, fine)] delle colonne
+    row_family / row_key arrivano già codificati da assemble_mba_matrices.
+    """
+    line_id = {l: n for n, l in enumerate(lines)}
+    n_cols = sum(len(block_keys) for _, block_keys in blocks)
+    var_kind = np.empty(n_cols, dtype=np.int8)
+    var_key = np.full((n_cols, 4), -1, dtype=np.int64)
+
+    spans, offset = [], 0
+    for kind, block_keys in blocks:
+        stop = offset + len(block_keys)
+        var_kind[offset:stop] = VAR_KINDS.index(kind)
+        if block_keys:
+            pos = LINE_POS.get(kind)
+            keys = block_keys if pos is None else [key[:pos] + (line_id[key[pos]],) + key[pos + 1:]
+                                                   for key in block_keys]
+            encoded = np.array(keys, dtype=np.int64)
+            var_key[offset:stop, :encoded.shape[1]] = encoded
+        spans.append((kind, offset, stop))
+        offset = stop
+
+    return {"lines": list(lines), "blocks": spans,
+            "var_kind": var_kind, "var_key": var_key,
+            "row_family": np.frombuffer(row_family, dtype=np.int8),
+            "row_key": np.frombuffer(row_key, dtype=np.int64).reshape(-1, 5)}
+
+
+def decode_key(index, kind, encoded):
+    """Riga intera di var_key / row_key -> chiave originale (stessa forma usata in build())"""
+    pos = LINE_POS.get(kind)
+    key = tuple(index["lines"][c] if q == pos else int(c)
+                for q, c in enumerate(encoded) if c >= 0)
+    return key[0] if kind == "flow" else key
+
+
+def describe_var(index, col):
+    """Id di colonna -> (tipo, chiave), es. ("x", (k, i, j, l))"""
+    kind = VAR_KINDS[index["var_kind"][col]]
+    return kind, decode_key(index, kind, index["var_key"][col])
+
+
+def describe_row(index, row):
+    """Id di riga -> (famiglia, chiave), es. ("cap", (l, h))"""
+    family = ROW_FAMILIES[index["row_family"][row]]
+    return family, decode_key(index, family, index["row_key"][row])
+
+
+
+# === CARICAMENTO IN GUROBI ===
+def build_mba_matrix(model_obj, variant, lean=False):
+    """
+    Carica in model_obj.model la forma matriciale di assemble_mba_matrices.
+    - lean=False: riempie model_obj.x / .w / .z (/ .v) e model_obj.constrs come in build(), così
+      solve(), get_solution() e le funzioni di salvataggio funzionano senza modifiche.
+    - lean=True: variabili e vincoli senza nome, nessun dizionario di Var/Constr; restano solo
+      model_obj.index (tabella id -> significato). MVar e MConstr non vengono tenuti: conservano
+      un oggetto Python per ogni Var/Constr; le colonne si leggono in blocco con model.getAttr(attr).
+    """
+    mats = assemble_mba_matrices(model_obj.data, variant, names=not lean)
+    model = model_obj.model
+    if lean:
+        del mats["blocks"]   # le chiavi sono già codificate in mats["index"]
+
+    y = model.addMVar(len(mats["obj"]), vtype=mats["vtype"], lb=mats["lb"],
+                      obj=mats["obj"], name=mats["var_names"])
+    model.ObjCon = mats["obj_const"]
+    model.ModelSense = GRB.MINIMIZE
+    rows = None
+    if mats["M"].shape[0] > 0:
+        rows = model.addMConstr(mats["M"], y, mats["sense"], mats["rhs"], name=mats["row_names"])
+
+    if lean:
+        del y, rows
+        model_obj.index = mats["index"]
+    else:
+        if rows is not None:
+            for (family, key), constr in zip(mats["row_keys"], rows.tolist()):
+                model_obj.constrs.setdefault(family, {})[key] = constr
+        all_vars, offset = y.tolist(), 0
+        for kind, block_keys in mats["blocks"]:
+            getattr(model_obj, kind).update(zip(block_keys, all_vars[offset:offset + len(block_keys)]))
+            offset += len(block_keys)
+
+    model.update()
+    return mats
@@ -1,157 +1,205 @@
-### Versione BASE ###
-### Solo assegnazione delle richieste alle tratte dei bus:
-###  - senza ribilanciamento (no variabili v)
-###  - senza deviazioni/vambi di linea (no variabili z)
-
+### Modelli MBA: RIGID / SEMI / FLEX ###
+### Struttura comune (MBA_ILP_CORE):
+###  - variabili x (assegnazione), w (moduli per segmento), z (cambi di linea)
+###  - vincoli (1) assegnazione, (2) continuità su S, (3) continuità su J
+### Ogni variante aggiunge solo le proprie righe:
+###  - RIGID: capacità per arco + moduli costanti per linea
+###          (MBA_ILP_RIGID_LINE: stessa variante con una sola w per linea al posto delle righe constW)
+###  - SEMI:  capacità per segmento + conservazione moduli (T e J)
+###  - FLEX:  capacità per segmento + variabili v di ribilanciamento + bilancio di flusso
+### relax() / bound(): rilassamento continuo (con tagli opzionali) come lower bound prima del MIP
+
+import math
+import time
+from collections import defaultdict
+import numpy as np
 from gurobipy import Model, GRB, quicksum
+from models.matrix_mba import build_mba_matrix, decode_key
+from utils.f_for_data import model_x_keys, model_z_keys, arc_requests
+
 
 
 
 
+class MBA_ILP_CORE:
+    """
+    Struttura condivisa dai tre modelli (x, w, z e vincoli 1-3).
+    - build(): costruisce core + righe della variante
+    - derive(cls): copia il core già costruito e aggiunge solo le righe della variante cls
+    - build_lean(): come build_matrix(), senza nomi e senza dizionari di Var (id interi + self.index)
+    data: dizionario con set e parametri dal data loader
+    Es: data['L'], data['Nl'], data['K'], ecc.
+    """
+    variant = "CORE"
+    has_v = False
+    line_w = False      # True: una sola w per linea (MBA_ILP_RIGID_LINE)
 
-class MBA_ILP_RIGID:
     def __init__(self, data):
-        """
-        Modello BASE (solo x e v, no z e w)
-        data_sets: dizionario con set e parametri dal data loader
-        Es: data_sets['L'], data_sets['N'], data_sets['K'], ecc.
-        """
         self.data = data
-        self.model = Model("MBA_ILP_RIGID")
+        self.model = Model(f"MBA_ILP_{self.variant}")
         self.x = {}
         self.w = {}
         self.z = {}
+        self.v = {}
+        self.constrs = {}   # famiglia -> {chiave: Constr}
+        self.index = None   # solo in modalità lean: tabella id -> significato (matrix_mba.lean_index)
+        self.relaxed = None # rilassamento continuo (relax())
 
 
 
     # === COSTRUZIONE MODELLO ===
     def build(self):
+        self._build_core()
+        self._build_variant()
+
+
+    def _build_core(self):
         d = self.data
-        K, p, Pk, Akl, Blk = d["K"], d["p"], d["Pk"], d["Akl"], d["Blk"]
-        L, A, S, J, T, Nl = d["L"], d["A"], d["S"], d["J"], d["T"], d["Nl"]
-        Delta_plus, Delta_minus = d["Delta_plus"], d["Delta_minus"]
-        t, Q = d["t"], d["Q"]
+        K, p, Pk, Blk = d["K"], d["p"], d["Pk"], d["Blk"]
+        S, J, L_ij = d["S"], d["J"], d["L_ij"]
         alpha = d["alpha"]
 
-        # === Variabili ===
-        # x_{k,i,j,l}
-        for k in K:
-            for (i, j, l) in A:
-                self.x[k, i, j, l] = self.model.addVar(
-                    vtype=GRB.BINARY, name=f"x_{k}_{i}_{j}_{l}"
-                )
+        # presolve_assignments (se eseguito): x / z fissate diventano costanti
+        ps = d.get("presolve", {})
+        x_const = dict.fromkeys(ps.get("x_fixed", []), 1)
+        x_val = lambda key: self.x[key] if key in self.x else x_const.get(key, 0)
+
+        # === Variabili (con coefficiente in obiettivo) ===
+        # x_{k,i,j,l}: solo archi del path Pk[k] e linee che li servono
+        for (k, i, j, l) in model_x_keys(d):
+            self.x[k, i, j, l] = self.model.addVar(
+                vtype=GRB.BINARY, name=f"x_{k}_{i}_{j}_{l}"
+            )
         # w_{l,h}
-        for l, segs in Nl.items():
-            for h in range(len(segs)):
-                self.w[l, h] = self.model.addVar(
-                    vtype=GRB.INTEGER, lb=0, name=f"w_{l}_{h}"
-                )
+        self._add_w()
         # z_{k,j}
-        for k in K:
-            for j in (J):  
-                self.z[k, j] = self.model.addVar(
-                    vtype=GRB.BINARY, name=f"z_{k}_{j}"
-                )
-
+        for (k, j) in model_z_keys(d):
+            self.z[k, j] = self.model.addVar(
+                vtype=GRB.BINARY, obj=alpha * p[k], name=f"z_{k}_{j}"
+            )
+        self.model.ObjCon = ps.get("obj_const", 0.0)    # cambi forzati dal presolve
+        self.model.ModelSense = GRB.MINIMIZE
         self.model.update()
 
-        # === Funzione Obiettivo ===
-        obj = quicksum(t[l, h] * self.w[l, h] for (l, h) in self.w)
-        obj += alpha * quicksum(p[k] * self.z[k, j] for (k, j) in self.z)
-        self.model.setObjective(obj, GRB.MINIMIZE)
-
 
         # === Vincoli ===
         # (1) Assegnazione: ogni arco del path della richiesta k deve essere servito da una sola linea
+        assign = self.constrs.setdefault("assign", {})
         for k in K:
             path = Pk[k]
             for (i, j) in zip(path[:-1], path[1:]):
-                # Linee che servono questo arco
-                valid_lines = [l for (ii, jj, l) in A if (ii, jj) == (i, j)]
-
-                # Crea variabili x solo per le linee compatibili
-                for l in valid_lines:
-                    if (k, i, j, l) not in self.x:
-                        self.x[k, i, j, l] = self.model.addVar(vtype=GRB.BINARY, name=f"x_{k}_{i}_{j}_{l}")
+                # Linee che servono questo arco (indice precalcolato in load_sets)
+                valid_lines = L_ij.get((i, j), [])
 
                 # Vincolo di assegnazione: somma delle x deve essere 1
-                if valid_lines:
-                    expr = quicksum(self.x[k, i, j, l] for l in valid_lines)
-                    self.model.addConstr(expr == 1, name=f"assign_{k}_{i}_{j}")
-                else:
+                free_lines = [l for l in valid_lines if (k, i, j, l) in self.x]
+                if free_lines:
+                    expr = quicksum(self.x[k, i, j, l] for l in free_lines)
+                    assign[k, i, j] = self.model.addConstr(expr == 1, name=f"assign_{k}_{i}_{j}")
+                elif not valid_lines:
                     print(f"⚠️ Nessuna linea collega ({i},{j}) per la richiesta {k} → vincolo saltato")
 
 
-        
         # (2) Continuità su S
+        contS = self.constrs.setdefault("contS", {})
         for (l, k), triples in Blk.items():
             for (i, j, m) in triples:
-                if j in S:
-                    self.model.addConstr(
+                if j in S and (k, i, j, l) in self.x:     # con il presolve: entrambe fissate o entrambe libere
+                    contS[k, l, i, j, m] = self.model.addConstr(
                         self.x[k, i, j, l] == self.x[k, j, m, l],
                         name=f"contS_{k}_{l}_{i}_{j}_{m}"
                     )
 
 
         # (3) Continuità su J
+        contJ_plus = self.constrs.setdefault("contJ_plus", {})
+        contJ_minus = self.constrs.setdefault("contJ_minus", {})
         for (l, k), triples in Blk.items():
             for (i, j, m) in triples:
-                if j in J:
-                    self.model.addConstr(
-                        self.x[k, i, j, l] - self.x[k, j, m, l] <= self.z[k, j],
+                # con il presolve: righe con entrambe le x fissate o con z fissata a 1 non servono
+                if j in J and (k, j) in self.z and ((k, i, j, l) in self.x or (k, j, m, l) in self.x):
+                    contJ_plus[k, l, i, j, m] = self.model.addConstr(
+                        x_val((k, i, j, l)) - x_val((k, j, m, l)) <= self.z[k, j],
                         name=f"contJ_plus_{k}_{l}_{i}_{j}_{m}"
                     )
-                    self.model.addConstr(
-                        self.x[k, i, j, l] - self.x[k, j, m, l] >= -self.z[k, j],
+                    contJ_minus[k, l, i, j, m] = self.model.addConstr(
+                        x_val((k, i, j, l)) - x_val((k, j, m, l)) >= -self.z[k, j],
                         name=f"contJ_minus_{k}_{l}_{i}_{j}_{m}"
                     )
 
-        """
-        # (4) Capacità per segmento h della linea l — DIREZIONALE
+
+    def _add_w(self):
+        """w_{l,h}: moduli per segmento h della linea l"""
+        Nl, t = self.data["Nl"], self.data["t"]
         for l, segs in Nl.items():
-            for h, seg in enumerate(segs):
-                arcs_h = [(seg[i], seg[i+1]) for i in range(len(seg) - 1)]
-                self.model.addConstr(
-                    quicksum(
-                        p[k] * self.x[k, i, j, l]
-                        for k in K
-                        for (i, j) in arcs_h
-                        if (k, i, j, l) in self.x        # evita key error
-                    ) <= Q * self.w[l, h],
-                    name=f"capacity_{l}_{h}"
+            for h in range(len(segs)):
+                self.w[l, h] = self.model.addVar(
+                    vtype=GRB.INTEGER, lb=0, obj=t[l, h], name=f"w_{l}_{h}"
                 )
-        """
-        # (4) Capacità per segmento h della linea l — PER ARCO
-        for l, segs in Nl.items():
-            for h, seg in enumerate(segs):
-                arcs_h = [(seg[ii], seg[ii+1]) for ii in range(len(seg) - 1)]
-                for (i, j) in arcs_h:
-                    self.model.addConstr(
-                        quicksum(p[k] * self.x[k, i, j, l] for k in K) <= Q * self.w[l, h],
-                        name=f"cap_l{l}_h{h}_{i}_{j}"
-                    )            
 
-        
 
-        # (5) Moduli/bus COSTANTI per linea: w[l,h] = w[l,0] per ogni h
-        for l, segs in Nl.items():
-            for h in range(1, len(segs)):
-                self.model.addConstr(self.w[l, h] == self.w[l, 0], name=f"constW_{l}_{h}")
+    def _build_variant(self):
+        # il core non ha righe specifiche
+        pass
 
-        """    
-        # (5) Conservazione flussi ai nodi speciali (T e J)
-        for j in (set(J) | set(T)):
-            incoming = [self.w[ell, h] for (ell, h) in Delta_minus.get(j, [])]   # Se j non è presente, ritorna la lista vuota []
-            outgoing = [self.w[ell, h] for (ell, h) in Delta_plus.get(j, [])]    # Se j non è presente, ritorna la lista vuota []
-            self.model.addConstr(quicksum(incoming) == quicksum(outgoing),
-                                 name=f"w_flow_{j}")
+
+
+    # === COSTRUZIONE MODELLO (forma matriciale) ===
+    def build_matrix(self):
         """
+        Stesso modello di build(), costruito in blocco (addMVar + addMConstr)
+        """
+        build_mba_matrix(self, self.variant)
+
 
-        
+    def build_lean(self):
+        """
+        Stesso modello, in modalità lean: variabili e vincoli senza nome, nessun dizionario
+        x/w/z/v o constrs. Colonna c e riga r si leggono con describe_var/describe_row(self.index, ...)
+        """
+        build_mba_matrix(self, self.variant, lean=True)
 
-    # === RISOLUIZONE MODELLO ===
-    def solve(self):
-        self.model.optimize()
+
+
+    # === VARIANTE DA CORE GIÀ COSTRUITO ===
+    def derive(self, variant_cls):
+        """
+        Ritorna un oggetto variant_cls (MBA_ILP_RIGID / SEMI / FLEX) il cui modello è una
+        copia di questo core (x, w, z e vincoli 1-3 non vengono ricostruiti) più le sole
+        righe della variante.
+        """
+        if self.index is not None:
+            raise ValueError("derive() richiede un core costruito con build() o build_matrix(), non build_lean().")
+        if variant_cls.line_w:
+            raise ValueError(f"{variant_cls.__name__} ha una w per linea: va costruito con build(), non derivato dal core.")
+        self.model.update()
+        mba = variant_cls.__new__(variant_cls)
+        mba.data = self.data
+        mba.model = self.model.copy()
+        mba.model.ModelName = f"MBA_ILP_{variant_cls.variant}"
+
+        # Stesso ordine di variabili e vincoli nella copia: si rimappa per indice
+        new_vars = mba.model.getVars()
+        new_constrs = mba.model.getConstrs()
+        mba.x = {key: new_vars[var.index] for key, var in self.x.items()}
+        mba.w = {key: new_vars[var.index] for key, var in self.w.items()}
+        mba.z = {key: new_vars[var.index] for key, var in self.z.items()}
+        mba.v = {}
+        mba.index = None
+        mba.relaxed = None
+        mba.constrs = {
+            family: {key: new_constrs[c.index] for key, c in rows.items()}
+            for family, rows in self.constrs.items()
+        }
+
+        mba._build_variant()
+        return mba
+
+
+
+    # === RISOLUZIONE MODELLO ===
+    def solve(self, callback=None):
+        self.model.optimize(callback)
         print(f"Optimization status: {self.model.Status}")
         if self.model.Status == GRB.INFEASIBLE:
             print("⚠️ Modello infeasible, calcolo IIS...")
@@ -163,132 +211,186 @@ class MBA_ILP_RIGID:
 
 
 
+    # === RILASSAMENTO CONTINUO (LP) ===
+    def relax(self, cuts=False):
+        """
+        Copia continua del modello costruito (il modello intero non cambia), in self.relaxed.
+        cuts=True aggiunge tagli validi per il modello intero che il rilassamento della capacità perde:
+         - w[l,h] ≥ ceil(p_k / Q) x[k,i,j,l] per ogni x della riga di capacità (con x = 1 passano p_k passeggeri)
+         - con presolve_assignments: lb di w[l,h] = ceil(carico fisso / Q)
+        Ritorna il numero di tagli aggiunti.
+        """
+        if cuts and self.index is not None:
+            raise ValueError("relax(cuts=True) richiede i dizionari x / w (build() o build_matrix(), non build_lean()).")
+        self.model.update()
+        if self.relaxed is not None:
+            self.relaxed.dispose()
+        relaxed = self.relaxed = self.model.relax()
+        if not cuts:
+            return 0
 
-    # === ESTRAZIONE SOLUZIONE ===
-    def get_solution(self):
-        x_sol, w_sol, z_sol = {}, {}, {}
-
-        if self.model.Status != GRB.OPTIMAL:   # Se non c’è soluzione ottima, ritorna vuoto
-            return x_sol, w_sol, z_sol
-
-        for v in self.model.getVars():
-            if v.VarName.startswith("x") and v.X > 1e-6:
-                _, k, i, j, ell = v.VarName.split("_")
-                k, i, j = int(k), int(i), int(j)
-                x_sol[(k, i, j, ell)] = 1
-            elif v.VarName.startswith("w") and v.X > 1e-6:
-                _, ell, h = v.VarName.split("_")
-                h = int(h)
-                w_sol[(ell, h)] = int(round(v.X))
-            elif v.VarName.startswith("z") and v.X > 1e-6:
-                _, k, j = v.VarName.split("_")
-                k, j = int(k), int(j)
-                z_sol[(k, j)] = 1
-        return x_sol, w_sol, z_sol
-    
-
+        d = self.data
+        p, Q = d["p"], d["Q"]
+        fixed_load = defaultdict(float)         # da p corrente, non arc_load (MBA_Demand.set cambia p)
+        for (k, i, j, l) in d.get("presolve", {}).get("x_fixed", []):
+            fixed_load[l, i, j] += p[k]
+        rvars = relaxed.getVars()
+        n_cuts, lb = 0, {}
+        for l, segs in d["Nl"].items():
+            for h, seg in enumerate(segs):
+                w = rvars[self.w[l, h].index]
+                arcs = list(zip(seg[:-1], seg[1:]))
+                for (i, j) in arcs:
+                    for k in arc_requests(d, l, i, j):
+                        if (k, i, j, l) in self.x and p[k] > 0:        # p_k = 0: w ≥ 0, già nel bound
+                            relaxed.addConstr(w >= math.ceil(p[k] / Q) * rvars[self.x[k, i, j, l].index])
+                            n_cuts += 1
+                # carico fisso: per arco in RIGID, sul segmento in SEMI / FLEX (come le righe di capacità)
+                loads = [fixed_load.get((l, i, j), 0.0) for (i, j) in arcs]
+                load = max(loads, default=0.0) if self.variant == "RIGID" else sum(loads)
+                if load > 0:
+                    lb[w] = max(lb.get(w, 0), math.ceil(load / Q - 1e-9))     # stessa Var per linea in RIGID_LINE
+        if lb:
+            relaxed.setAttr("LB", list(lb), list(lb.values()))
+        return n_cuts + len(lb)
+
+
+    def bound(self, cuts=False, output=False):
+        """
+        Lower bound dal rilassamento continuo (relax(cuts) + LP).
+        Ritorna stats: bound, status, relax_s (copia + tagli), lp_s, cuts e le w (v) frazionarie con le
+        chiavi di get_solution(), da passare a compute_VOS_VOR per gli indicatori del rilassamento.
+        """
+        t0 = time.perf_counter()
+        n_cuts = self.relax(cuts)
+        relax_s = time.perf_counter() - t0
+        relaxed = self.relaxed
+        relaxed.Params.OutputFlag = int(output)
+        relaxed.optimize()
+        stats = {"variant": self.variant, "status": relaxed.Status, "cuts": n_cuts,
+                 "bound": relaxed.ObjVal if relaxed.Status == GRB.OPTIMAL else None,
+                 "relax_s": relax_s, "lp_s": relaxed.Runtime}
+        if relaxed.Status == GRB.OPTIMAL:
+            X = np.array(relaxed.getAttr("X"))
+            for kind in ("w", "v") if self.has_v else ("w",):
+                stats[kind] = {solution_key(kind, key): float(X[col]) for key, col in self._columns(kind)}
+        return stats
+
+
+    def _columns(self, kind):
+        """[(chiave del modello, indice di colonna)] delle variabili di tipo kind"""
+        if self.index is not None:
+            return [(decode_key(self.index, kind, self.index["var_key"][col]), col)
+                    for kind_, start, stop in self.index["blocks"] if kind_ == kind for col in range(start, stop)]
+        return [(key, var.index) for key, var in getattr(self, kind).items()]
 
 
 
-class MBA_ILP_SEMI:
-    def __init__(self, data):
+    # === ESTRAZIONE SOLUZIONE ===
+    def get_solution_arrays(self):
         """
-        Modello BASE (solo x e v, no z e w)
-        data_sets: dizionario con set e parametri dal data loader
-        Es: data_sets['L'], data_sets['N'], data_sets['K'], ecc.
+        Valori X letti in blocco (una sola chiamata getAttr per tipo di variabile).
+        Ritorna {tipo: (chiavi, array dei valori)} per x, w, z (e v), senza usare i VarName.
+        In modalità lean le chiavi sono le righe intere di self.index["var_key"] (decode_key per leggerle).
         """
-        self.data = data
-        self.model = Model("MBA_ILP_SEMI")
-        self.x = {}
-        self.w = {}
-        self.z = {}
+        out = {}
+        if self.index is not None:
+            X = np.array(self.model.getAttr("X"))
+            for kind, start, stop in self.index["blocks"]:
+                out[kind] = (self.index["var_key"][start:stop], X[start:stop])
+            return out
+        for kind in ("x", "w", "z", "v"):
+            var_dict = getattr(self, kind)
+            if kind == "v" and not self.has_v:
+                continue
+            keys = list(var_dict)
+            values = np.array(self.model.getAttr("X", list(var_dict.values()))) if keys else np.zeros(0)
+            out[kind] = (keys, values)
+        return out
 
 
+    def get_solution(self):
+        """
+        Soluzione come dizionari sparsi (solo valori non nulli):
+        x_sol[(k,i,j,l)] = 1, w_sol[(l,h)] = moduli, z_sol[(k,j)] = 1, v_sol[(i,j)] = moduli.
+        La linea l è restituita come stringa (stesso formato dei JSON salvati).
+        """
+        x_sol, w_sol, z_sol, v_sol = {}, {}, {}, {}
 
-    # === COSTRUZIONE MODELLO ===
-    def build(self):
-        d = self.data
-        K, p, Pk, Akl, Blk = d["K"], d["p"], d["Pk"], d["Akl"], d["Blk"]
-        L, A, S, J, T, Nl = d["L"], d["A"], d["S"], d["J"], d["T"], d["Nl"]
-        Delta_plus, Delta_minus = d["Delta_plus"], d["Delta_minus"]
-        t, Q = d["t"], d["Q"]
-        alpha = d["alpha"]
+        if self.model.Status != GRB.OPTIMAL:   # Se non c’è soluzione ottima, ritorna vuoto
+            return (x_sol, w_sol, z_sol, v_sol) if self.has_v else (x_sol, w_sol, z_sol)
+
+        arrays = self.get_solution_arrays()
+        if self.index is not None:
+            nonzero = {kind: [(decode_key(self.index, kind, keys[n]), values[n]) for n in np.flatnonzero(values > 1e-6)]
+                       for kind, (keys, values) in arrays.items()}
+        else:
+            nonzero = {kind: [(keys[n], values[n]) for n in np.flatnonzero(values > 1e-6)]
+                       for kind, (keys, values) in arrays.items()}
+
+        for key, _ in nonzero["x"]:
+            x_sol[solution_key("x", key)] = 1
+        for key, val in nonzero["w"]:
+            w_sol[solution_key("w", key)] = int(round(val))
+        for key, _ in nonzero["z"]:
+            z_sol[solution_key("z", key)] = 1
+        for key, val in nonzero.get("v", []):
+            v_sol[solution_key("v", key)] = int(round(val))
+        # x / z fissate dal presolve (non sono variabili del modello)
+        ps = self.data.get("presolve", {})
+        x_sol.update({solution_key("x", key): 1 for key in ps.get("x_fixed", [])})
+        z_sol.update({solution_key("z", key): 1 for key in ps.get("z_fixed", [])})
+
+        if self.has_v:
+            return x_sol, w_sol, z_sol, v_sol
+        return x_sol, w_sol, z_sol
 
-        # === Variabili ===
-        # x_{k,i,j,l}
-        for k in K:
-            for (i, j, l) in A:
-                self.x[k, i, j, l] = self.model.addVar(
-                    vtype=GRB.BINARY, name=f"x_{k}_{i}_{j}_{l}"
-                )
-        # w_{l,h}
-        for l, segs in Nl.items():
-            for h in range(len(segs)):
-                self.w[l, h] = self.model.addVar(
-                    vtype=GRB.INTEGER, lb=0, name=f"w_{l}_{h}"
-                )
-        # z_{k,j}
-        for k in K:
-            for j in (J):  
-                self.z[k, j] = self.model.addVar(
-                    vtype=GRB.BINARY, name=f"z_{k}_{j}"
-                )
 
-        self.model.update()
 
-        # === Funzione Obiettivo ===
-        obj = quicksum(t[l, h] * self.w[l, h] for (l, h) in self.w)
-        obj += alpha * quicksum(p[k] * self.z[k, j] for (k, j) in self.z)
-        self.model.setObjective(obj, GRB.MINIMIZE)
+    # === MIP START ===
+    def set_start(self, solution, kinds=("x", "w", "z", "v")):
+        """
+        Imposta l'attributo Start da una soluzione nel formato di get_solution() (anche di un'altra
+        variante): chiavi assenti -> 0, quindi v = 0 se la soluzione non ha v.
+        I tipi non in kinds restano GRB.UNDEFINED (start parziale, Gurobi completa il resto).
+        """
+        sols = dict(zip(("x", "w", "z", "v"), solution))
 
+        def start_values(kind, keys):
+            if kind not in kinds:
+                return [GRB.UNDEFINED] * len(keys)
+            sol = sols.get(kind, {})
+            return [sol.get(solution_key(kind, key), 0) for key in keys]
 
-        # === Vincoli ===
-        # (1) Assegnazione: ogni arco del path della richiesta k deve essere servito da una sola linea
-        for k in K:
-            path = Pk[k]
-            for (i, j) in zip(path[:-1], path[1:]):
-                # Linee che servono questo arco
-                valid_lines = [l for (ii, jj, l) in A if (ii, jj) == (i, j)]
+        if self.index is not None:
+            all_vars = self.model.getVars()
+            for kind, start, stop in self.index["blocks"]:
+                keys = [decode_key(self.index, kind, e) for e in self.index["var_key"][start:stop]]
+                self.model.setAttr("Start", all_vars[start:stop], start_values(kind, keys))
+            return
+        for kind in ("x", "w", "z", "v"):
+            var_dict = getattr(self, kind)
+            if var_dict:
+                self.model.setAttr("Start", list(var_dict.values()), start_values(kind, list(var_dict)))
 
-                # Crea variabili x solo per le linee compatibili
-                for l in valid_lines:
-                    if (k, i, j, l) not in self.x:
-                        self.x[k, i, j, l] = self.model.addVar(vtype=GRB.BINARY, name=f"x_{k}_{i}_{j}_{l}")
 
-                # Vincolo di assegnazione: somma delle x deve essere 1
-                if valid_lines:
-                    expr = quicksum(self.x[k, i, j, l] for l in valid_lines)
-                    self.model.addConstr(expr == 1, name=f"assign_{k}_{i}_{j}")
-                else:
-                    print(f"⚠️ Nessuna linea collega ({i},{j}) per la richiesta {k} → vincolo saltato")
 
 
-        
-        # (2) Continuità su S
-        for (l, k), triples in Blk.items():
-            for (i, j, m) in triples:
-                if j in S:
-                    self.model.addConstr(
-                        self.x[k, i, j, l] == self.x[k, j, m, l],
-                        name=f"contS_{k}_{l}_{i}_{j}_{m}"
-                    )
 
+class MBA_ILP_RIGID(MBA_ILP_CORE):
+    """
+    Modello RIGID: numero di moduli costante lungo tutta la linea
+    - Variabili: x, w, z
+    - Capacità per arco, w[l,h] = w[l,0]
+    """
+    variant = "RIGID"
 
-        # (3) Continuità su J
-        for (l, k), triples in Blk.items():
-            for (i, j, m) in triples:
-                if j in J:
-                    self.model.addConstr(
-                        self.x[k, i, j, l] - self.x[k, j, m, l] <= self.z[k, j],
-                        name=f"contJ_plus_{k}_{l}_{i}_{j}_{m}"
-                    )
-                    self.model.addConstr(
-                        self.x[k, i, j, l] - self.x[k, j, m, l] >= -self.z[k, j],
-                        name=f"contJ_minus_{k}_{l}_{i}_{j}_{m}"
-                    )
+    def _build_variant(self):
+        d = self.data
+        p, Nl, Q = d["p"], d["Nl"], d["Q"]
+        fixed_load = d.get("presolve", {}).get("arc_load", {})   # carico delle x fissate dal presolve
 
-                    
-        
+        """
         # (4) Capacità per segmento h della linea l — DIREZIONALE
         for l, segs in Nl.items():
             for h, seg in enumerate(segs):
@@ -302,177 +404,179 @@ class MBA_ILP_SEMI:
                     ) <= Q * self.w[l, h],
                     name=f"capacity_{l}_{h}"
                 )
+        """
+        # (4) Capacità per segmento h della linea l — PER ARCO
+        cap = self.constrs.setdefault("cap", {})
+        for l, segs in Nl.items():
+            for h, seg in enumerate(segs):
+                arcs_h = [(seg[ii], seg[ii+1]) for ii in range(len(seg) - 1)]
+                for (i, j) in arcs_h:
+                    cap[l, h, i, j] = self.model.addConstr(
+                        quicksum(p[k] * self.x[k, i, j, l] for k in arc_requests(d, l, i, j) if (k, i, j, l) in self.x)
+                        + fixed_load.get((l, i, j), 0.0) <= Q * self.w[l, h],
+                        name=f"cap_l{l}_h{h}_{i}_{j}"
+                    )
 
-    
-        # (5) Conservazione moduli ai nodi speciali (T e J)
-        for j in (set(J) | set(T)):
-            incoming = [self.w[ell, h] for (ell, h) in Delta_minus.get(j, [])]   # Se j non è presente, ritorna la lista vuota []
-            outgoing = [self.w[ell, h] for (ell, h) in Delta_plus.get(j, [])]    # Se j non è presente, ritorna la lista vuota []
-            self.model.addConstr(quicksum(incoming) == quicksum(outgoing),
-                                 name=f"w_flow_{j}")
 
+        # (5) Moduli/bus COSTANTI per linea: w[l,h] = w[l,0] per ogni h
+        self._tie_modules()
 
-        
 
-    # === RISOLUIZONE MODELLO ===
-    def solve(self):
-        self.model.optimize()
-        print(f"Optimization status: {self.model.Status}")
-        if self.model.Status == GRB.INFEASIBLE:
-            print("⚠️ Modello infeasible, calcolo IIS...")
-            # Gurobi cerca di individuare quali vincoli (o bounds) creano l’infeasibilità.
-            # model.ilp.iis file che contiene solo quei vincoli
-            self.model.computeIIS()
-            self.model.write("results/cross/model.ilp")     # modello completo
-            self.model.write("results/cross/model.iis.ilp")  # vincoli che creano conflitto e rendono il modello unfeasable
+    def _tie_modules(self):
+        constW = self.constrs.setdefault("constW", {})
+        for l, segs in self.data["Nl"].items():
+            for h in range(1, len(segs)):
+                constW[l, h] = self.model.addConstr(self.w[l, h] == self.w[l, 0], name=f"constW_{l}_{h}")
 
 
 
 
-    # === ESTRAZIONE SOLUZIONE ===
-    def get_solution(self):
-        x_sol, w_sol, z_sol = {}, {}, {}
 
-        if self.model.Status != GRB.OPTIMAL:   # Se non c’è soluzione ottima, ritorna vuoto
-            return x_sol, w_sol, z_sol
-
-        for v in self.model.getVars():
-            if v.VarName.startswith("x") and v.X > 1e-6:
-                _, k, i, j, ell = v.VarName.split("_")
-                k, i, j = int(k), int(i), int(j)
-                x_sol[(k, i, j, ell)] = 1
-            elif v.VarName.startswith("w") and v.X > 1e-6:
-                _, ell, h = v.VarName.split("_")
-                h = int(h)
-                w_sol[(ell, h)] = int(round(v.X))
-            elif v.VarName.startswith("z") and v.X > 1e-6:
-                _, k, j = v.VarName.split("_")
-                k, j = int(k), int(j)
-                z_sol[(k, j)] = 1
-        return x_sol, w_sol, z_sol
-    
+class MBA_ILP_RIGID_LINE(MBA_ILP_RIGID):
+    """
+    RIGID ridotto: una sola variabile intera w_l per linea, costo Σ_h t[l,h], niente righe constW.
+    self.w[l,h] è una vista: tutti i segmenti della linea puntano alla stessa Var w_l (self.w_line[l]),
+    quindi capacità, get_solution(), set_start() e save_results / compute_VOS_VOR restano per (l,h).
+    Solo build(): build_matrix() / build_lean() e derive() lavorano sulle w per segmento.
+    """
+    line_w = True
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.model.ModelName = "MBA_ILP_RIGID_LINE"
+        self.w_line = {}
 
 
+    def _add_w(self):
+        Nl, t = self.data["Nl"], self.data["t"]
+        for l, segs in Nl.items():
+            self.w_line[l] = self.model.addVar(
+                vtype=GRB.INTEGER, lb=0, obj=sum(t[l, h] for h in range(len(segs))), name=f"w_{l}"
+            )
+            for h in range(len(segs)):
+                self.w[l, h] = self.w_line[l]
+
 
+    def _tie_modules(self):
+        pass        # w già costante per costruzione
 
-class MBA_ILP_FLEX:
+
+    def build_matrix(self):
+        raise ValueError("MBA_ILP_RIGID_LINE supporta solo build() (forma matriciale: MBA_ILP_RIGID).")
+
+
+    def build_lean(self):
+        raise ValueError("MBA_ILP_RIGID_LINE supporta solo build() (forma matriciale: MBA_ILP_RIGID).")
+
+
+
+
+
+class MBA_ILP_SEMI(MBA_ILP_CORE):
     """
-    Modello FULL (con ribilanciamento moduli)
-    - Variabili: x, w, z, v
-    - Considera il tempo di rebalancing tr[(i,j)]
+    Modello SEMI: moduli per segmento, senza ribilanciamento
+    - Variabili: x, w, z
+    - Capacità per segmento, conservazione dei moduli in T e J
     """
+    variant = "SEMI"
 
-    def __init__(self, data):
-        self.data = data
-        self.model = Model("MBA_ILP_FLEX")
-        self.x = {}
-        self.w = {}
-        self.z = {}
-        self.v = {}
-
-    def build(self):
+    def _build_variant(self):
         d = self.data
-        K, p, Pk, Blk = d["K"], d["p"], d["Pk"], d["Blk"]
-        L, A, S, J, T, Nl = d["L"], d["A"], d["S"], d["J"], d["T"], d["Nl"]
+        J, T = d["J"], d["T"]
         Delta_plus, Delta_minus = d["Delta_plus"], d["Delta_minus"]
-        t, tr, Q = d["t"], d["tr"], d["Q"]
-        R = d["R"]
-        alpha = d["alpha"]
 
-        # === VARIABILI ===
-        for k in K:
-            for (i, j, l) in A:
-                self.x[k, i, j, l] = self.model.addVar(vtype=GRB.BINARY, name=f"x_{k}_{i}_{j}_{l}")
+        # (4) Capacità per segmento h della linea l — DIREZIONALE
+        add_segment_capacity(self)
 
-        for l, segs in Nl.items():
-            for h in range(len(segs)):
-                self.w[l, h] = self.model.addVar(vtype=GRB.INTEGER, lb=0, name=f"w_{l}_{h}")
+        # (5) Conservazione moduli ai nodi speciali (T e J)
+        flow = self.constrs.setdefault("flow", {})
+        for j in (set(J) | set(T)):
+            incoming = [self.w[ell, h] for (ell, h) in Delta_minus.get(j, [])]   # Se j non è presente, ritorna la lista vuota []
+            outgoing = [self.w[ell, h] for (ell, h) in Delta_plus.get(j, [])]    # Se j non è presente, ritorna la lista vuota []
+            flow[j] = self.model.addConstr(quicksum(incoming) == quicksum(outgoing),
+                                           name=f"w_flow_{j}")
 
-        for k in K:
-            for j in J:
-                self.z[k, j] = self.model.addVar(vtype=GRB.BINARY, name=f"z_{k}_{j}")
 
-        for (i, j) in R:
-            self.v[i, j] = self.model.addVar(vtype=GRB.INTEGER, lb=0, name=f"v_{i}_{j}")
 
-        self.model.update()
 
-        # === OBIETTIVO ===
-        obj = quicksum(t[l, h] * self.w[l, h] for (l, h) in self.w)
-        obj += quicksum(tr[i, j] * self.v[i, j] for (i, j) in self.v)
-        obj += alpha * quicksum(p[k] * self.z[k, j] for (k, j) in self.z)
-        self.model.setObjective(obj, GRB.MINIMIZE)
 
-        # === VINCOLI ===
-        # (1) assegnazione x
-        for k in K:
-            path = Pk[k]
-            for (i, j) in zip(path[:-1], path[1:]):
-                valid_lines = [l for (ii, jj, l) in A if (ii, jj) == (i, j)]
-                if valid_lines:
-                    self.model.addConstr(quicksum(self.x[k, i, j, l] for l in valid_lines) == 1,
-                                         name=f"assign_{k}_{i}_{j}")
+class MBA_ILP_FLEX(MBA_ILP_CORE):
+    """
+    Modello FULL (con ribilanciamento moduli)
+    - Variabili: x, w, z, v
+    - Considera il tempo di rebalancing tr[(i,j)]
+    """
+    variant = "FLEX"
+    has_v = True
 
-        # (2) continuità su S
-        for (l, k), triples in Blk.items():
-            for (i, j, m) in triples:
-                if j in S:
-                    self.model.addConstr(self.x[k, i, j, l] == self.x[k, j, m, l],
-                                         name=f"contS_{k}_{l}_{i}_{j}_{m}")
+    def _build_variant(self):
+        d = self.data
+        J, T = d["J"], d["T"]
+        Delta_plus, Delta_minus = d["Delta_plus"], d["Delta_minus"]
+        tr = d["tr"]
+        R, R_in, R_out = d["R"], d["R_in"], d["R_out"]
+
+        # === VARIABILI v (ribilanciamento) ===
+        for (i, j) in R:
+            self.v[i, j] = self.model.addVar(vtype=GRB.INTEGER, lb=0, obj=tr[i, j], name=f"v_{i}_{j}")
 
-        # (3) Continuità su J
-        for (l, k), triples in Blk.items():
-            for (i, j, m) in triples:
-                if j in J:
-                    self.model.addConstr(
-                        self.x[k, i, j, l] - self.x[k, j, m, l] <= self.z[k, j],
-                        name=f"contJ_plus_{k}_{l}_{i}_{j}_{m}"
-                    )
-                    self.model.addConstr(
-                        self.x[k, i, j, l] - self.x[k, j, m, l] >= -self.z[k, j],
-                        name=f"contJ_minus_{k}_{l}_{i}_{j}_{m}"
-                    )
-                    
         # (4) capacità
-        for l, segs in Nl.items():
-            for h, seg in enumerate(segs):
-                arcs_h = [(seg[i], seg[i + 1]) for i in range(len(seg) - 1)]
-                self.model.addConstr(
-                    quicksum(p[k] * self.x[k, i, j, l]
-                             for k in K for (i, j) in arcs_h
-                             if (k, i, j, l) in self.x) <= Q * self.w[l, h],
-                    name=f"capacity_{l}_{h}")
+        add_segment_capacity(self)
 
         # (5) conservazione moduli (T e J)
+        flow = self.constrs.setdefault("flow", {})
         for j in (set(J) | set(T)):
             incoming = [self.w[ell, h] for (ell, h) in Delta_minus.get(j, [])]
             outgoing = [self.w[ell, h] for (ell, h) in Delta_plus.get(j, [])]
-            v_in  = [self.v[i, j] for (i, j2) in self.v if j2 == j]
-            v_out = [self.v[j, h] for (j2, h) in self.v if j2 == j]
-            self.model.addConstr(quicksum(incoming + v_in) == quicksum(outgoing + v_out),
-                                 name=f"flow_balance_{j}")
-
-    # === RISOLUZIONE E ESTRAZIONE ===
-    def solve(self):
-        self.model.optimize()
-        print(f"Optimization status: {self.model.Status}")
+            v_in  = [self.v[i, j] for i in R_in.get(j, [])]
+            v_out = [self.v[j, m] for m in R_out.get(j, [])]
+            flow[j] = self.model.addConstr(quicksum(incoming + v_in) == quicksum(outgoing + v_out),
+                                           name=f"flow_balance_{j}")
+
+
+
+
+
+# === CHIAVI DELLA SOLUZIONE ===
+def solution_key(kind, key):
+    """Chiave del modello -> chiave di get_solution (int per nodi/richieste, linea come stringa)"""
+    if kind == "x":
+        k, i, j, l = key
+        return int(k), int(i), int(j), str(l)
+    if kind == "w":
+        l, h = key
+        return str(l), int(h)
+    return int(key[0]), int(key[1])   # z: (k, j) / v: (i, j)
 
-    def get_solution(self):
-        x_sol, w_sol, z_sol, v_sol = {}, {}, {}, {}
-        if self.model.Status != GRB.OPTIMAL:
-            return x_sol, w_sol, z_sol, v_sol
 
-        for v in self.model.getVars():
-            if v.VarName.startswith("x") and v.X > 1e-6:
-                _, k, i, j, l = v.VarName.split("_")
-                x_sol[(int(k), int(i), int(j), l)] = 1
-            elif v.VarName.startswith("w") and v.X > 1e-6:
-                _, l, h = v.VarName.split("_")
-                w_sol[(l, int(h))] = int(round(v.X))
-            elif v.VarName.startswith("z") and v.X > 1e-6:
-                _, k, j = v.VarName.split("_")
-                z_sol[(int(k), int(j))] = 1
-            elif v.VarName.startswith("v") and v.X > 1e-6:
-                _, i, j = v.VarName.split("_")
-                v_sol[(int(i), int(j))] = int(round(v.X))
-        return x_sol, w_sol, z_sol, v_sol
+
+# === CAPACITÀ PER SEGMENTO (SEMI e FLEX) ===
+def add_segment_capacity(mba):
+    d = mba.data
+    p, Nl, Q = d["p"], d["Nl"], d["Q"]
+    fixed_load = d.get("presolve", {}).get("arc_load", {})   # carico delle x fissate dal presolve
+
+    cap = mba.constrs.setdefault("cap", {})
+    for l, segs in Nl.items():
+        for h, seg in enumerate(segs):
+            arcs_h = [(seg[i], seg[i + 1]) for i in range(len(seg) - 1)]
+            cap[l, h] = mba.model.addConstr(
+                quicksum(p[k] * mba.x[k, i, j, l]
+                         for (i, j) in arcs_h for k in arc_requests(d, l, i, j)
+                         if (k, i, j, l) in mba.x)                          # x fissate dal presolve
+                + sum(fixed_load.get((l, i, j), 0.0) for (i, j) in arcs_h) <= Q * mba.w[l, h],
+                name=f"capacity_{l}_{h}")
+
+
+
+# === TUTTE LE VARIANTI DA UN SOLO CORE ===
+def build_all_variants(data, variants=(MBA_ILP_RIGID, MBA_ILP_SEMI, MBA_ILP_FLEX)):
+    """
+    Costruisce una sola volta il core (x, w, z, vincoli 1-3) e ne deriva le varianti.
+    Ritorna {variante: oggetto modello}, es. {"RIGID": MBA_ILP_RIGID, ...}
+    """
+    core = MBA_ILP_CORE(data)
+    core.build()
+    models = {cls.variant: core.derive(cls) for cls in variants}
+    core.model.dispose()
+    return models
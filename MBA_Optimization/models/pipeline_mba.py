@@ -0,0 +1,189 @@
+### Pipeline di risoluzione RIGID -> SEMI -> FLEX ###
+### Ogni ottimo viene passato al modello successivo come MIP start:
+###  - RIGID -> SEMI: solo x / z (start parziale). Le w costanti per linea in genere violano la
+###                   conservazione in T/J, quindi Gurobi completa le w con x / z fissate
+###  - SEMI  -> FLEX: soluzione completa con v = 0, sempre ammissibile
+### In alternativa solve_parallel: varianti indipendenti in processi separati, Threads divisi sui core
+
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from gurobipy import GRB
+from models.models_mba import MBA_ILP_RIGID, MBA_ILP_SEMI, MBA_ILP_FLEX
+
+
+CASCADE = ("RIGID", "SEMI", "FLEX")
+MODELS = {"RIGID": MBA_ILP_RIGID, "SEMI": MBA_ILP_SEMI, "FLEX": MBA_ILP_FLEX}
+
+# tipi di variabili passati come Start da una variante alla successiva
+START_KINDS = {("RIGID", "SEMI"): ("x", "z")}
+
+
+
+def first_incumbent_callback(stats):
+    """Callback che registra tempo e valore della prima soluzione intera trovata"""
+    def callback(model, where):
+        if where == GRB.Callback.MIPSOL and "first_incumbent_s" not in stats:
+            stats["first_incumbent_s"] = model.cbGet(GRB.Callback.RUNTIME)
+            stats["first_incumbent_obj"] = model.cbGet(GRB.Callback.MIPSOL_OBJ)
+    return callback
+
+
+
+def solve_cascade(models, warm_start=True, order=CASCADE):
+    """
+    Risolve i modelli {variante: oggetto modello} nell'ordine dato (es. output di build_all_variants).
+    Con warm_start=True la soluzione ottima di ogni variante è lo Start della successiva.
+    Ritorna {variante: statistiche} con obj, runtime, tempo/valore del primo incumbent, nodi.
+    """
+    stats, previous, previous_variant = {}, None, None
+    for variant in order:
+        mba = models[variant]
+        print(f"\n============== RISOLUZIONE {variant} MODEL ==============\n")
+
+        if warm_start and previous is not None:
+            mba.set_start(previous, START_KINDS.get((previous_variant, variant), ("x", "w", "z", "v")))
+
+        run = {"warm_start": warm_start and previous is not None}
+        mba.solve(first_incumbent_callback(run))
+        run["status"] = mba.model.Status
+        run["runtime_s"] = mba.model.Runtime
+        run["nodes"] = mba.model.NodeCount
+        run["obj"] = mba.model.ObjVal if mba.model.SolCount > 0 else None
+        stats[variant] = run
+
+        solution = mba.get_solution()
+        previous = solution if mba.model.Status == GRB.OPTIMAL else None
+        previous_variant = variant
+        print("\n\n\n")
+
+    return stats
+
+
+
+def bound_variants(models, cuts=False, save_path=None):
+    """
+    Lower bound del rilassamento continuo (bound()) di ogni modello {variante: oggetto modello},
+    da guardare prima di un MIP lungo. Con RIGID, SEMI e FLEX e save_path: indicatori VOS / VOR / VOF
+    calcolati sulle w (v) del rilassamento con compute_VOS_VOR (stime, non bound degli indicatori interi).
+    Ritorna {variante: stats di bound()} (+ "indicators" se calcolati).
+    """
+    bounds = {}
+    for variant, mba in models.items():
+        bounds[variant] = st = mba.bound(cuts)
+        print(f"{variant}: LP bound {st['bound']}, {st['cuts']} tagli, {st['relax_s'] + st['lp_s']:.3f}s")
+    if save_path is not None and all(bounds.get(v, {}).get("bound") is not None for v in CASCADE):
+        from utils.f_for_results import compute_VOS_VOR     # import qui: matplotlib / networkx
+        bounds["indicators"] = compute_VOS_VOR(models["RIGID"].data, bounds["RIGID"]["w"], bounds["SEMI"]["w"],
+                                               bounds["FLEX"]["w"], bounds["FLEX"].get("v"), save_path=save_path)
+    return bounds
+
+
+
+# === RISOLUZIONE IN PARALLELO (un processo per variante) ===
+class MBA_Result:
+    """
+    Risultato di una variante risolta in un processo separato.
+    Stessa interfaccia usata da display_results / save_results_model (get_solution(), has_v);
+    model è None perché il modello Gurobi resta nel processo worker.
+    """
+    def __init__(self, variant, solution, stats):
+        self.variant = variant
+        self.has_v = len(solution) == 4
+        self.solution = solution
+        self.stats = stats
+        self.model = None
+
+    def get_solution(self):
+        return self.solution
+
+
+
+def split_threads(cores, variants):
+    """
+    Divide il budget di core tra le varianti che girano in contemporanea.
+    Il resto della divisione va alle ultime varianti (FLEX è la più pesante).
+    """
+    n_workers = max(1, min(len(variants), cores))
+    base, extra = divmod(max(cores, n_workers), n_workers)
+    threads = {}
+    for n, variant in enumerate(variants):
+        slot = n % n_workers
+        threads[variant] = base + (1 if slot >= n_workers - extra else 0)
+    return n_workers, threads
+
+
+
+def _solve_worker(variant, data, threads, build, params, save_to, backend):
+    """Costruisce e risolve una variante nel processo worker; ritorna solo dati serializzabili"""
+    if backend != "gurobi":
+        from models.backends_mba import solve_variant     # import qui: backends_mba importa questo modulo
+        t0 = time.perf_counter()
+        result = solve_variant(data, variant, backend, threads=threads, **(params or {}))
+        result.stats.update({"threads": threads, "wall_s": time.perf_counter() - t0})
+        return variant, result.solution, result.stats
+
+    t0 = time.perf_counter()
+    mba = MODELS[variant](data)
+    getattr(mba, build)()
+    t_build = time.perf_counter() - t0
+
+    mba.model.Params.LogToConsole = 0    # log dei worker non mescolati sulla console del padre
+    mba.model.Params.Threads = threads
+    for name, value in (params or {}).items():
+        mba.model.setParam(name, value)
+
+    stats = {"threads": threads, "build_s": t_build}
+    mba.solve(first_incumbent_callback(stats))
+    stats["status"] = mba.model.Status
+    stats["runtime_s"] = mba.model.Runtime
+    stats["nodes"] = mba.model.NodeCount
+    stats["obj"] = mba.model.ObjVal if mba.model.SolCount > 0 else None
+    stats["wall_s"] = time.perf_counter() - t0
+
+    # stessi file .ilp/.sol che save_results scrive quando ha il modello
+    if save_to is not None:
+        folder, prefix = save_to
+        os.makedirs(folder, exist_ok=True)
+        for ext in ("model.ilp", "solution.sol"):
+            try:
+                mba.model.write(os.path.join(folder, f"{prefix}_{variant}_{ext}"))
+            except Exception as e:
+                print(f"⚠️ Errore nel salvataggio {ext} ({variant}): {e}")
+
+    solution = mba.get_solution()
+    mba.model.dispose()
+    return variant, solution, stats
+
+
+
+def solve_parallel(data, variants=CASCADE, cores=None, build="build", params=None, save_to=None,
+                   backend="gurobi"):
+    """
+    Risolve le varianti in processi separati (spawn), con Threads di Gurobi divisi su un budget di core.
+    - cores: core totali da usare (default: tutti quelli della macchina)
+    - build: "build" / "build_matrix" / "build_lean"
+    - params: parametri Gurobi aggiuntivi per ogni worker, es. {"TimeLimit": 600}
+              (con backend != "gurobi": opzioni di solve_variant, es. {"time_limit": 600})
+    - save_to: (cartella, prefisso) per scrivere {prefisso}_{variante}_model.ilp / _solution.sol (solo gurobi)
+    - backend: "gurobi" oppure un backend di backends_mba (highs / scipy / cbc / cpsat), senza licenza
+    Ritorna {variante: MBA_Result} nell'ordine di variants.
+    """
+    cores = cores or os.cpu_count() or 1
+    n_workers, threads = split_threads(cores, variants)
+    data = {k: v for k, v in data.items() if k != "model"}   # il Model Gurobi non è serializzabile
+
+    print(f"\n============== RISOLUZIONE IN PARALLELO: {', '.join(variants)} "
+          f"({n_workers} processi, {cores} core) ==============\n")
+    results = {}
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context("spawn")) as pool:
+        futures = [pool.submit(_solve_worker, variant, data, threads[variant], build, params, save_to, backend)
+                   for variant in variants]
+        for future in as_completed(futures):
+            variant, solution, stats = future.result()
+            results[variant] = MBA_Result(variant, solution, stats)
+            print(f"{variant}: status {stats['status']}, obj {stats['obj']}, "
+                  f"{stats['threads']} threads, {stats['wall_s']:.2f}s")
+
+    return {variant: results[variant] for variant in variants}
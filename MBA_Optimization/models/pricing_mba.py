@@ -0,0 +1,202 @@
+### Pricing per richiesta: cammino minimo sulle linee lungo il path Pk ###
+### Tolte le righe di capacità, il problema in (x, z) si separa per richiesta:
+###     min Σ c[k,i,j,l] x[k,i,j,l] + α p_k Σ z[k,j]   s.t. (1) assegnazione, (2) continuità S, (3) continuità J
+### cioè un cammino minimo su un grafo a strati: strato = arco servito del path, nodo = linea.
+### Transizione a -> b al nodo j (a ≠ b), se a prosegue su (j,m) oppure b serviva già (i,j):
+###  - j in S: vietata (contS)
+###  - j in J: costo α p_k (z[k,j] = 1)
+### altrimenti libera. Tutte le richieste sono risolte insieme, uno strato alla volta (NumPy).
+### balance_matrix: bilancio dei moduli (w, v) in T ∪ J, per i sottoproblemi di circolazione.
+
+import numpy as np
+import scipy.sparse as sp
+from utils.f_for_data import path_x_keys
+
+
+
+
+
+class MBA_Pricing:
+    """
+    Struttura del pricing, costruita una volta per data:
+    - x_keys:   colonne x nello stesso ordine di path_x_keys / blocco x di matrix_mba
+    - col_*:    richiesta, strato, segmento (l,h) e domanda p di ogni colonna
+    - edge_*:   transizioni ammesse tra colonne di strati consecutivi, con costo e nodo del cambio
+    price(col_cost) -> (costo per richiesta, colonne x scelte, archi di transizione scelti)
+    """
+
+    def __init__(self, data):
+        d = self.data = data
+        K, p, Pk, L_ij = d["K"], d["p"], d["Pk"], d["L_ij"]
+        S, J, alpha = set(d["S"]), set(d["J"]), d["alpha"]
+
+        self.segments = [(l, h) for l, segs in d["Nl"].items() for h in range(len(segs))]
+        seg_of = {(l, i, j): n for n, (l, h) in enumerate(self.segments)
+                  for (i, j) in zip(d["Nl"][l][h][:-1], d["Nl"][l][h][1:])}
+
+        self.K = list(K)
+        self.x_keys = path_x_keys(K, Pk, L_ij)
+        col_of = {key: n for n, key in enumerate(self.x_keys)}
+        n_cols = len(self.x_keys)
+        self.col_k = np.empty(n_cols, dtype=np.int64)
+        self.col_step = np.empty(n_cols, dtype=np.int64)
+        self.col_seg = np.full(n_cols, -1, dtype=np.int64)
+        self.col_p = np.empty(n_cols)
+        self.n_steps = np.zeros(len(self.K), dtype=np.int64)
+
+        src, dst, cost, node = [], [], [], []
+        for r, k in enumerate(self.K):
+            arcs = [(i, j) for (i, j) in zip(Pk[k][:-1], Pk[k][1:]) if L_ij.get((i, j))]
+            self.n_steps[r] = len(arcs)
+            for s, (i, j) in enumerate(arcs):
+                for l in L_ij[i, j]:
+                    c = col_of[k, i, j, l]
+                    self.col_k[c], self.col_step[c], self.col_p[c] = r, s, p[k]
+                    self.col_seg[c] = seg_of.get((l, i, j), -1)
+                if s == 0:
+                    continue
+                (a0, a1), lines_prev, lines_next = arcs[s - 1], L_ij[arcs[s - 1]], L_ij[i, j]
+                for a in lines_prev:
+                    for b in lines_next:
+                        c_ab, j_node = 0.0, -1
+                        if a != b and a1 == i and (a in lines_next or b in lines_prev):
+                            if i in S:
+                                continue                          # contS: cambio vietato
+                            if i in J:
+                                c_ab, j_node = alpha * p[k], i    # contJ: paga z[k,i]
+                        src.append(col_of[k, a0, a1, a])
+                        dst.append(col_of[k, i, j, b])
+                        cost.append(c_ab)
+                        node.append(j_node)
+
+        self.edge_src = np.array(src, dtype=np.int64)
+        self.edge_dst = np.array(dst, dtype=np.int64)
+        self.edge_cost = np.array(cost, dtype=float)
+        self.edge_node = np.array(node, dtype=np.int64)    # -1: nessun z
+        edge_step = self.col_step[self.edge_dst]
+        self.step_edges = [np.flatnonzero(edge_step == s) for s in range(int(self.n_steps.max(initial=0)))]
+
+        # ultima colonna di ogni richiesta: strato n_steps - 1
+        last = self.col_step == self.n_steps[self.col_k] - 1
+        self.last_cols = np.flatnonzero(last)
+
+        # colonne e archi sono contigui per richiesta (path_x_keys scorre K in ordine)
+        self.req_cols = np.searchsorted(self.col_k, np.arange(len(self.K) + 1))
+        self.req_edges = np.searchsorted(self.col_k[self.edge_dst], np.arange(len(self.K) + 1))
+
+
+
+    def col_costs(self, seg_price):
+        """Costo di ogni colonna x con prezzo per segmento: seg_price[l,h] · p_k"""
+        seg_price = np.concatenate([seg_price, [0.0]])       # col_seg = -1 -> prezzo 0
+        return seg_price[self.col_seg] * self.col_p
+
+
+
+    def price(self, col_cost):
+        """
+        Cammino minimo per tutte le richieste.
+        Ritorna (valore per richiesta, maschera delle x scelte, indici degli archi di transizione scelti).
+        Valore inf se la richiesta non ha un'assegnazione ammissibile.
+        """
+        n_cols = len(self.x_keys)
+        val = np.where(self.col_step == 0, col_cost, np.inf)
+        pred = np.full(n_cols, -1, dtype=np.int64)          # arco entrante scelto
+
+        for s, edges in enumerate(self.step_edges):
+            if s == 0 or len(edges) == 0:
+                continue
+            dst = self.edge_dst[edges]
+            cand = val[self.edge_src[edges]] + self.edge_cost[edges]
+            best = np.full(n_cols, np.inf)
+            np.minimum.at(best, dst, cand)
+            layer = np.flatnonzero(self.col_step == s)
+            val[layer] = best[layer] + col_cost[layer]
+            # arco che realizza il minimo (primo in caso di parità)
+            hit = np.flatnonzero(cand <= best[dst])
+            first = np.unique(dst[hit], return_index=True)[1]
+            pred[dst[hit[first]]] = edges[hit[first]]
+
+        # colonna finale migliore di ogni richiesta
+        n_req = len(self.K)
+        value = np.where(self.n_steps == 0, 0.0, np.inf)
+        np.minimum.at(value, self.col_k[self.last_cols], val[self.last_cols])
+        order = np.lexsort((val[self.last_cols], self.col_k[self.last_cols]))
+        ks, first = np.unique(self.col_k[self.last_cols][order], return_index=True)
+        cur = np.full(n_req, -1, dtype=np.int64)
+        cur[ks] = self.last_cols[order][first]
+        cur[~np.isfinite(value)] = -1
+
+        # ricostruzione all'indietro, tutte le richieste insieme
+        chosen = np.zeros(n_cols, dtype=bool)
+        used_edges = []
+        while np.any(cur >= 0):
+            active = cur[cur >= 0]
+            chosen[active] = True
+            e = pred[active]
+            used_edges.append(e[e >= 0])
+            cur[cur >= 0] = np.where(e >= 0, self.edge_src[np.maximum(e, 0)], -1)
+        used_edges = np.concatenate(used_edges) if used_edges else np.zeros(0, dtype=np.int64)
+        return value, chosen, used_edges
+
+
+
+    def price_request(self, r, col_cost):
+        """
+        Cammino minimo di una sola richiesta r (col_cost: costi delle sue colonne, in ordine).
+        Ritorna (valore, colonne x scelte, archi di transizione scelti); valore inf se non ammissibile.
+        """
+        c0, c1 = self.req_cols[r], self.req_cols[r + 1]
+        e0, e1 = self.req_edges[r], self.req_edges[r + 1]
+        if c0 == c1:
+            return 0.0, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        step = self.col_step[c0:c1]
+        val = np.where(step == 0, col_cost, np.inf)
+        pred = np.full(c1 - c0, -1, dtype=np.int64)
+        src, dst = self.edge_src[e0:e1] - c0, self.edge_dst[e0:e1] - c0
+        cand_cost = self.edge_cost[e0:e1]
+        for e in range(e1 - e0):              # archi in ordine di strato: val[src] è già definitivo
+            cand = val[src[e]] + cand_cost[e] + col_cost[dst[e]]
+            if cand < val[dst[e]]:
+                val[dst[e]], pred[dst[e]] = cand, e
+        last = np.flatnonzero(step == step.max())
+        cur = last[np.argmin(val[last])]
+        value = float(val[cur])
+        if not np.isfinite(value):
+            return value, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        cols, edges = [cur], []
+        while pred[cur] >= 0:
+            edges.append(pred[cur])
+            cur = src[pred[cur]]
+            cols.append(cur)
+        return value, np.array(cols[::-1]) + c0, np.array(edges[::-1], dtype=np.int64) + e0
+
+
+
+    def z_keys(self, used_edges):
+        """Cambi (k, j) pagati dagli archi di transizione scelti"""
+        e = used_edges[self.edge_node[used_edges] >= 0]
+        return {(self.K[self.col_k[self.edge_dst[n]]], int(self.edge_node[n])) for n in e}
+
+
+
+
+
+def balance_matrix(data, segments, R=()):
+    """
+    Bilancio dei moduli in T ∪ J: Σ w_in + v_in - Σ w_out - v_out = 0, una riga per nodo (ordinati).
+    Colonne: segments (l,h) poi archi di ribilanciamento R. Ritorna csr_matrix (nodi × colonne).
+    """
+    seg_pos = {key: n for n, key in enumerate(segments)}
+    nodes = {j: r for r, j in enumerate(sorted(set(data["J"]) | set(data["T"])))}
+    rows, cols, vals = [], [], []
+    for j, r in nodes.items():
+        for key in data["Delta_minus"].get(j, []):
+            rows.append(r); cols.append(seg_pos[key]); vals.append(1.0)
+        for key in data["Delta_plus"].get(j, []):
+            rows.append(r); cols.append(seg_pos[key]); vals.append(-1.0)
+    for n, (i, j) in enumerate(R):
+        for node, sign in ((j, 1.0), (i, -1.0)):
+            if node in nodes:
+                rows.append(nodes[node]); cols.append(len(segments) + n); vals.append(sign)
+    return sp.csr_matrix((vals, (rows, cols)), shape=(len(nodes), len(segments) + len(R)))
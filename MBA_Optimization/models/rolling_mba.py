@@ -0,0 +1,190 @@
+### Rolling horizon su più fasce orarie (stessi path, domanda p diversa per periodo) ###
+### Finestre sovrapposte di `window` periodi che avanzano di `step`: ogni finestra è risolta con la
+### domanda di picco dei suoi periodi (il piano deve servirli tutti) e viene fissata solo per i primi
+### `step` periodi; l'ultima finestra copre quelli rimasti.
+### Il modello (MODELS[variant]) è costruito una volta: tra una finestra e l'altra cambiano solo
+###  - i coefficienti p_k delle x nelle righe di capacità (chgCoeff)
+###  - il costo α p_k delle z e, con presolve_assignments, RHS di capacità (carico fisso) e ObjCon
+### Moduli (w, v) della finestra precedente: MIP start e, con max_change, bound w_prev ± max_change
+### (riallocazione limitata tra fasce; se la finestra diventa non ammissibile i bound vengono tolti).
+
+import time
+from gurobipy import GRB
+from models.pipeline_mba import MODELS
+from utils.f_for_data import arc_requests
+
+
+
+
+
+class MBA_Demand:
+    """
+    Parti di un modello già costruito che dipendono dalla domanda p (usato da rolling / scenari):
+    coefficienti p_k delle x nelle righe di capacità, costi α p_k delle z e, con il presolve,
+    RHS di capacità (carico fisso) e ObjCon. set(p) le aggiorna senza ricostruire il modello
+    e sostituisce mba.data con una copia che contiene la p corrente (relax, set_parameters ed
+    euristiche leggono la domanda da mba.data; il data di partenza non viene modificato).
+    """
+
+    def __init__(self, mba):
+        d = mba.data
+        self.mba = mba
+        mba.model.update()
+        ps = d.get("presolve", {})
+        x_fixed = set(ps.get("x_fixed", []))
+        self.cap_terms, self.cap_fixed = [], []
+        for key, constr in mba.constrs["cap"].items():
+            if mba.variant == "RIGID":
+                l, h, i, j = key
+                arcs = [(i, j)]
+            else:
+                l, h = key
+                seg = d["Nl"][l][h]
+                arcs = list(zip(seg[:-1], seg[1:]))
+            fixed = []
+            for (i, j) in arcs:
+                for k in arc_requests(d, l, i, j):
+                    if (k, i, j, l) in mba.x:
+                        self.cap_terms.append((constr, mba.x[k, i, j, l], k))
+                    elif (k, i, j, l) in x_fixed:
+                        fixed.append(k)
+            if fixed:
+                self.cap_fixed.append((constr, fixed))
+        self.z_keys = list(mba.z)
+        self.z_vars = list(mba.z.values())
+        self.z_fixed = ps.get("z_fixed", [])
+
+
+    def set(self, p):
+        """Aggiorna coefficienti, costi e RHS del modello (e mba.data["p"]) alla domanda p {k: p_k}"""
+        self.mba.data = {**self.mba.data, "p": p}
+        model, alpha = self.mba.model, self.mba.data["alpha"]
+        for constr, var, k in self.cap_terms:
+            model.chgCoeff(constr, var, p[k])
+        if self.z_vars:
+            model.setAttr("Obj", self.z_vars, [alpha * p[k] for (k, j) in self.z_keys])
+        if self.cap_fixed:
+            model.setAttr("RHS", [c for c, _ in self.cap_fixed],
+                          [-float(sum(p[k] for k in ks)) for _, ks in self.cap_fixed])
+        model.ObjCon = alpha * sum(p[k] for (k, j) in self.z_fixed)
+
+
+
+
+
+class MBA_RollingHorizon:
+    """
+    Piano multi-periodo con finestre scorrevoli su un solo modello Gurobi.
+    - period_demand: {periodo: {k: p_k}} in ordine temporale (es. load_period_demand)
+    - solve(): risolve tutte le finestre; ritorna stats (per finestra e totali)
+    - plan: {periodo: {"window", "obj", "solution"}} con solution nel formato di get_solution()
+    """
+
+    def __init__(self, data, period_demand, variant="FLEX", window=2, step=1, max_change=None):
+        if variant not in MODELS:
+            raise ValueError(f"Variante sconosciuta: {variant}")
+        if not 1 <= step <= window:
+            raise ValueError(f"Serve 1 ≤ step ≤ window (step={step}, window={window})")
+        self.data = data
+        self.period_demand = period_demand
+        self.periods = list(period_demand)
+        self.variant = variant
+        self.window = window
+        self.step = step
+        self.max_change = max_change
+        self.mba = None
+        self.plan = {}
+        self.stats = {}
+
+
+
+    # === COSTRUZIONE ===
+    def build(self):
+        t0 = time.perf_counter()
+        d = self.data
+        mba = self.mba = MODELS[self.variant](d)
+        mba.build()
+        mba.model.update()
+
+        self.demand = MBA_Demand(mba)
+        self._w_vars = list(dict.fromkeys(mba.w.values()))
+        self.stats["build_s"] = time.perf_counter() - t0
+
+
+
+    def _bound_modules(self, previous):
+        """w ∈ [w_prev - max_change, w_prev + max_change] (None: nessun bound)"""
+        if previous is None:
+            lb, ub = [0.0] * len(self._w_vars), [GRB.INFINITY] * len(self._w_vars)
+        else:
+            lb = [max(0.0, v - self.max_change) for v in previous]
+            ub = [v + self.max_change for v in previous]
+        self.mba.model.setAttr("LB", self._w_vars, lb)
+        self.mba.model.setAttr("UB", self._w_vars, ub)
+
+
+
+    # === FINESTRE ===
+    def windows(self):
+        """[(periodi della finestra, periodi fissati)]"""
+        out = []
+        for start in range(0, len(self.periods), self.step):
+            periods = self.periods[start:start + self.window]
+            last = start + self.step >= len(self.periods)
+            out.append((periods, periods if last else periods[:self.step]))
+            if last:
+                break
+        return out
+
+
+
+    # === RISOLUZIONE ===
+    def solve(self, time_limit=None):
+        if self.mba is None:
+            self.build()
+        model = self.mba.model
+        if time_limit is not None:
+            model.Params.TimeLimit = time_limit
+        t0 = time.perf_counter()
+        K = self.data["K"]
+        previous_sol, previous_w = None, None
+        self.plan, runs = {}, []
+
+        for n, (periods, committed) in enumerate(self.windows()):
+            t1 = time.perf_counter()
+            p = {k: max(self.period_demand[t].get(k, 0) for t in periods) for k in K}
+            self.demand.set(p)
+            if previous_sol is not None:
+                self.mba.set_start(previous_sol)
+            if self.max_change is not None:
+                self._bound_modules(previous_w)
+            update_s = time.perf_counter() - t1
+
+            model.optimize()
+            relaxed = False
+            if self.max_change is not None and previous_w is not None and model.SolCount == 0 \
+                    and model.Status in (GRB.INFEASIBLE, GRB.INF_OR_UNBD):
+                self._bound_modules(None)       # riallocazione libera per questa finestra
+                model.optimize()
+                relaxed = True
+
+            run = {"window": n, "periods": periods, "committed": committed, "status": model.Status,
+                   "obj": model.ObjVal if model.SolCount > 0 else None, "relaxed": relaxed,
+                   "update_s": update_s, "runtime_s": time.perf_counter() - t1}
+            runs.append(run)
+            if model.SolCount == 0:
+                previous_sol = previous_w = None
+                continue
+            solution = self.mba.get_solution()
+            previous_sol = solution
+            previous_w = [v.X for v in self._w_vars]
+            for t in committed:
+                self.plan[t] = {"window": n, "obj": run["obj"], "solution": solution}
+
+        self.stats.update({
+            "windows": runs,
+            "periods": len(self.plan),
+            "plan_cost": sum(entry["obj"] for entry in self.plan.values()),
+            "runtime_s": time.perf_counter() - t0,
+        })
+        return self.stats
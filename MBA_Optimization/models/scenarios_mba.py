@@ -0,0 +1,82 @@
+### Stessa rete, molti profili di domanda (richieste × scenari) ###
+### Tra uno scenario e l'altro cambia solo p_k, cioè i coefficienti delle x nelle righe di capacità.
+### Il multi-scenario nativo di Gurobi (NumScenarios) ammette solo modifiche di obiettivo, bound e RHS,
+### non dei coefficienti di matrice: qui gli scenari sono risolti in batch su un solo modello
+### (MBA_Demand.set tra uno scenario e l'altro, niente rebuild).
+### MIP start dallo scenario già risolto più vicino (distanza L1 dei vettori di domanda): solo x / z,
+### le w del vicino possono non bastare se la domanda cresce.
+
+import time
+import numpy as np
+import pandas as pd
+from gurobipy import GRB
+from models.pipeline_mba import MODELS
+from models.rolling_mba import MBA_Demand
+
+
+
+
+
+class MBA_Scenarios:
+    """
+    Risolve una variante per ogni colonna di profiles.
+    - profiles: DataFrame (indice request_id, una colonna per scenario, es. load_demand_profiles)
+      oppure {scenario: {k: p_k}}; richieste assenti in uno scenario -> p = 0
+    - solve(): ritorna un DataFrame con una riga per scenario (obj, stato, moduli, ribilanciamento, cambi, tempi)
+    - solutions: {scenario: soluzione nel formato di get_solution()}
+    """
+
+    def __init__(self, data, profiles, variant="FLEX"):
+        if variant not in MODELS:
+            raise ValueError(f"Variante sconosciuta: {variant}")
+        if not isinstance(profiles, pd.DataFrame):
+            profiles = pd.DataFrame(profiles)
+        self.data = data
+        self.variant = variant
+        self.profiles = profiles.reindex(data["K"]).fillna(0)
+        self.mba = None
+        self.solutions = {}
+        self.stats = {}
+
+
+
+    def build(self):
+        t0 = time.perf_counter()
+        self.mba = MODELS[self.variant](self.data)
+        self.mba.build()
+        self.demand = MBA_Demand(self.mba)
+        self.stats["build_s"] = time.perf_counter() - t0
+
+
+
+    def solve(self, time_limit=None):
+        if self.mba is None:
+            self.build()
+        model, K = self.mba.model, self.data["K"]
+        if time_limit is not None:
+            model.Params.TimeLimit = time_limit
+        P = self.profiles.to_numpy(dtype=float)                 # richieste × scenari
+        solved, rows = [], []
+        t0 = time.perf_counter()
+        for n, scenario in enumerate(self.profiles.columns):
+            t1 = time.perf_counter()
+            self.demand.set(dict(zip(K, P[:, n].tolist())))
+            if solved:
+                near = min(solved, key=lambda m: np.abs(P[:, m] - P[:, n]).sum())
+                self.mba.set_start(self.solutions[self.profiles.columns[near]], ("x", "z"))
+            model.optimize()
+
+            solution = self.mba.get_solution() if model.Status == GRB.OPTIMAL else None
+            if solution is not None:
+                self.solutions[scenario] = solution
+                solved.append(n)
+            rows.append({
+                "scenario": scenario, "demand": float(P[:, n].sum()), "status": model.Status,
+                "obj": model.ObjVal if model.SolCount > 0 else None,
+                "modules": sum(solution[1].values()) if solution else None,
+                "rebalancing": sum(solution[3].values()) if solution and len(solution) == 4 else None,
+                "transfers": len(solution[2]) if solution else None,
+                "runtime_s": model.Runtime, "total_s": time.perf_counter() - t1,
+            })
+        self.stats["runtime_s"] = time.perf_counter() - t0
+        return pd.DataFrame(rows)
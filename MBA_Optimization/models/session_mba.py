@@ -0,0 +1,168 @@
+### Sessione incrementale sulla domanda: richieste aggiunte / tolte / modificate su un modello già costruito ###
+### Per una richiesta k cambiano solo:
+###  - colonne x[k,·] e z[k,·] (con i coefficienti p_k nelle righe di capacità già esistenti)
+###  - righe (1) assegnazione, (2) continuità S, (3) continuità J della richiesta
+### w, v, righe di capacità e righe della variante restano quelle del modello.
+### solve() riottimizza con la soluzione precedente come MIP start:
+###  - dopo remove_request lo start è completo (meno carico: resta ammissibile)
+###  - dopo add_request / update_passengers solo x / z delle richieste invariate, Gurobi completa il resto
+
+import time
+from gurobipy import GRB, quicksum
+from utils.f_for_data import path_x_keys, path_z_keys, request_sets
+
+
+
+
+
+class MBA_Session:
+    """
+    Avvolge un modello MBA_ILP_* già costruito con build() (o build_matrix()) e ne mantiene
+    data (K, p, Pk, Akl, Blk) allineato alle modifiche.
+    Le modifiche vanno su una copia di data (anche mba.data punta alla copia): gli altri modelli
+    costruiti sullo stesso dizionario (build_all_variants) non cambiano.
+    - add_request(k, path_nodes, p) / remove_request(k) / update_passengers(k, p)
+    - solve(): riottimizzazione con MIP start dalla soluzione precedente; ritorna stats
+    """
+
+    def __init__(self, mba):
+        d = mba.data
+        if mba.index is not None:
+            raise ValueError("MBA_Session richiede un modello con dizionari x/z/constrs (build() o build_matrix()).")
+        if "presolve" in d:
+            raise ValueError("MBA_Session non supporta presolve_assignments (x fissate fuori dal modello).")
+        # copia dei contenitori modificati dalla sessione (come MBA_Demand.set); arc_req va ricostruito
+        d = {key: val for key, val in d.items() if key != "arc_req"}
+        d.update(K=list(d["K"]), p=dict(d["p"]), Pk=dict(d["Pk"]), Akl=dict(d["Akl"]), Blk=dict(d["Blk"]))
+        self.mba = mba
+        self.data = mba.data = d
+        self.model = mba.model
+        self.cap_of = {}        # (l,i,j) -> riga di capacità che contiene x[k,i,j,l]
+        for l, segs in d["Nl"].items():
+            for h, seg in enumerate(segs):
+                for (i, j) in zip(seg[:-1], seg[1:]):
+                    key = (l, h, i, j) if mba.variant == "RIGID" else (l, h)
+                    self.cap_of[l, i, j] = mba.constrs["cap"][key]
+
+        # colonne e righe di ogni richiesta (per remove_request)
+        self.columns = {k: {"x": [], "z": []} for k in d["K"]}
+        for key in mba.x:
+            self.columns[key[0]]["x"].append(key)
+        for key in mba.z:
+            self.columns[key[0]]["z"].append(key)
+        self.rows = {k: [] for k in d["K"]}
+        for family in ("assign", "contS", "contJ_plus", "contJ_minus"):
+            for key in mba.constrs.get(family, {}):
+                self.rows[key[0]].append((family, key))
+
+        self.previous = None
+        self.changed = set()            # richieste aggiunte / modificate dall'ultimo solve()
+        self.history = []
+
+
+
+    # === MODIFICHE ===
+    def add_request(self, k, path_nodes, p):
+        d, mba = self.data, self.mba
+        if k in self.columns:
+            raise ValueError(f"Richiesta {k} già presente")
+        Akl_k, Blk_k = request_sets(k, path_nodes, d)
+        d["K"].append(k)
+        d["p"][k] = p
+        d["Pk"][k] = path_nodes
+        d["Akl"].update(Akl_k)
+        for key, triples in Blk_k.items():
+            d["Blk"][key] = d["Blk"].get(key, []) + triples      # le liste possono essere ancora condivise
+        d.pop("arc_req", None)          # indice arco -> richieste: ricostruito al prossimo uso
+
+        # === colonne ===
+        cols = self.columns[k] = {"x": path_x_keys([k], d["Pk"], d["L_ij"]),
+                                  "z": path_z_keys([k], d["Pk"], d["L_ij"], d["J"])}
+        for (k_, i, j, l) in cols["x"]:
+            mba.x[k, i, j, l] = self.model.addVar(vtype=GRB.BINARY, name=f"x_{k}_{i}_{j}_{l}")
+        for (k_, j) in cols["z"]:
+            mba.z[k, j] = self.model.addVar(vtype=GRB.BINARY, obj=d["alpha"] * p, name=f"z_{k}_{j}")
+        self.model.update()
+        for (k_, i, j, l) in cols["x"]:
+            self.model.chgCoeff(self.cap_of[l, i, j], mba.x[k, i, j, l], p)
+
+        # === righe (1)-(3), come in MBA_ILP_CORE._build_core ===
+        rows = self.rows[k] = []
+        S, J, L_ij = set(d["S"]), set(d["J"]), d["L_ij"]
+        for (i, j) in zip(path_nodes[:-1], path_nodes[1:]):
+            if L_ij.get((i, j)):
+                c = self.model.addConstr(quicksum(mba.x[k, i, j, l] for l in L_ij[i, j]) == 1,
+                                         name=f"assign_{k}_{i}_{j}")
+                rows.append(self._keep("assign", (k, i, j), c))
+        for (l, k_), triples in Blk_k.items():
+            for (i, j, m) in triples:
+                a, b = mba.x[k, i, j, l], mba.x[k, j, m, l]
+                if j in S:
+                    c = self.model.addConstr(a == b, name=f"contS_{k}_{l}_{i}_{j}_{m}")
+                    rows.append(self._keep("contS", (k, l, i, j, m), c))
+                if j in J and (k, j) in mba.z:
+                    c = self.model.addConstr(a - b <= mba.z[k, j], name=f"contJ_plus_{k}_{l}_{i}_{j}_{m}")
+                    rows.append(self._keep("contJ_plus", (k, l, i, j, m), c))
+                    c = self.model.addConstr(a - b >= -mba.z[k, j], name=f"contJ_minus_{k}_{l}_{i}_{j}_{m}")
+                    rows.append(self._keep("contJ_minus", (k, l, i, j, m), c))
+        self.changed.add(k)
+
+
+    def remove_request(self, k):
+        d, mba = self.data, self.mba
+        if k not in self.columns:
+            raise ValueError(f"Richiesta {k} non presente")
+        cols = self.columns.pop(k)
+        self.model.remove([mba.x.pop(key) for key in cols["x"]] + [mba.z.pop(key) for key in cols["z"]])
+        self.model.remove([mba.constrs[family].pop(key) for family, key in self.rows.pop(k)])
+
+        d["K"].remove(k)
+        for name in ("p", "Pk"):
+            d[name].pop(k, None)
+        for key in [key for key in d["Akl"] if key[0] == k]:
+            del d["Akl"][key]
+        for key in [key for key in d["Blk"] if key[1] == k]:
+            del d["Blk"][key]
+        d.pop("arc_req", None)
+        self.changed.discard(k)
+
+
+    def update_passengers(self, k, p):
+        d, mba = self.data, self.mba
+        if k not in self.columns:
+            raise ValueError(f"Richiesta {k} non presente")
+        d["p"][k] = p
+        for (k_, i, j, l) in self.columns[k]["x"]:
+            self.model.chgCoeff(self.cap_of[l, i, j], mba.x[k, i, j, l], p)
+        for key in self.columns[k]["z"]:
+            mba.z[key].Obj = d["alpha"] * p
+        self.changed.add(k)
+
+
+    def _keep(self, family, key, constr):
+        self.mba.constrs.setdefault(family, {})[key] = constr
+        return family, key
+
+
+
+    # === RISOLUZIONE ===
+    def solve(self, callback=None):
+        t0 = time.perf_counter()
+        self.model.update()
+        if self.previous is not None:
+            # add / update: w, v del vecchio ottimo in genere non bastano più -> start solo su x, z
+            self.mba.set_start(self.previous, ("x", "z") if self.changed else ("x", "w", "z", "v"))
+            changed = [var for k in self.changed for kind in ("x", "z")
+                       for var in (getattr(self.mba, kind)[key] for key in self.columns[k][kind])]
+            if changed:
+                self.model.setAttr("Start", changed, [GRB.UNDEFINED] * len(changed))
+        self.model.optimize(callback)
+
+        run = {"status": self.model.Status, "obj": self.model.ObjVal if self.model.SolCount > 0 else None,
+               "requests": len(self.data["K"]), "changed": len(self.changed),
+               "runtime_s": self.model.Runtime, "total_s": time.perf_counter() - t0}
+        self.history.append(run)
+        if self.model.Status == GRB.OPTIMAL:
+            self.previous = self.mba.get_solution()
+        self.changed = set()
+        return run
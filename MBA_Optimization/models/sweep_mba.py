@@ -0,0 +1,118 @@
+### Analisi di sensitività su Q, alpha e velocità con un solo modello per variante ###
+### Le varianti sono costruite una volta (build_all_variants); per ogni punto della griglia cambiano solo:
+###  - Q:      coefficiente -Q delle w nelle righe di capacità (chgCoeff)
+###  - alpha:  costo α p_k delle z (e ObjCon dei cambi fissati dal presolve)
+###  - speed_lines / speed_reb: costi t delle w e tr delle v, scalati come base_speed / speed
+###            (tempi di percorrenza = lunghezza / velocità, assign_travel_times)
+### Ogni punto parte dalla soluzione del punto precedente della stessa variante (MIP start).
+### prune=True (ricerca del punto migliore): prima del MIP il lower bound LP del punto (bound()); se non
+### scende sotto il miglior obiettivo già trovato per la variante, il punto è scartato senza MIP.
+### Risultati in un unico DataFrame: una riga per (punto, variante).
+
+import itertools
+import time
+from collections import defaultdict
+import pandas as pd
+from gurobipy import GRB
+from models.models_mba import build_all_variants
+from models.pipeline_mba import MODELS, CASCADE
+
+
+SWEEP_PARAMS = ("Q", "alpha", "speed_lines", "speed_reb")
+
+
+
+def set_parameters(mba, Q=None, alpha=None, t=None, tr=None):
+    """
+    Cambia i parametri di un modello già costruito (None = invariato):
+    Q capacità del modulo, alpha peso dei cambi, t {(l,h): tempo}, tr {(i,j): tempo}.
+    I valori correnti vanno in una copia di mba.data (relax() / bound() ne leggono Q e p per i tagli).
+    """
+    changed = {name: val for name, val in (("Q", Q), ("alpha", alpha), ("t", t), ("tr", tr)) if val is not None}
+    d = mba.data = {**mba.data, **changed}
+    model = mba.model
+    if Q is not None:
+        for key, constr in mba.constrs["cap"].items():
+            model.chgCoeff(constr, mba.w[key[0], key[1]], -Q)       # p x - Q w ≤ -carico fisso
+    if alpha is not None:
+        if mba.z:
+            model.setAttr("Obj", list(mba.z.values()), [alpha * d["p"][k] for (k, j) in mba.z])
+        z_fixed = d.get("presolve", {}).get("z_fixed", [])
+        model.ObjCon = alpha * sum(d["p"][k] for (k, j) in z_fixed)
+    if t is not None:
+        cost = defaultdict(float)                # w per linea (MBA_ILP_RIGID_LINE): somma dei segmenti
+        for key, var in mba.w.items():
+            cost[var] += t[key]
+        model.setAttr("Obj", list(cost), list(cost.values()))
+    if tr is not None and mba.v:
+        model.setAttr("Obj", list(mba.v.values()), [tr[key] for key in mba.v])
+
+
+
+def parameter_sweep(data, grid, variants=CASCADE, base_speeds=(35, 40), time_limit=None, output=False,
+                    prune=False, cuts=True):
+    """
+    grid: {parametro: [valori]} con parametri in SWEEP_PARAMS (quelli assenti restano come in data);
+    i punti sono il prodotto cartesiano, nell'ordine dato.
+    base_speeds: velocità (linee, ribilanciamento) con cui sono stati calcolati data["t"] e data["tr"].
+    prune: scarta i punti il cui bound LP (con i tagli di relax() se cuts) non batte l'incumbent della variante.
+    Ritorna un DataFrame con parametri, variante, obj, stato, tempi, moduli, ribilanciamento e cambi
+    (con prune anche bound e pruned; per i punti scartati obj / stato sono None).
+    """
+    unknown = set(grid) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Parametri non supportati: {sorted(unknown)} (ammessi: {SWEEP_PARAMS})")
+    names = [name for name in SWEEP_PARAMS if name in grid]
+    t0 = time.perf_counter()
+    models = build_all_variants(data, variants=[MODELS[v] for v in variants])
+    build_s = time.perf_counter() - t0
+    for mba in models.values():
+        mba.model.Params.OutputFlag = int(output)
+        if time_limit is not None:
+            mba.model.Params.TimeLimit = time_limit
+
+    rows, previous, best = [], {}, {}
+    for values in itertools.product(*(grid[name] for name in names)):
+        point = dict(zip(names, values))
+        Q = point.get("Q", data["Q"])
+        t = tr = None
+        if "speed_lines" in point:
+            t = {key: val * base_speeds[0] / point["speed_lines"] for key, val in data["t"].items()}
+        if "speed_reb" in point:
+            tr = {key: val * base_speeds[1] / point["speed_reb"] for key, val in data["tr"].items()}
+
+        for variant, mba in models.items():
+            t1 = time.perf_counter()
+            set_parameters(mba, Q=point.get("Q"), alpha=point.get("alpha"), t=t, tr=tr)
+            lp = mba.bound(cuts)["bound"] if prune and variant in best else None
+            if lp is not None and lp >= best[variant] - 1e-6 * max(1.0, abs(best[variant])):
+                rows.append({**point, "variant": variant, "status": None, "obj": None, "bound": lp,
+                             "pruned": True, "total_s": time.perf_counter() - t1})
+                continue
+            start = previous.get(variant)
+            if start is not None:
+                # con Q più piccolo le w precedenti possono non bastare: start solo su x / z
+                mba.set_start(start[0], ("x", "w", "z", "v") if Q >= start[1] else ("x", "z"))
+            mba.model.optimize()
+            solution = mba.get_solution() if mba.model.Status == GRB.OPTIMAL else None
+            if solution is not None:
+                previous[variant] = (solution, Q)
+                best[variant] = min(best.get(variant, mba.model.ObjVal), mba.model.ObjVal)
+            rows.append({
+                **point, "variant": variant, "status": mba.model.Status,
+                "obj": mba.model.ObjVal if mba.model.SolCount > 0 else None,
+                "modules": sum(solution[1].values()) if solution else None,
+                "rebalancing": sum(solution[3].values()) if solution and len(solution) == 4 else None,
+                "transfers": len(solution[2]) if solution else None,
+                "warm_start": start is not None,
+                "runtime_s": mba.model.Runtime, "total_s": time.perf_counter() - t1,
+                **({"bound": lp, "pruned": False} if prune else {}),
+            })
+
+    for mba in models.values():
+        if mba.relaxed is not None:
+            mba.relaxed.dispose()
+        mba.model.dispose()
+    table = pd.DataFrame(rows)
+    table.attrs["build_s"] = build_s
+    return table
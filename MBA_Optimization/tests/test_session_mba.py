@@ -0,0 +1,43 @@
+### MBA_Session modifica solo la propria copia di data
+### Uso (dalla cartella MBA_Optimization):
+###     python -m pytest -q tests
+
+import copy
+from models.models_mba import MBA_ILP_SEMI, MBA_ILP_FLEX, build_all_variants
+from models.session_mba import MBA_Session
+from utils.f_for_data import arc_requests
+from benchmarks.synthetic_instance import make_synthetic_instance
+
+SESSION_KEYS = ("K", "p", "Pk", "Akl", "Blk")
+
+
+
+def test_session_does_not_touch_shared_data():
+    data = make_synthetic_instance(n_lines=3, n_requests=9, seed=0)
+    k_new = data["K"].pop()                               # richiesta aggiunta dalla sessione
+    path, p = data["Pk"].pop(k_new), data["p"].pop(k_new)
+    data["Akl"] = {key: v for key, v in data["Akl"].items() if key[0] != k_new}
+    data["Blk"] = {key: v for key, v in data["Blk"].items() if key[1] != k_new}
+    data.pop("arc_req", None)
+
+    models = build_all_variants(data, variants=(MBA_ILP_SEMI, MBA_ILP_FLEX))
+    other = models["SEMI"]
+    before = copy.deepcopy({key: data[key] for key in SESSION_KEYS})
+    l, i, j = next((l, i, j) for (k, i, j, l) in other.x)
+    served = arc_requests(data, l, i, j)
+
+    session = MBA_Session(models["FLEX"])
+    k_first = data["K"][0]
+    session.add_request(k_new, path, p)
+    session.update_passengers(k_first, 2 * data["p"][k_first])
+    session.remove_request(data["K"][1])
+
+    # il modello della sessione vede le modifiche
+    assert session.mba.data is session.data
+    assert k_new in session.data["K"] and data["K"][1] not in session.data["K"]
+    assert session.data["p"][k_first] == 2 * data["p"][k_first]
+    # l'altro modello (e il dizionario del chiamante) no
+    assert other.data is data
+    for key in SESSION_KEYS:
+        assert data[key] == before[key], key
+    assert arc_requests(data, l, i, j) == served
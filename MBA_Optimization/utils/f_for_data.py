@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 from collections import defaultdict
 import networkx as nx
 import math
@@ -13,7 +14,8 @@ def load_sets(lines_csv, stops_csv, G_lines=None):
     """
     Load transit network data and create sets for ILP.
     Assumes 'geometry' column in lines CSV is a list of ints (stop_ids).
-    Returns sets: L, V, S, J, T, A, R, Nl
+    Returns sets: L, V, S, J, T, A, R, Nl, the index L_ij: (i,j) -> lines
+    and the adjacency lists R_out / R_in of the rebalancing arcs.
     """
     df_lines = pd.read_csv(lines_csv)
     df_stops = pd.read_csv(stops_csv)
@@ -69,6 +71,12 @@ def load_sets(lines_csv, stops_csv, G_lines=None):
                 u, v = nodes[i], nodes[i+1]
                 A.add((u, v, line_ref))
 
+    # === Indice arco -> linee L_ij ===
+    # (i,j) -> lista ordinata delle linee che servono l'arco (evita scansioni di A)
+    L_ij = defaultdict(list)
+    for (u, v, line_ref) in sorted(A):
+        L_ij[(u, v)].append(line_ref)
+
     # === Rebalancing arcs R ===
     R_nodes = list(T.union(J))
     R = set()
@@ -77,6 +85,14 @@ def load_sets(lines_csv, stops_csv, G_lines=None):
             if i != j:
                 R.add((R_nodes[i], R_nodes[j]))
 
+    # === Adiacenze di R (liste in/out per nodo) ===
+    # R_out[i] = [j : (i,j) in R],  R_in[j] = [i : (i,j) in R]
+    R_out = defaultdict(list)
+    R_in = defaultdict(list)
+    for (i, j) in sorted(R):
+        R_out[i].append(j)
+        R_in[j].append(i)
+
     # === Segments Nl ===
     Nl = {}  # dict: line_ref -> list of segments (tuple of nodes)
     for line_ref, nodes in line_nodes.items():
@@ -110,6 +126,9 @@ def load_sets(lines_csv, stops_csv, G_lines=None):
         'T': T,   # terminali
         'A': A,   # archi (i,j,ℓ)
         'R': R,   # archi di ribilanciamento (i,j)
+        'L_ij': dict(L_ij),   # indice arco (i,j) -> linee [ℓ]
+        'R_out': dict(R_out),   # i -> nodi j con (i,j) in R
+        'R_in': dict(R_in),     # j -> nodi i con (i,j) in R
         'Nl': {l: sorted(v) for l,v in Nl.items()}  # segmenti N_l {ℓ : [segmenti]}
     }
 
@@ -131,73 +150,344 @@ def load_requests(requests_csv, data):
     K = df_requests['request_id'].tolist()
     p = dict(zip(df_requests['request_id'], df_requests['avg_passengers_per_time_unit']))
 
-    Nl = data['Nl']
-    L  = data['L']
-    A  = data['A']
-
     Pk  = {}
     Akl = {}
-    
-    ok = {}
-    dk = {}
     Blk = defaultdict(list)
 
-    # Dizionario rapido: (i,j) -> linee che coprono quell'arco
-    L_ij = defaultdict(set)
-    for (i, j, ell) in A:
-        L_ij[(i, j)].add(ell)
-
     for _, row in df_requests.iterrows():
         k = row['request_id']
         path_nodes = json.loads(row['path_nodes'])
 
-        # === Origine e destinazione ===
-        ok[k] = path_nodes[0]
-        dk[k] = path_nodes[-1]
-
         # === Pk: lista di nodi ===
         Pk[k] = path_nodes
 
-        # === Akl: archi del percorso k mappati su linee ===
-        for i in range(len(path_nodes) - 1):
-            u, v = path_nodes[i], path_nodes[i + 1]
-            found = False  # flag per verificare se l’arco è stato trovato almeno in una linea
-
-            for ℓ in L:
-                for h, seg in enumerate(Nl[ℓ]):
-                    # Scorri ogni segmento della linea ℓ e controlla se (u,v) compare come arco consecutivo
-                    for idx in range(len(seg) - 1):
-                        if seg[idx] == u and seg[idx + 1] == v:
-                            # Arco (u,v) trovato nella direzione corretta nel segmento h della linea ℓ
-                            Akl.setdefault((k, ℓ), []).append((u, v, h))
-                            found = True
-                            break  # esci dal ciclo sul segmento (passa al prossimo segmento)
-                    if found:
-                        break  # esci dal ciclo su h (passa alla prossima linea se serve)
-
-            # Se dopo aver controllato tutte le linee l’arco non è stato trovato, segnala errore
-            if not found:
-                raise ValueError(
-                    f"Arco ({u},{v}) della richiesta {k} non trovato in alcuna linea o direzione."
-                )
-
-
-        # === Blk: triple consecutive (i,j,m) sul path k ===
-        for t in range(1, len(path_nodes)-1):
-            i, j, m = path_nodes[t-1], path_nodes[t], path_nodes[t+1]
-
-            # escludi se j è origine o destinazione di quella richiesta
-            if j == ok[k] or j == dk[k]:
-                continue
+        # === Akl, Blk della richiesta ===
+        Akl_k, Blk_k = request_sets(k, path_nodes, data)
+        Akl.update(Akl_k)
+        for key, triples in Blk_k.items():
+            Blk[key].extend(triples)
 
-            common_lines = L_ij.get((i, j), set()) & L_ij.get((j, m), set())
-            for l in common_lines:
-                Blk[(l, k)].append((i, j, m))
+    # === indice inverso arco di linea -> richieste (righe di capacità) ===
+    data["arc_req"] = build_arc_requests(K, Pk, data['L_ij'])
 
     return K, p, Pk, Akl, Blk
 
 
 
+def request_sets(k, path_nodes, data):
+    """
+    Akl e Blk di una sola richiesta k con path path_nodes (usata da load_requests e dalla sessione
+    incrementale): ({(k,ℓ): [(i,j,h)]}, {(ℓ,k): [(i,j,m)]})
+    """
+    Nl, L, L_ij = data['Nl'], data['L'], data['L_ij']
+    Akl = {}
+    Blk = defaultdict(list)
+
+    # === Akl: archi del percorso k mappati su linee ===
+    for i in range(len(path_nodes) - 1):
+        u, v = path_nodes[i], path_nodes[i + 1]
+        found = False  # flag per verificare se l’arco è stato trovato almeno in una linea
+
+        for ℓ in L:
+            for h, seg in enumerate(Nl[ℓ]):
+                # Scorri ogni segmento della linea ℓ e controlla se (u,v) compare come arco consecutivo
+                for idx in range(len(seg) - 1):
+                    if seg[idx] == u and seg[idx + 1] == v:
+                        # Arco (u,v) trovato nella direzione corretta nel segmento h della linea ℓ
+                        Akl.setdefault((k, ℓ), []).append((u, v, h))
+                        found = True
+                        break  # esci dal ciclo sul segmento (passa al prossimo segmento)
+                if found:
+                    break  # esci dal ciclo su h (passa alla prossima linea se serve)
+
+        # Se dopo aver controllato tutte le linee l’arco non è stato trovato, segnala errore
+        if not found:
+            raise ValueError(
+                f"Arco ({u},{v}) della richiesta {k} non trovato in alcuna linea o direzione."
+            )
+
+    # === Blk: triple consecutive (i,j,m) sul path k ===
+    for t in range(1, len(path_nodes)-1):
+        i, j, m = path_nodes[t-1], path_nodes[t], path_nodes[t+1]
+
+        # escludi se j è origine o destinazione di quella richiesta
+        if j == path_nodes[0] or j == path_nodes[-1]:
+            continue
+
+        common_lines = set(L_ij.get((i, j), [])) & set(L_ij.get((j, m), []))
+        for l in common_lines:
+            Blk[(l, k)].append((i, j, m))
+
+    return Akl, dict(Blk)
+
+
+
+# === Indice richieste per arco (CSR) ===
+def build_arc_requests(K, Pk, L_ij):
+    """
+    Indice inverso (ℓ,i,j) -> richieste il cui path attraversa l'arco (i,j) servito da ℓ, in forma CSR:
+    - arcs: [(ℓ,i,j)],  pos: {(ℓ,i,j): a}
+    - indptr, req: le richieste di arcs[a] sono K[req[indptr[a]:indptr[a+1]]] (posizioni in K, ordine di K)
+    """
+    by_arc = defaultdict(list)
+    for r, k in enumerate(K):
+        path = Pk[k]
+        for (i, j) in zip(path[:-1], path[1:]):
+            for l in L_ij.get((i, j), []):
+                reqs = by_arc[l, i, j]
+                if not reqs or reqs[-1] != r:          # path che ripassa sullo stesso arco: una volta sola
+                    reqs.append(r)
+    arcs = list(by_arc)
+    sizes = np.array([len(by_arc[a]) for a in arcs], dtype=np.int64)
+    indptr = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+    req = np.fromiter((r for a in arcs for r in by_arc[a]), dtype=np.int64, count=int(indptr[-1]))
+    return {"K": K, "arcs": arcs, "pos": {a: n for n, a in enumerate(arcs)}, "indptr": indptr, "req": req}
+
+
+
+def arc_requests(data, l, i, j):
+    """
+    Richieste (id) che attraversano l'arco (i,j) della linea ℓ.
+    Usa data["arc_req"] di load_requests; se manca o è di un altro K (es. aggregate_requests) lo ricostruisce.
+    """
+    index = data.get("arc_req")
+    if index is None or index["K"] is not data["K"]:
+        index = data["arc_req"] = build_arc_requests(data["K"], data["Pk"], data["L_ij"])
+    a = index["pos"].get((l, i, j))
+    if a is None:
+        return []
+    K = data["K"]
+    return [K[r] for r in index["req"][index["indptr"][a]:index["indptr"][a + 1]]]
+
+
+
+# === DOMANDA PER PERIODO ===
+def load_period_demand(requests_csv, prefix="passengers_"):
+    """
+    Domanda per fascia oraria dallo stesso CSV delle richieste (stessi path, p diverso):
+    una colonna per periodo, es. passengers_peak, passengers_offpeak
+    -> {"peak": {k: p_k}, "offpeak": {k: p_k}} nell'ordine delle colonne.
+    Senza colonne con il prefisso: un solo periodo "avg" con avg_passengers_per_time_unit.
+    """
+    df_requests = pd.read_csv(requests_csv)
+    columns = [c for c in df_requests.columns if c.startswith(prefix)]
+    if not columns:
+        return {"avg": dict(zip(df_requests['request_id'], df_requests['avg_passengers_per_time_unit']))}
+    return {c[len(prefix):]: dict(zip(df_requests['request_id'], df_requests[c])) for c in columns}
+
+
+
+def load_demand_profiles(profiles_csv):
+    """
+    Matrice di profili di domanda (richieste × scenari) da CSV: colonna request_id + una colonna
+    per scenario (es. ore del giorno, previsioni di crescita). Ritorna un DataFrame indicizzato per request_id.
+    """
+    return pd.read_csv(profiles_csv).set_index('request_id')
+
+
+
+# === AGGREGAZIONE DELLA DOMANDA ===
+def aggregate_requests(data, verbose=True):
+    """
+    Unisce le richieste con lo stesso path in una sola commodity (id = prima richiesta del gruppo,
+    p = somma dei p). Ritorna una copia di data con K, p, Pk, Akl, Blk aggregati e
+    groups {k aggregata: [richieste originali]}; data non viene modificato.
+    Restrizione euristica, non aggregazione esatta: le richieste unite viaggiano sulle stesse linee,
+    quindi l'ottimo aggregato è ≥ di quello completo (uguale solo se nell'ottimo completo nessun gruppo
+    si divide) e la soluzione disaggregata è ammissibile ma non sempre ottima. Gap: bench_aggregation.
+    """
+    K, p, Pk = data["K"], data["p"], data["Pk"]
+    rep, groups = {}, {}
+    for k in K:
+        r = rep.setdefault(tuple(Pk[k]), k)
+        groups.setdefault(r, []).append(k)
+
+    agg = {key: val for key, val in data.items() if key not in ("presolve", "arc_req")}   # da rifare sul nuovo K
+    agg["K"] = list(groups)
+    agg["p"] = {r: sum(p[k] for k in members) for r, members in groups.items()}
+    agg["Pk"] = {r: Pk[r] for r in groups}
+    agg["Akl"] = {(k, l): arcs for (k, l), arcs in data["Akl"].items() if k in groups}
+    agg["Blk"] = defaultdict(list, {(l, k): tr for (l, k), tr in data["Blk"].items() if k in groups})
+    agg["groups"] = groups
+    if verbose:
+        print(f"===== AGGREGAZIONE DOMANDA =====\nrichieste: {len(K)} -> {len(groups)}")
+    return agg
+
+
+
+def disaggregate_solution(solution, groups):
+    """
+    Riporta una soluzione (x_sol, w_sol, z_sol[, v_sol]) del modello aggregato sulle richieste
+    originali: x e z della commodity vengono copiate su ogni richiesta del gruppo.
+    """
+    members = {int(r): ks for r, ks in groups.items()}
+    x_sol, w_sol, z_sol = solution[:3]
+    x_out = {(int(k), i, j, l): val for (r, i, j, l), val in x_sol.items() for k in members.get(r, [r])}
+    z_out = {(int(k), j): val for (r, j), val in z_sol.items() for k in members.get(r, [r])}
+    return (x_out, w_sol, z_out) + tuple(solution[3:])
+
+
+
+# === Indici delle variabili x ===
+def path_x_keys(K, Pk, L_ij):
+    """
+    Chiavi (k,i,j,ℓ) delle variabili x: solo gli archi (i,j) del path Pk[k]
+    e le linee ℓ che li servono (le altre x sarebbero sempre nulle).
+    """
+    keys = {}
+    for k in K:
+        path = Pk[k]
+        for (i, j) in zip(path[:-1], path[1:]):
+            for ell in L_ij.get((i, j), []):
+                keys[k, i, j, ell] = None    # dict: niente duplicati, ordine mantenuto
+    return list(keys)
+
+
+
+# === Indici delle variabili z ===
+def path_z_keys(K, Pk, L_ij, J):
+    """
+    Chiavi (k,j) delle variabili z: solo nodi j in J interni al path Pk[k] (non origine / destinazione)
+    dove una linea serve entrambi gli archi adiacenti e almeno due linee servono quegli archi.
+    Altrove non c'è nessuna riga di continuità su J che possa forzare z = 1.
+    """
+    J = set(J)
+    keys = {}
+    for k in K:
+        path = Pk[k]
+        for (i, j, m) in zip(path[:-2], path[1:-1], path[2:]):
+            if j not in J or j == path[0] or j == path[-1]:
+                continue
+            before, after = set(L_ij.get((i, j), [])), set(L_ij.get((j, m), []))
+            if before & after and len(before | after) >= 2:
+                keys[k, j] = None
+    return list(keys)
+
+
+
+def model_x_keys(data):
+    """Chiavi x del modello: dopo presolve_assignments solo le x libere"""
+    if "presolve" in data:
+        return data["presolve"]["x_keys"]
+    return path_x_keys(data["K"], data["Pk"], data["L_ij"])
+
+
+def model_z_keys(data):
+    """Chiavi z del modello: nodi di cambio sul path (path_z_keys), o solo quelle ancora usate dopo il presolve"""
+    if "presolve" in data:
+        return data["presolve"]["z_keys"]
+    return path_z_keys(data["K"], data["Pk"], data["L_ij"], data["J"])
+
+
+
+# === PRESOLVE: assegnazioni forzate ===
+def presolve_assignments(data, verbose=True):
+    """
+    Riduzione di (x, z) prima di build(), per richiesta:
+    - dominio D(k,i,j) = linee ancora possibili sull'arco (i,j) del path; |D| = 1 -> x fissata a 1
+    - continuità su S (triple di Blk con j in S): x[k,i,j,l] = x[k,j,m,l], quindi una linea fissata /
+      esclusa su un arco viene fissata / esclusa anche sull'altro (propagazione fino a punto fisso)
+    - continuità su J: con entrambe le x note la riga sparisce; se differiscono z[k,j] = 1 (costo costante)
+    - z che non compaiono in nessuna riga rimasta vengono eliminate (valgono 0)
+    - il carico delle x fissate diventa un termine costante delle righe di capacità (arc_load)
+    Salva in data["presolve"] e ritorna lo stesso dizionario:
+    x_keys, x_fixed, z_keys, z_fixed, arc_load {(l,i,j): carico}, obj_const, stats.
+    """
+    K, p, Pk, Blk = data["K"], data["p"], data["Pk"], data["Blk"]
+    L_ij, S, J = data["L_ij"], set(data["S"]), set(data["J"])
+
+    # === domini e legami di continuità su S ===
+    D = {}
+    for k in K:
+        for (i, j) in zip(Pk[k][:-1], Pk[k][1:]):
+            if L_ij.get((i, j)):
+                D[k, i, j] = set(L_ij[i, j])
+    links = defaultdict(list)          # arco (k,i,j) -> [(arco collegato, linea)]
+    n_contS = n_contJ = 0
+    for (l, k), triples in Blk.items():
+        for (i, j, m) in triples:
+            if j in S:
+                links[k, i, j].append(((k, j, m), l))
+                links[k, j, m].append(((k, i, j), l))
+                n_contS += 1
+            if j in J:
+                n_contJ += 1
+
+    # === propagazione: coda degli archi il cui dominio è cambiato ===
+    queue = list(D)
+    while queue:
+        arc = queue.pop()
+        for other, l in links.get(arc, []):
+            if l not in D[arc]:
+                new = D[other] - {l}                       # x = 0 da un lato -> 0 anche dall'altro
+            elif len(D[arc]) == 1:
+                new = D[other] & {l}                       # x = 1 da un lato -> 1 anche dall'altro
+            else:
+                continue
+            if new != D[other]:
+                if not new:
+                    raise ValueError(f"Richiesta {other[0]}: nessuna linea ammissibile sull'arco {other[1:]} (contS)")
+                D[other] = new
+                queue.append(other)
+
+    # === x libere / fissate ===
+    all_keys = path_x_keys(K, Pk, L_ij)
+    x_keys, x_fixed, arc_load = [], [], defaultdict(float)
+    for key in all_keys:
+        k, i, j, l = key
+        if l not in D[k, i, j]:
+            continue                                       # esclusa: x = 0
+        if len(D[k, i, j]) == 1:
+            x_fixed.append(key)
+            arc_load[l, i, j] += p[k]
+        else:
+            x_keys.append(key)
+
+    def x_state(k, i, j, l):
+        dom = D[k, i, j]
+        return 0 if l not in dom else (1 if len(dom) == 1 else None)
+
+    # === continuità su J: z fissate o ancora necessarie ===
+    z_fixed, contJ_rows = set(), []
+    for (l, k), triples in Blk.items():
+        for (i, j, m) in triples:
+            if j in J:
+                a, b = x_state(k, i, j, l), x_state(k, j, m, l)
+                if a is None or b is None:
+                    contJ_rows.append((k, j))
+                elif a != b:
+                    z_fixed.add((k, j))
+    contJ_rows = [key for key in contJ_rows if key not in z_fixed]     # con z = 1 la riga è sempre soddisfatta
+    all_z = path_z_keys(K, Pk, L_ij, J)
+    z_used = set(contJ_rows)
+    z_keys = [key for key in all_z if key in z_used]
+    z_fixed = [key for key in all_z if key in z_fixed]
+
+    stats = {
+        "x_before": len(all_keys), "x_after": len(x_keys), "x_fixed": len(x_fixed),
+        "z_before": len(all_z), "z_after": len(z_keys), "z_fixed": len(z_fixed),
+        "assign_before": len(D), "assign_after": sum(1 for dom in D.values() if len(dom) > 1),
+        "contS_before": n_contS,
+        "contS_after": sum(1 for (l, k), tr in Blk.items() for (i, j, m) in tr
+                           if j in S and x_state(k, i, j, l) is None),
+        "contJ_before": 2 * n_contJ, "contJ_after": 2 * len(contJ_rows),
+        "fixed_load": float(sum(arc_load.values())),
+    }
+    data["presolve"] = {
+        "x_keys": x_keys, "x_fixed": x_fixed, "z_keys": z_keys, "z_fixed": z_fixed,
+        "arc_load": dict(arc_load), "obj_const": float(sum(data["alpha"] * p[k] for (k, j) in z_fixed)),
+        "stats": stats,
+    }
+    if verbose:
+        print("===== PRESOLVE =====")
+        for name in ("x", "z", "assign", "contS", "contJ"):
+            print(f"{name:<7}: {stats[f'{name}_before']:>8} -> {stats[f'{name}_after']:>8}")
+        print(f"x fissate a 1: {stats['x_fixed']}, z fissate a 1: {stats['z_fixed']}, "
+              f"carico costante: {stats['fixed_load']:.1f}")
+    return data["presolve"]
+
+
+
 def build_delta_sets(Nl, J, T):
     """
     Costruisce Δ⁺(j) e Δ⁻(j) per tutti j in T∪J.
@@ -277,6 +567,43 @@ def compute_rebalancing_travel_times(R, G_reb):
 
 
 
+# === CARICAMENTO ISTANZA COMPLETA ===
+# Stessi passi dei main_*.py (senza rigenerare linee/richieste), per benchmark e script
+def load_instance(type_f, Q=8, alpha=0.1, speed_lines=35, speed_reb=40, city_name="Turin"):
+    """
+    Carica un'istanza già salvata su disco (type_f in cross / grid / city) e
+    ritorna (data, G_lines) con tutti i set e parametri richiesti dai modelli.
+    """
+    if type_f == "city":
+        prefix = f"data/bus_lines/city/city_{city_name}"
+        requests_csv = f"data/demands/city_{city_name}_mobility_requests.csv"
+    else:
+        prefix = f"data/bus_lines/{type_f}/{type_f}"
+        requests_csv = f"data/demands/{type_f}_mobility_requests.csv"
+
+    data = load_sets(lines_csv=f"{prefix}_bus_lines.csv", stops_csv=f"{prefix}_bus_stops.csv")
+    data["Q"] = Q
+    data["alpha"] = alpha
+
+    with open(f"{prefix}_bus_lines_graph.gpickle", "rb") as f:
+        G_lines = pickle.load(f)
+    with open(f"{prefix}_rebalancing_graph.gpickle", "rb") as f:
+        G_reb = pickle.load(f)
+    G_lines = assign_travel_times(G_lines, speed_kmh=speed_lines)
+    G_reb   = assign_travel_times(G_reb,   speed_kmh=speed_reb)
+    data["t"]  = compute_segment_travel_times(data["Nl"], G_lines)
+    data["tr"] = compute_rebalancing_travel_times(data["R"], G_reb)
+
+    K, p, Pk, Akl, Blk = load_requests(requests_csv=requests_csv, data=data)
+    data["K"], data["p"], data["Pk"], data["Akl"], data["Blk"] = K, p, Pk, Akl, Blk
+
+    Delta_plus, Delta_minus = build_delta_sets(data["Nl"], data["J"], data["T"])
+    data["Delta_plus"], data["Delta_minus"] = Delta_plus, Delta_minus
+
+    return data, G_lines
+
+
+
 
 
 # === FOR TEST ONLY! WILL BE USED IN MAIN ===
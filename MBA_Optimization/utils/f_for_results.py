@@ -11,18 +11,19 @@ import random
 def display_results(model_obj, name_prefix, data):
     """
     Mostra i risultati del modello (x, w, z, v se presente).
-    Funziona per entrambi i casi: BASE e FULL.
+    Funziona per tutti i modelli: legge la soluzione una sola volta con get_solution().
     """
     print(f"\n\n######## DISPLAY RESULTS: {name_prefix} ########")
 
+    sol = model_obj.get_solution()
+    x_sol, w_sol, z_sol = sol[:3]
+    v_sol = sol[3] if len(sol) == 4 else {}
+
     # === DISPLAY: x ===
     print("\n === x_k_i_j_l (arcs used by requests) ===")
-    found_x = False
-    for var in model_obj.model.getVars():
-        if var.VarName.startswith("x") and var.X > 1e-6:
-            print(var.VarName, var.X)
-            found_x = True
-    if not found_x:
+    for (k, i, j, l), val in x_sol.items():
+        print(f"x_{k}_{i}_{j}_{l}", val)
+    if not x_sol:
         print("Nessuna variabile x attiva.")
 
     # === DISPLAY: w ===
@@ -30,35 +31,25 @@ def display_results(model_obj, name_prefix, data):
     found_w = False
     for l, segs in data["Nl"].items():
         for h, seg in enumerate(segs):
-            var_name = f"w_{l}_{h}"
-            var = model_obj.model.getVarByName(var_name)
-            if var and var.X > 1e-6:
-                print(f"Linea {l}, segmento {h}, seg={seg}, w={var.X}, t={data['t'].get((l,h))}")
+            val = w_sol.get((str(l), h), 0)
+            if val > 0:
+                print(f"Linea {l}, segmento {h}, seg={seg}, w={val}, t={data['t'].get((l,h))}")
                 found_w = True
     if not found_w:
         print("Nessuna variabile w attiva.")
 
     # === DISPLAY: z ===
     print("\n=== z_k_j (line changes) ===")
-    found_z = False
-    for k in range(len(data["K"])):
-        for j in data["J"]:
-            var_name = f"z_{k}_{j}"
-            var = model_obj.model.getVarByName(var_name)
-            if var and var.X > 1e-6:
-                print(f"Richiesta {k}, nodo j={j}: z={var.X}")
-                found_z = True
-    if not found_z:
+    for (k, j), val in sorted(z_sol.items()):
+        print(f"Richiesta {k}, nodo j={j}: z={val}")
+    if not z_sol:
         print("Nessuna variabile z attiva.")
 
     # === DISPLAY: v ===
     print("\n=== v_i_j (rebalance flows) ===")
-    found_v = False
-    for var in model_obj.model.getVars():
-        if var.VarName.startswith("v") and var.X > 1e-6:
-            print(var.VarName, var.X)
-            found_v = True
-    if not found_v:
+    for (i, j), val in v_sol.items():
+        print(f"v_{i}_{j}", val)
+    if not v_sol:
         print("Nessun flusso di riequilibrio attivo (v).")
 
 
@@ -79,7 +70,11 @@ def save_results_model(model_obj, name_prefix, data, G_lines, type_f="cross"):
     else:
         raise ValueError("Formato della soluzione non riconosciuto: attesi 3 o 4 elementi.")
 
-    data["model"] = model_obj.model
+    # modello Gurobi non disponibile se la variante è stata risolta in un altro processo (MBA_Result)
+    if model_obj.model is not None:
+        data["model"] = model_obj.model
+    else:
+        data.pop("model", None)
 
     # === Salvataggio su file ===
     save_results("results", name_prefix, x_sol, w_sol, data,
@@ -100,12 +95,8 @@ def save_results(results_folder, prefix, x_sol, w_sol, data,
     Salva tutte le informazioni del modello (BASE o FULL)
     in formato JSON e .ILP/.SOL.
     """
-    if type_f == "cross":
-        folder = os.path.join(results_folder, "cross")
-        os.makedirs(folder, exist_ok=True)
-    if type_f == "grid":
-        folder = os.path.join(results_folder, "grid")
-        os.makedirs(folder, exist_ok=True)
+    folder = os.path.join(results_folder, type_f)    # cross / grid / city
+    os.makedirs(folder, exist_ok=True)
 
     # === x ===
     with open(os.path.join(folder, f"{prefix}_solution_x.json"), "w") as f:
@@ -199,9 +190,11 @@ def compute_VOS_VOR(data, w_rigid, w_semi, w_flex, v_flex=None, save_path="resul
 
     # === CAPACITÀ TOTALE DISPONIBILE (TCAP) ===
     # Rigid: w_l costante lungo tutta la linea → somma su tutti gli archi della linea
+    # w_rigid per segmento {(l,h): w} (get_solution, anche di MBA_ILP_RIGID_LINE) oppure per linea {l: w}
     TCAP_rigid = Q * sum(
-        sum(val for (l_, h_), val in data["t"].items() if l_ == int(l)) * w
-        for l, w in w_rigid.items()
+        data["t"][(int(key[0]), key[1])] * w if isinstance(key, tuple)
+        else sum(val for (l_, h_), val in data["t"].items() if l_ == int(key)) * w
+        for key, w in w_rigid.items()
         )
     
     # Semi: somma sui segmenti